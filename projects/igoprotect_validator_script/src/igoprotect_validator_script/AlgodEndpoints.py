@@ -0,0 +1,308 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from algosdk import constants, error
+
+from .HttpTransport import PooledAlgodClient, PooledHttpTransport
+from .RateLimiter import RateLimiter
+
+
+
+@dataclass(slots=True)
+class AlgodEndpoint:
+    address: str
+    token: str
+    transport: PooledHttpTransport = field(repr=False)  # Pooled connections of the synchronous clients
+    last_round: int = 0
+    latency_s: float | None = None      # Moving average of the status response time
+    num_of_failures: int = 0            # Consecutive failed probes or requests
+    lag: int = 0                        # Rounds behind the most advanced endpoint
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.num_of_failures == 0 and self.latency_s is not None
+
+
+
+class AlgodEndpointPool(object):
+
+    # Weight of the latest response time in the (exponential) moving average of an endpoint's latency
+    LATENCY_SMOOTHING = 0.3
+
+
+    def __init__(
+        self,
+        logger: object,
+        endpoints: List[AlgodEndpoint],
+        probe_period_s: float = 5,
+        probe_timeout_s: float = 2,
+        max_lag_rounds: int = 2,
+        rate_limiter: RateLimiter | None = None
+    ) -> None:
+        """Initialize a pool of algod endpoints, ranked by their health, round lag, and latency.
+
+        Notes:
+            A background task probes the status of each endpoint every `probe_period_s`. An endpoint is ranked down
+            when its probe or a request to it fails, or when it lags more than `max_lag_rounds` behind the most
+            advanced endpoint, so that reads and submissions do not act on a stalled node. The remaining (healthy)
+            endpoints are ranked by their latency.
+            Until the first probe, the endpoints are ranked in the configured order.
+            The ranking is read from the threads of the synchronous clients, hence it is replaced atomically.
+            Probes are background requests, i.e. an endpoint is not probed when its request budget runs low.
+
+        Args:
+            logger (object): Python logger.
+            endpoints (List[AlgodEndpoint]): Endpoints, in the order of preference.
+            probe_period_s (float, optional): Time between probes. Defaults to 5.
+            probe_timeout_s (float, optional): Timeout of a probe. Defaults to 2.
+            max_lag_rounds (int, optional): Number of rounds an endpoint may lag behind. Defaults to 2.
+            rate_limiter (RateLimiter | None, optional): Shared request budget. Defaults to None (unlimited).
+
+        Raises:
+            ValueError: No endpoint provided.
+        """
+        if len(endpoints) == 0:
+            raise ValueError('At least one algod endpoint is required.')
+        self.logger = logger
+        self.endpoints = endpoints
+        self.probe_period_s = probe_period_s
+        self.probe_timeout_s = probe_timeout_s
+        self.max_lag_rounds = max_lag_rounds
+        self.rate_limiter = rate_limiter
+
+        self.ranked_endpoints = list(endpoints)
+        self.lock = threading.Lock()
+        self.probe_task: asyncio.Task | None = None
+        self.http_client: httpx.AsyncClient | None = None
+
+
+    @classmethod
+    def from_config(
+        cls,
+        logger: object,
+        addresses: List[str],
+        tokens: List[str],
+        make_transport: Callable[[str], PooledHttpTransport],
+        **kwargs
+    ) -> 'AlgodEndpointPool':
+        """Make a pool from the configured addresses and tokens.
+
+        Args:
+            logger (object): Python logger.
+            addresses (List[str]): Endpoint addresses.
+            tokens (List[str]): Either one token per address or a single token for all addresses.
+            make_transport (Callable[[str], PooledHttpTransport]): Function, making the transport to an address.
+
+        Raises:
+            ValueError: The numbers of addresses and tokens do not match.
+
+        Returns:
+            AlgodEndpointPool: Endpoint pool.
+        """
+        if len(tokens) == 1:
+            tokens = tokens * len(addresses)
+        if len(tokens) != len(addresses):
+            raise ValueError(f'Got {len(tokens)} algod tokens for {len(addresses)} algod endpoints.')
+        endpoints = [
+            AlgodEndpoint(address.rstrip('/'), token, make_transport(address))
+            for address, token in zip(addresses, tokens)
+        ]
+        return cls(logger, endpoints, **kwargs)
+
+
+    def get_ranked(
+        self
+    ) -> List[AlgodEndpoint]:
+        """Get the endpoints, best first.
+
+        Returns:
+            List[AlgodEndpoint]: Ranked endpoints.
+        """
+        return self.ranked_endpoints
+
+
+    def get_best(
+        self
+    ) -> AlgodEndpoint:
+        """Get the best endpoint.
+
+        Returns:
+            AlgodEndpoint: Endpoint.
+        """
+        return self.ranked_endpoints[0]
+
+
+    def report_failure(
+        self,
+        endpoint: AlgodEndpoint
+    ) -> None:
+        """Rank down an endpoint after a failed request, until it is probed successfully again.
+
+        Args:
+            endpoint (AlgodEndpoint): Endpoint.
+        """
+        with self.lock:
+            endpoint.num_of_failures += 1
+            self._rank()
+
+
+    def start(
+        self
+    ) -> None:
+        """Start probing the endpoints in the background."""
+        if self.probe_task is None and len(self.endpoints) > 1:
+            self.probe_task = asyncio.create_task(self._probe_periodically(), name='algod-endpoint-prober')
+
+
+    async def close(
+        self
+    ) -> None:
+        """Stop probing the endpoints and close their connections."""
+        if self.probe_task is not None:
+            self.probe_task.cancel()
+            await asyncio.gather(self.probe_task, return_exceptions=True)
+            self.probe_task = None
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        for endpoint in self.endpoints:
+            endpoint.transport.close()
+
+
+    async def probe(
+        self
+    ) -> None:
+        """Probe the status of each endpoint (within its request budget) and rank them."""
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(timeout=self.probe_timeout_s)
+        endpoints = [
+            e for e in self.endpoints
+            if self.rate_limiter is None or self.rate_limiter.try_acquire(e.address, RateLimiter.PRIORITY_BACKGROUND)
+        ]
+        results = await asyncio.gather(*[self._probe_endpoint(e) for e in endpoints], return_exceptions=True)
+        previous_best = self.get_best()
+        with self.lock:
+            for endpoint, result in zip(endpoints, results):
+                if isinstance(result, BaseException):
+                    if endpoint.num_of_failures == 0:
+                        self.logger.warning(f'Algod endpoint {endpoint.address} failed its probe ({result}).')
+                    endpoint.num_of_failures += 1
+                    continue
+                last_round, latency_s = result
+                endpoint.last_round = last_round
+                if endpoint.latency_s is None:
+                    endpoint.latency_s = latency_s
+                else:
+                    endpoint.latency_s += self.LATENCY_SMOOTHING * (latency_s - endpoint.latency_s)
+                endpoint.num_of_failures = 0
+            self._rank()
+        best = self.get_best()
+        if best is not previous_best:
+            self.logger.info(
+                f'Switched algod endpoint from {previous_best.address} to {best.address} ' +
+                f'(round {best.last_round}, latency {round(1000 * (best.latency_s or 0), 1)} ms).'
+            )
+
+
+    def _rank(
+        self
+    ) -> None:
+        max_round = max(e.last_round for e in self.endpoints)
+        for endpoint in self.endpoints:
+            endpoint.lag = max_round - endpoint.last_round
+        order = {id(e): i for i, e in enumerate(self.endpoints)}
+        self.ranked_endpoints = sorted(
+            self.endpoints,
+            key=lambda e: (
+                not e.is_healthy or e.lag > self.max_lag_rounds,
+                e.num_of_failures,
+                e.latency_s if e.latency_s is not None else float('inf'),
+                order[id(e)]
+            )
+        )
+
+
+    async def _probe_endpoint(
+        self,
+        endpoint: AlgodEndpoint
+    ) -> Tuple[int, float]:
+        start_time = time.monotonic()
+        response = await self.http_client.get(
+            endpoint.address + '/v2/status',
+            headers={constants.algod_auth_header: endpoint.token}
+        )
+        response.raise_for_status()
+        return response.json()['last-round'], time.monotonic() - start_time
+
+
+    async def _probe_periodically(
+        self
+    ) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                self.logger.warning(f'Probing algod endpoints failed ({e}).')
+            await asyncio.sleep(self.probe_period_s)
+
+
+
+class FailoverAlgodClient(PooledAlgodClient):
+
+
+    def __init__(
+        self,
+        endpoint_pool: AlgodEndpointPool,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Initialize an algod client, which sends each request to the best endpoint of a pool.
+
+        Notes:
+            If a request fails with a connection error or a server error (5xx), it is sent to the next endpoint,
+            which also switches over transaction submission when the current node fails. Resubmitting a signed
+            transaction is safe, since a node rejects a transaction that was already submitted.
+
+        Args:
+            endpoint_pool (AlgodEndpointPool): Ranked endpoints.
+            headers (Optional[Dict[str, str]], optional): Additional request headers. Defaults to None.
+        """
+        endpoint = endpoint_pool.endpoints[0]
+        super().__init__(endpoint.token, endpoint.address, endpoint.transport, headers)
+        self.endpoint_pool = endpoint_pool
+
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[dict] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_format: Optional[str] = 'json',
+        timeout: Optional[int] = 30,
+    ) -> dict | bytes:
+        """Execute a given request (same interface and errors as `algod.AlgodClient.algod_request`)."""
+        endpoints = self.endpoint_pool.get_ranked()
+        for i, endpoint in enumerate(endpoints):
+            is_last = i == len(endpoints) - 1
+            try:
+                response = self.send_request(
+                    endpoint.transport, endpoint.token, method, requrl, params, data, headers, timeout
+                )
+            except error.AlgodRequestError as e:
+                self.endpoint_pool.report_failure(endpoint)
+                if is_last:
+                    raise
+                self.endpoint_pool.logger.warning(f'Algod endpoint {endpoint.address} failed ({e}), switching over.')
+                continue
+            if response.status_code >= 500 and not is_last:
+                self.endpoint_pool.report_failure(endpoint)
+                self.endpoint_pool.logger.warning(
+                    f'Algod endpoint {endpoint.address} returned status {response.status_code}, switching over.'
+                )
+                continue
+            return self.decode_response(response, response_format)
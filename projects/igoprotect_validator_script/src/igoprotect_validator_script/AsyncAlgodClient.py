@@ -0,0 +1,374 @@
+import asyncio
+import base64
+import json
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import msgpack
+from algosdk import constants, error
+from algosdk.transaction import SuggestedParams
+
+from .AlgodEndpoints import AlgodEndpointPool
+from .HttpTransport import LatencyStats, RetryPolicy
+from .RateLimiter import RateLimiter
+
+
+
+class AsyncAlgodClient(object):
+
+    # Prefix of the versioned algod REST API
+    API_VERSION_PATH_PREFIX = '/v2'
+
+    # Extra time, on top of the node's own timeout, allowed for `wait-for-block-after` to return
+    WAIT_FOR_BLOCK_TIMEOUT_S = 75
+
+
+    def __init__(
+        self,
+        algod_address: str,
+        algod_token: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout_s: float = 30,
+        connect_timeout_s: float = 5,
+        max_connections: int = 10,
+        retry_policy: RetryPolicy | None = None,
+        latency_stats: LatencyStats | None = None,
+        endpoint_pool: AlgodEndpointPool | None = None,
+        rate_limiter: RateLimiter | None = None
+    ) -> None:
+        """Initialize an asynchronous algod client for the read endpoints used by the validator script.
+
+        Notes:
+            Transactions are still issued through the (synchronous) generated clients.
+            Requests share a pool of keep-alive connections. Idempotent requests are retried with jittered
+            exponential backoff on connection errors and on the statuses of an overloaded node.
+            With an endpoint pool, each request is sent to the best endpoint and retries go to the next ones, in which
+            case `algod_address` and `algod_token` are not used.
+            With a rate limiter, each attempt waits for the budget of its endpoint, according to the request priority.
+
+        Args:
+            algod_address (str): Algod server address, including the port.
+            algod_token (str): Algod API token.
+            headers (Optional[Dict[str, str]], optional): Additional request headers. Defaults to None.
+            timeout_s (float, optional): Request timeout in seconds. Defaults to 30.
+            connect_timeout_s (float, optional): Connection timeout in seconds. Defaults to 5.
+            max_connections (int, optional): Maximum number of pooled connections. Defaults to 10.
+            retry_policy (RetryPolicy | None, optional): Retries of idempotent requests. Defaults to None (default
+                policy).
+            latency_stats (LatencyStats | None, optional): Shared latency statistics. Defaults to None (own).
+            endpoint_pool (AlgodEndpointPool | None, optional): Ranked algod endpoints. Defaults to None (only
+                `algod_address`).
+            rate_limiter (RateLimiter | None, optional): Shared request budget. Defaults to None (unlimited).
+        """
+        self.endpoint_pool = endpoint_pool
+        self.rate_limiter = rate_limiter
+        self.algod_address = algod_address.rstrip('/')
+        self.algod_token = algod_token
+        self.headers = {'User-Agent': 'igoprotect-validator-script'}
+        if headers:
+            self.headers.update(headers)
+        self.timeout_s = timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.latency_stats = latency_stats or LatencyStats()
+        self.http_client = httpx.AsyncClient(
+            base_url=self.algod_address,
+            timeout=httpx.Timeout(timeout_s, connect=connect_timeout_s),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+
+    async def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        response_format: str = 'json',
+        timeout_s: Optional[float] = None,
+        priority: Optional[int] = None
+    ) -> dict | list | bytes:
+        """Execute a given request.
+
+        Args:
+            method (str): Request method.
+            requrl (str): Unversioned URL path of the request, e.g. `/status`.
+            params (Optional[Dict[str, Any]], optional): Query parameters. Defaults to None.
+            data (Optional[bytes], optional): Request body. Defaults to None.
+            response_format (str, optional): Either `json` or `msgpack`. Defaults to `json`.
+            timeout_s (Optional[float], optional): Request timeout, overriding the default. Defaults to None.
+            priority (Optional[int], optional): Priority of the request towards the rate limiter. Defaults to None
+                (derived from the request).
+
+        Raises:
+            error.AlgodHTTPError: Algod returned an error status.
+            httpx.TransportError: The request failed on all attempts.
+
+        Returns:
+            dict | list | bytes: Decoded JSON response or the raw response body.
+        """
+        headers = dict(self.headers)
+        is_authenticated = requrl not in constants.no_auth
+        if is_authenticated:
+            headers[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = self.API_VERSION_PATH_PREFIX + requrl
+        if response_format != 'json':
+            params = dict(params or {}, format=response_format)
+
+        endpoint_name = self.latency_stats.get_endpoint_name(method, requrl)
+        if priority is None:
+            priority = RateLimiter.get_priority(method, requrl)
+        algod_endpoints = self.endpoint_pool.get_ranked() if self.endpoint_pool is not None else []
+        timeout = httpx.Timeout(timeout_s if timeout_s is not None else self.timeout_s, connect=self.connect_timeout_s)
+        start_time = time.monotonic()
+        attempt = 0
+        while True:
+            url, algod_endpoint = requrl, None
+            if algod_endpoints:
+                algod_endpoint = algod_endpoints[attempt % len(algod_endpoints)]
+                url = algod_endpoint.address + requrl
+                if is_authenticated:
+                    headers[constants.algod_auth_header] = algod_endpoint.token
+            if self.rate_limiter is not None:
+                address = algod_endpoint.address if algod_endpoint is not None else self.algod_address
+                await self.rate_limiter.acquire_async(address, priority)
+            try:
+                response = await self.http_client.request(
+                    method,
+                    url,
+                    params=params,
+                    content=data,
+                    headers=headers,
+                    timeout=timeout
+                )
+            except httpx.TransportError:
+                if algod_endpoint is not None:
+                    self.endpoint_pool.report_failure(algod_endpoint)
+                if not self.retry_policy.can_retry(method, attempt):
+                    self.latency_stats.record(endpoint_name, time.monotonic() - start_time, False, attempt)
+                    raise
+            else:
+                if response.status_code not in self.retry_policy.RETRY_STATUS_CODES:
+                    break
+                if algod_endpoint is not None:
+                    self.endpoint_pool.report_failure(algod_endpoint)
+                if not self.retry_policy.can_retry(method, attempt):
+                    break
+            await asyncio.sleep(self.retry_policy.get_delay_s(attempt))
+            attempt += 1
+        self.latency_stats.record(endpoint_name, time.monotonic() - start_time, response.status_code < 400, attempt)
+
+        if response.status_code >= 400:
+            message = response.text
+            try:
+                message = json.loads(response.text)['message']
+            except Exception:
+                pass
+            raise error.AlgodHTTPError(message, response.status_code)
+
+        if response_format == 'json':
+            if len(response.content) == 0:
+                return dict()
+            return response.json()
+        return response.content
+
+
+    async def status(
+        self
+    ) -> dict:
+        """Get the node status.
+
+        Returns:
+            dict: Node status.
+        """
+        return await self.algod_request('GET', '/status')
+
+
+    async def status_after_block(
+        self,
+        round_num: int
+    ) -> dict:
+        """Get the node status as soon as the block after `round_num` is committed.
+
+        Args:
+            round_num (int): Round to wait after.
+
+        Returns:
+            dict: Node status.
+        """
+        return await self.algod_request(
+            'GET',
+            f'/status/wait-for-block-after/{round_num}',
+            timeout_s=self.WAIT_FOR_BLOCK_TIMEOUT_S
+        )
+
+
+    async def account_info(
+        self,
+        address: str,
+        exclude: Optional[str] = None
+    ) -> dict:
+        """Get the account information.
+
+        Args:
+            address (str): Account address.
+            exclude (Optional[str], optional): Resources to exclude, e.g. `all`. Defaults to None.
+
+        Returns:
+            dict: Account information.
+        """
+        params = dict(exclude=exclude) if exclude else None
+        return await self.algod_request('GET', f'/accounts/{address}', params=params)
+
+
+    async def block(
+        self,
+        round_num: int
+    ) -> dict:
+        """Get a block, including its transactions and their inner transactions.
+
+        Notes:
+            Requested in msgpack, which is smaller and faster to decode than the JSON encoding of a block. Keys are
+            the canonical short field names (e.g., `txns`, `apid`, `apaa`) and binary fields are raw bytes.
+
+        Args:
+            round_num (int): Round of the block.
+
+        Returns:
+            dict: Block.
+        """
+        response = await self.algod_request('GET', f'/blocks/{round_num}', response_format='msgpack')
+        return msgpack.unpackb(response, raw=False, strict_map_key=False)['block']
+
+
+    async def application_info(
+        self,
+        application_id: int
+    ) -> dict:
+        """Get the application information.
+
+        Args:
+            application_id (int): Application ID.
+
+        Returns:
+            dict: Application information.
+        """
+        return await self.algod_request('GET', f'/applications/{application_id}')
+
+
+    async def application_box_by_name(
+        self,
+        application_id: int,
+        box_name: bytes
+    ) -> dict:
+        """Get a box of an application.
+
+        Args:
+            application_id (int): Application ID.
+            box_name (bytes): Box name.
+
+        Returns:
+            dict: Box with its name and value (base64 encoded) and the round of the read.
+        """
+        params = dict(name='b64:' + base64.b64encode(box_name).decode())
+        return await self.algod_request('GET', f'/applications/{application_id}/box', params=params)
+
+
+    async def suggested_params(
+        self,
+        priority: Optional[int] = None
+    ) -> SuggestedParams:
+        """Get the suggested transaction parameters.
+
+        Args:
+            priority (Optional[int], optional): Priority of the request towards the rate limiter. Defaults to None
+                (background).
+
+        Returns:
+            SuggestedParams: Suggested transaction parameters.
+        """
+        res = await self.algod_request('GET', '/transactions/params', priority=priority)
+        return SuggestedParams(
+            res['fee'],
+            res['last-round'],
+            res['last-round'] + 1000,
+            res['genesis-hash'],
+            res['genesis-id'],
+            False,
+            res['consensus-version'],
+            res['min-fee'],
+        )
+
+
+    async def participation_keys(
+        self
+    ) -> list:
+        """Get the participation keys installed on the node.
+
+        Notes:
+            The participation endpoints require the node's admin API token.
+
+        Returns:
+            list: Participation keys.
+        """
+        return await self.algod_request('GET', '/participation')
+
+
+    async def participation_key(
+        self,
+        participation_id: str
+    ) -> dict:
+        """Get a participation key installed on the node.
+
+        Args:
+            participation_id (str): Participation ID.
+
+        Returns:
+            dict: Participation key.
+        """
+        return await self.algod_request('GET', f'/participation/{participation_id}')
+
+
+    async def generate_participation_key(
+        self,
+        address: str,
+        first: int,
+        last: int,
+        dilution: Optional[int] = None
+    ) -> None:
+        """Start the generation of a participation key on the node.
+
+        Notes:
+            The node generates the key in the background, i.e. the key becomes available some time after the call.
+
+        Args:
+            address (str): Account address.
+            first (int): First round of validity.
+            last (int): Last round of validity.
+            dilution (Optional[int], optional): Key dilution. Defaults to None (node's default).
+        """
+        params = dict(first=first, last=last)
+        if dilution:
+            params['dilution'] = dilution
+        await self.algod_request('POST', f'/participation/generate/{address}', params=params)
+
+
+    async def delete_participation_key(
+        self,
+        participation_id: str
+    ) -> None:
+        """Delete a participation key from the node.
+
+        Args:
+            participation_id (str): Participation ID.
+        """
+        await self.algod_request('DELETE', f'/participation/{participation_id}')
+
+
+    async def close(
+        self
+    ) -> None:
+        """Close the underlying connections."""
+        await self.http_client.aclose()
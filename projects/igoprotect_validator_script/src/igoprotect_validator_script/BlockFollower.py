@@ -0,0 +1,217 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Set, Tuple
+
+from algosdk.abi import Method
+from algosdk.encoding import encode_address
+
+from .AsyncAlgodClient import AsyncAlgodClient
+from .NoticeboardClient import CreateDelegatorContractArgs
+
+
+
+@dataclass(slots=True)
+class Keyreg:
+    sender: str                                 # Account address
+    round_num: int
+    vote_key: bytes | None = field(repr=False)  # Not set when the account goes offline
+    sel_key: bytes | None = field(repr=False)
+
+    @property
+    def is_offline(self) -> bool:
+        return self.vote_key is None
+
+
+
+@dataclass(slots=True)
+class BlockEvents:
+    created_app_ids: List[int] = field(default_factory=list)    # Delegator apps, created for the validator ad
+    touched_app_ids: Set[int] = field(default_factory=set)      # Apps, called by (inner) transactions
+    keyregs: List[Keyreg] = field(default_factory=list)         # Key registrations, in the order of the blocks
+    proposers: List[Tuple[int, str]] = field(default_factory=list)  # Round and proposer address of each block
+    is_complete: bool = True                                    # All blocks since the last followed round were walked
+
+
+
+class BlockFollower(object):
+
+    # Selector of the noticeboard method, through which delegators create their contracts
+    CREATE_DELEGATOR_CONTRACT_SELECTOR = Method.from_signature(CreateDelegatorContractArgs.method()).get_selector()
+
+
+    def __init__(
+        self,
+        logger: object,
+        algod_client: AsyncAlgodClient,
+        noticeboard_app_id: int,
+        val_app_id: int,
+        state_path: str | None = None,
+        max_blocks_per_pass: int = 100,
+        batch_size: int = 8
+    ) -> None:
+        """Initialize the follower of the blocks, which detects the delegator contracts created for the validator ad.
+
+        Notes:
+            Each block is read once, in msgpack, and its transactions are walked together with their inner
+            transactions. A `create_delegator_contract` call to the noticeboard, whose first argument is the validator
+            ad, yields the app created by its inner transactions, i.e. the new delegator contract. The IDs of all
+            called apps are collected too, so that only the delegator contracts, whose state may have changed, have
+            to be read again, as well as the key registrations, so that the accounts' keys are tracked without
+            reading the accounts, and the proposer of each block, as far as its header includes it.
+            The last followed round is stored in `state_path`, so that a restarted script resumes where it stopped.
+            If more than `max_blocks_per_pass` blocks are pending (e.g. after a long downtime), they are skipped and
+            the events are marked as incomplete, i.e. the contracts have to be read in full.
+
+        Args:
+            logger (object): Python logger.
+            algod_client (AsyncAlgodClient): Asynchronous algod client.
+            noticeboard_app_id (int): Noticeboard app ID.
+            val_app_id (int): Validator ad app ID.
+            state_path (str | None, optional): Path to the file of the last followed round. Defaults to None (not
+                stored).
+            max_blocks_per_pass (int, optional): Maximum number of blocks followed at once. Defaults to 100.
+            batch_size (int, optional): Number of concurrently read blocks. Defaults to 8.
+        """
+        self.logger = logger
+        self.algod_client = algod_client
+        self.noticeboard_app_id = noticeboard_app_id
+        self.val_app_id = val_app_id
+        self.val_app_id_arg = val_app_id.to_bytes(8, 'big')    # ABI-encoded uint64
+        self.state_path = Path(state_path) if state_path else None
+        self.max_blocks_per_pass = max_blocks_per_pass
+        self.batch_size = batch_size
+
+        self.last_round = self.load_last_round()
+        self.num_of_blocks = 0
+        self.num_of_created = 0
+
+
+    def load_last_round(
+        self
+    ) -> int | None:
+        """Load the last followed round.
+
+        Returns:
+            int | None: Round or None if not stored.
+        """
+        if self.state_path is None or not self.state_path.is_file():
+            return None
+        try:
+            last_round = int(self.state_path.read_text().strip())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'Could not load the last followed round from {self.state_path} ({e}).')
+            return None
+        self.logger.info(f'Resuming following the blocks after round {last_round}.')
+        return last_round
+
+
+    def store_last_round(
+        self
+    ) -> None:
+        """Store the last followed round (atomically, through a temporary file)."""
+        if self.state_path is None or self.last_round is None:
+            return
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        try:
+            tmp_path.write_text(f'{self.last_round}\n')
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            self.logger.warning(f'Could not store the last followed round to {self.state_path} ({e}).')
+
+
+    async def follow(
+        self,
+        current_round: int
+    ) -> BlockEvents:
+        """Walk the blocks after the last followed round up to the current round.
+
+        Notes:
+            A block that can not be read stops the walk, which is continued from that block in the next call.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            BlockEvents: Created delegator contracts and called apps.
+        """
+        events = BlockEvents()
+        if self.last_round is None or current_round - self.last_round > self.max_blocks_per_pass:
+            if self.last_round is not None:
+                self.logger.info(
+                    f'Skipping {current_round - self.last_round} block(s) after round {self.last_round}.'
+                )
+            events.is_complete = False
+            self.last_round = current_round
+            self.store_last_round()
+            return events
+
+        is_failed = False
+        while self.last_round < current_round and not is_failed:
+            rounds = list(range(self.last_round + 1, min(self.last_round + self.batch_size, current_round) + 1))
+            blocks = await asyncio.gather(
+                *[self.algod_client.block(round_num) for round_num in rounds],
+                return_exceptions=True
+            )
+            for round_num, block in zip(rounds, blocks):
+                if isinstance(block, BaseException):
+                    self.logger.warning(f'Could not read block {round_num} ({block}).')
+                    is_failed = True
+                    break
+                if block.get('prp'):
+                    events.proposers.append((round_num, encode_address(block['prp'])))
+                for stxn in block.get('txns', []):
+                    self.walk(stxn, events, round_num)
+                self.last_round = round_num
+                self.num_of_blocks += 1
+        self.store_last_round()
+
+        if events.created_app_ids:
+            self.num_of_created += len(events.created_app_ids)
+            self.logger.info(f'Detected new delegator app(s) with ID(s) {events.created_app_ids}.')
+        return events
+
+
+    def walk(
+        self,
+        stxn: dict,
+        events: BlockEvents,
+        round_num: int,
+        is_in_creation: bool = False
+    ) -> None:
+        """Walk a transaction and its inner transactions.
+
+        Args:
+            stxn (dict): Signed transaction with its apply data, as included in a block.
+            events (BlockEvents): Events, to which the findings are added.
+            round_num (int): Round of the block.
+            is_in_creation (bool, optional): Flag, indicating whether the transaction is an inner transaction of a
+                `create_delegator_contract` call for the validator ad. Defaults to False.
+        """
+        txn = stxn.get('txn', {})
+        if txn.get('type') == 'keyreg':
+            is_offline = txn.get('nonpart', False) or 'votekey' not in txn
+            events.keyregs.append(Keyreg(
+                encode_address(txn['snd']),
+                round_num,
+                None if is_offline else txn['votekey'],
+                None if is_offline else txn.get('selkey')
+            ))
+        elif txn.get('type') == 'appl':
+            app_id = txn.get('apid', 0)
+            if app_id == 0:
+                created_app_id = stxn.get('apid', 0)    # Apply data holds the ID of a created app
+                if is_in_creation and created_app_id:
+                    events.created_app_ids.append(created_app_id)
+                app_id = created_app_id
+            events.touched_app_ids.add(app_id)
+            args = txn.get('apaa', [])
+            is_in_creation = is_in_creation or (
+                app_id == self.noticeboard_app_id and
+                len(args) >= 2 and
+                args[0] == self.CREATE_DELEGATOR_CONTRACT_SELECTOR and
+                args[1] == self.val_app_id_arg
+            )
+        for inner_stxn in stxn.get('dt', {}).get('itx', []):
+            self.walk(inner_stxn, events, round_num, is_in_creation)
@@ -1,98 +1,340 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
 from algokit_utils import TransactionParameters
 from algokit_utils.beta.account_manager import AddressAndSigner
-from algosdk.transaction import SuggestedParams
 
-from .DelegatorContractClient import GlobalState
-from .utils import decode_val_config_man
+from .NoticeboardClient import NoticeboardClient
+from .SuggestedParamsProvider import SuggestedParamsProvider
+from .SimulationGuard import SimulationFailedError, SimulationGuard, SimulationOutcome
+from .StateModels import DelegatorContractState
+
+
+
+@dataclass(slots=True)
+class Termination:
+    method: str                 # Name of the noticeboard method that ends the contract
+    del_acc: str
+    del_app_id: int
+    val_app_id: int
+    manager: AddressAndSigner = field(repr=False)
+    noticeboard_client: NoticeboardClient = field(repr=False)
+    future: asyncio.Future = field(repr=False)
+
+    @property
+    def batch_key(self) -> tuple:
+        return (self.noticeboard_client.app_id, self.val_app_id, self.manager.address)
 
 
 
 class Bouncer(object):
 
+    # Noticeboard methods for ending a delegator contract
+    METHOD_KEYS_NOT_CONFIRMED = 'keys_not_confirmed'
+    METHOD_END_EXPIRED_OR_BREACHED = 'end_expired_or_breached_delegator_contract'
+
+    # Protocol limits on transaction groups and on the references of an app call
+    MAX_GROUP_SIZE = 16
+    MAX_ACCOUNTS_PER_TXN = 4
+    MAX_REFERENCES_PER_TXN = 8
+
 
     def __init__(
         self,
-        suggested_params: SuggestedParams
+        logger: object,
+        params_provider: SuggestedParamsProvider,
+        batch_window_s: float = 0.5,
+        simulation_guard: SimulationGuard | None = None
     ) -> None:
-        self.update_suggested_params(suggested_params)
+        """Initialize the contract lifecycle manager.
 
+        Notes:
+            Terminations are not sent right away, but collected for `batch_window_s` and then submitted as atomic
+            groups of up to MAX_GROUP_SIZE noticeboard calls. The references of a group's calls are packed into the
+            calls' foreign-app and account slots, relying on group resource sharing (AVM 9+).
+            If a group fails, it is split until the failing terminations are isolated and retried individually, so that
+            a single failing contract does not block the others.
+            With the simulation guard enabled, terminations that fail in simulation are dropped from the group before
+            it is submitted, and each call pays the exact fee for its inner transactions.
+
+        Args:
+            logger (object): Python logger.
+            params_provider (SuggestedParamsProvider): Provider of the transaction parameters.
+            batch_window_s (float, optional): Time for collecting terminations before submitting them. Defaults to 0.5.
+            simulation_guard (SimulationGuard | None, optional): Pre-flight check of the calls. Defaults to None
+                (calls are submitted without simulation).
+        """
+        self.logger = logger
+        self.batch_window_s = batch_window_s
+        self.simulation_guard = simulation_guard or SimulationGuard(logger, enabled=False)
+        self.pending: List[Termination] = []
+        self.flush_task: asyncio.Task | None = None
+        self.params_provider = params_provider
+
+
+    @staticmethod
+    def get_del_app_setup_deadline(
+        del_app_state: DelegatorContractState
+    ) -> int:
+        return del_app_state.setup_deadline
+
+
+    @staticmethod
+    def get_del_app_partkey_confirmation_deadline(
+        del_app_state: DelegatorContractState
+    ) -> int:
+        return del_app_state.partkey_confirmation_deadline
 
-    def update_suggested_params(
-        self,
-        suggested_params: SuggestedParams
-    ):
-        self.suggested_params = suggested_params
+
+    @staticmethod
+    def get_del_app_expiry_deadline(
+        del_app_state: DelegatorContractState
+    ) -> int:
+        return del_app_state.expiry_deadline
 
 
     @staticmethod
     def has_del_app_partkey_confirmation_time_elapsed(
         current_round: int,
-        del_app_state: GlobalState
+        del_app_state: DelegatorContractState
     ) -> bool:
-        del_app_config_man = decode_val_config_man(
-            del_app_state.val_config_man.as_bytes
-        )
-        deadline = \
-            del_app_state.round_start + \
-            del_app_config_man.setup_rounds + \
-            del_app_config_man.confirmation_rounds
+        deadline = Bouncer.get_del_app_partkey_confirmation_deadline(del_app_state)
         return current_round > deadline
 
 
     @staticmethod
     def has_del_app_expired(
         current_round: int,
-        del_app_state: GlobalState
+        del_app_state: DelegatorContractState
     ) -> bool:
-        deadline = del_app_state.round_end
+        deadline = Bouncer.get_del_app_expiry_deadline(del_app_state)
         return current_round > deadline
 
 
     @staticmethod
     def has_del_indefinitely_breached_terms(
         current_round: int,
-        del_app_state: GlobalState
+        del_app_state: DelegatorContractState
     ) -> bool:
-        return False
+        # The contract marks itself as breached once the number of recorded stake limit breaches reaches the maximum
+        return bool(del_app_state.contract_breached)
 
 
-    def end_del_app_due_to_unconfirmed_keys(
+    async def end_del_app_due_to_unconfirmed_keys(
         self,
         del_acc: str,
         del_app_id: int,
         val_app_id: int,
         manager: AddressAndSigner,
-        noticeboard_client
+        noticeboard_client: NoticeboardClient
     ) -> None:
-        result = noticeboard_client.keys_not_confirmed(
-            del_acc=del_acc,
-            transaction_parameters=TransactionParameters(
-                sender=manager.address,
-                signer=manager.signer,
-                foreign_apps=[val_app_id, del_app_id],
-                accounts=[del_acc],
-                suggested_params=self.suggested_params
-            ),
+        """End a delegator contract, whose keys were not confirmed on time, as part of the next batch.
+
+        Args:
+            del_acc (str): Delegator account address.
+            del_app_id (int): Delegator app ID.
+            val_app_id (int): Validator ad app ID.
+            manager (AddressAndSigner): Validator ad manager.
+            noticeboard_client (NoticeboardClient): Noticeboard client.
+
+        Raises:
+            Exception: The termination failed (also when retried individually).
+        """
+        await self._submit_termination(
+            self.METHOD_KEYS_NOT_CONFIRMED, del_acc, del_app_id, val_app_id, manager, noticeboard_client
+        )
+
+
+    async def end_del_app_due_to_expiry(
+        self,
+        del_acc: str,
+        del_app_id: int,
+        val_app_id: int,
+        manager: AddressAndSigner,
+        noticeboard_client: NoticeboardClient
+    ) -> None:
+        """End an expired or breached delegator contract as part of the next batch.
+
+        Args:
+            del_acc (str): Delegator account address.
+            del_app_id (int): Delegator app ID.
+            val_app_id (int): Validator ad app ID.
+            manager (AddressAndSigner): Validator ad manager.
+            noticeboard_client (NoticeboardClient): Noticeboard client.
+
+        Raises:
+            Exception: The termination failed (also when retried individually).
+        """
+        await self._submit_termination(
+            self.METHOD_END_EXPIRED_OR_BREACHED, del_acc, del_app_id, val_app_id, manager, noticeboard_client
         )
-        assert(result)
 
 
-    def end_del_app_due_to_expiry(
+    @classmethod
+    def pack_references(
+        cls,
+        terminations: List[Termination]
+    ) -> List[Tuple[List[int], List[str]]]:
+        """Distribute the apps and accounts, referenced by a group of terminations, over the calls' reference slots.
+
+        Notes:
+            Each app and account is referenced once per group, e.g. the validator ad only in the first call.
+
+        Args:
+            terminations (List[Termination]): Terminations in a group.
+
+        Raises:
+            ValueError: The references do not fit into the group.
+
+        Returns:
+            List[Tuple[List[int], List[str]]]: Foreign apps and accounts of each call.
+        """
+        apps = list(dict.fromkeys(
+            [app_id for t in terminations for app_id in (t.val_app_id, t.del_app_id)]
+        ))
+        accounts = list(dict.fromkeys(t.del_acc for t in terminations))
+        slots = [([], []) for _ in terminations]
+
+        def place(reference, is_account):
+            for foreign_apps, foreign_accounts in slots:
+                if len(foreign_apps) + len(foreign_accounts) >= cls.MAX_REFERENCES_PER_TXN:
+                    continue
+                if is_account:
+                    if len(foreign_accounts) < cls.MAX_ACCOUNTS_PER_TXN:
+                        foreign_accounts.append(reference)
+                        return
+                else:
+                    foreign_apps.append(reference)
+                    return
+            raise ValueError(f'Reference {reference} does not fit into the group of {len(terminations)} calls.')
+
+        for account in accounts:
+            place(account, True)
+        for app_id in apps:
+            place(app_id, False)
+        return slots
+
+
+    async def _submit_termination(
         self,
+        method: str,
         del_acc: str,
         del_app_id: int,
         val_app_id: int,
         manager: AddressAndSigner,
-        noticeboard_client
+        noticeboard_client: NoticeboardClient
     ) -> None:
-        result = noticeboard_client.end_expired_or_breached_delegator_contract(
+        termination = Termination(
+            method=method,
             del_acc=del_acc,
-            transaction_parameters=TransactionParameters(
-                sender=manager.address,
-                signer=manager.signer,
-                foreign_apps=[val_app_id, del_app_id],
-                accounts=[del_acc],
-                suggested_params=self.suggested_params
-            ),
+            del_app_id=del_app_id,
+            val_app_id=val_app_id,
+            manager=manager,
+            noticeboard_client=noticeboard_client,
+            future=asyncio.get_running_loop().create_future()
+        )
+        self.pending.append(termination)
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_after_window())
+        await termination.future
+
+
+    async def _flush_after_window(
+        self
+    ) -> None:
+        await asyncio.sleep(self.batch_window_s)
+        pending, self.pending = self.pending, []
+        self.flush_task = None
+
+        batches: Dict[tuple, List[Termination]] = dict()
+        for termination in pending:
+            if not termination.future.cancelled():
+                batches.setdefault(termination.batch_key, []).append(termination)
+        for terminations in batches.values():
+            for i in range(0, len(terminations), self.MAX_GROUP_SIZE):
+                await self._submit_group(terminations[i:i + self.MAX_GROUP_SIZE])
+
+
+    async def _submit_group(
+        self,
+        terminations: List[Termination]
+    ) -> None:
+        """Submit a group of terminations, isolating the failing ones if the group fails.
+
+        Notes:
+            A failed group is split in halves, which are resubmitted concurrently, until the failing terminations are
+            submitted (and fail) individually. A single failing termination is thus isolated in a logarithmic number of
+            rounds instead of retrying each termination on its own.
+
+        Args:
+            terminations (List[Termination]): Terminations with the same noticeboard, validator ad, and manager.
+        """
+        try:
+            # The generated client is blocking, hence run it in a separate thread
+            outcomes = await asyncio.to_thread(self._execute_group, terminations)
+        except Exception as e:
+            if len(terminations) == 1:
+                self._set_result(terminations[0], e)
+                return
+            self.logger.warning(f'Group of {len(terminations)} terminations failed ({e}), splitting it.')
+            half = len(terminations) // 2
+            await asyncio.gather(
+                self._submit_group(terminations[:half]),
+                self._submit_group(terminations[half:])
+            )
+            return
+        num_of_submitted = 0
+        for termination, outcome in zip(terminations, outcomes):
+            if outcome is None or outcome.would_succeed:
+                num_of_submitted += 1
+                self._set_result(termination)
+            else:
+                self._set_result(termination, SimulationFailedError(
+                    f'Termination of delegator app with ID {termination.del_app_id} would fail: ' +
+                    outcome.failure_message
+                ))
+        if num_of_submitted > 0:
+            self.logger.info(f'Submitted group of {num_of_submitted} terminations.')
+
+
+    def _execute_group(
+        self,
+        terminations: List[Termination]
+    ) -> List[SimulationOutcome | None]:
+
+        def build_composer(idx, suggested_params):
+            group = [terminations[i] for i in idx]
+            composer = group[0].noticeboard_client.compose()
+            for termination, (foreign_apps, accounts), sp in zip(group, self.pack_references(group), suggested_params):
+                getattr(composer, termination.method)(
+                    del_acc=termination.del_acc,
+                    transaction_parameters=TransactionParameters(
+                        sender=termination.manager.address,
+                        signer=termination.manager.signer,
+                        foreign_apps=foreign_apps,
+                        accounts=accounts,
+                        suggested_params=sp
+                    ),
+                )
+            return composer
+
+        outcomes, _ = self.simulation_guard.execute(
+            build_composer,
+            [(t.method, t.del_app_id) for t in terminations],
+            self.params_provider.get()
         )
-        assert(result)
+        return outcomes
+
+
+    @staticmethod
+    def _set_result(
+        termination: Termination,
+        exception: Exception | None = None
+    ) -> None:
+        if termination.future.done():
+            return
+        if exception is None:
+            termination.future.set_result(None)
+        else:
+            termination.future.set_exception(exception)
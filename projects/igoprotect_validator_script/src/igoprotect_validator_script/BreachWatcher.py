@@ -0,0 +1,213 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+from algokit_utils import TransactionParameters
+from algokit_utils.beta.account_manager import AddressAndSigner
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer
+
+from .AsyncAlgodClient import AsyncAlgodClient
+from .ClientRegistry import ClientRegistry
+from .ContractTable import ContractTable
+from .SimulationGuard import SimulationGuard, SimulationOutcome
+from .SuggestedParamsProvider import SuggestedParamsProvider
+
+
+
+class BreachWatcher(object):
+
+    # Delegator contract method, recording a breach of the agreed stake limits
+    METHOD_STAKE_LIMIT_BREACH = 'stake_limit_breach'
+
+    # Protocol limit on the size of a transaction group
+    MAX_GROUP_SIZE = 16
+
+
+    def __init__(
+        self,
+        logger: object,
+        algod_client: AsyncAlgodClient,
+        params_provider: SuggestedParamsProvider,
+        client_registry: ClientRegistry,
+        manager: AddressAndSigner,
+        simulation_guard: SimulationGuard | None = None,
+        min_check_period_rounds: int = 1,
+        max_check_period_rounds: int = 100,
+        batch_size: int = 16
+    ) -> None:
+        """Initialize the watcher of the delegators' stake limits.
+
+        Notes:
+            Only the contracts, for which the delegator contract would accept a new breach according to the rounds
+            (see `ContractTable.get_breach_eligible_mask`), are checked. Their balances are read in batches of
+            `batch_size` concurrent requests, which the caching algod client serves once per round.
+            A balance outside the contract's `min_amt` and `max_amt` is recorded with `stake_limit_breach`, batched
+            into groups of calls. The contract marks itself as breached once it reached `max_breach` breaches, after
+            which the engine terminates it.
+            The check of an account is spread out by its distance to the closer limit, relative to half the range
+            between the limits: from every `min_check_period_rounds` at a limit to every `max_check_period_rounds` in
+            the middle of the range.
+
+        Args:
+            logger (object): Python logger.
+            algod_client (AsyncAlgodClient): Asynchronous algod client, used for reading the balances.
+            params_provider (SuggestedParamsProvider): Provider of the transaction parameters.
+            client_registry (ClientRegistry): Registry of the delegator contract clients.
+            manager (AddressAndSigner): Sender of the calls.
+            simulation_guard (SimulationGuard | None, optional): Pre-flight check of the calls. Defaults to None
+                (calls are submitted without simulation).
+            min_check_period_rounds (int, optional): Rounds between checks of an account at a limit. Defaults to 1.
+            max_check_period_rounds (int, optional): Rounds between checks of an account far from the limits.
+                Defaults to 100.
+            batch_size (int, optional): Number of concurrent balance reads. Defaults to 16.
+        """
+        self.logger = logger
+        self.algod_client = algod_client
+        self.params_provider = params_provider
+        self.client_registry = client_registry
+        self.manager = manager
+        self.simulation_guard = simulation_guard or SimulationGuard(logger, enabled=False)
+        self.min_check_period_rounds = max(1, min_check_period_rounds)
+        self.max_check_period_rounds = max(self.min_check_period_rounds, max_check_period_rounds)
+        self.batch_size = batch_size
+
+        self.next_check_rounds: Dict[int, int] = dict()     # Round of the next balance check of each delegator app
+        self.submitted_breaches: Dict[int, int] = dict()    # Last breach round at the time of the last submission
+        self.num_of_checks = 0
+        self.num_of_breaches = 0
+
+
+    def get_check_period(
+        self,
+        balance: int,
+        min_amt: int,
+        max_amt: int
+    ) -> int:
+        """Get the number of rounds until the next check of a balance.
+
+        Args:
+            balance (int): Balance of the delegator account.
+            min_amt (int): Agreed minimum balance.
+            max_amt (int): Agreed maximum balance.
+
+        Returns:
+            int: Number of rounds.
+        """
+        margin = min(balance - min_amt, max_amt - balance)
+        if margin <= 0:
+            return self.min_check_period_rounds
+        closeness = min(1.0, 2 * margin / max(max_amt - min_amt, 1))
+        span = self.max_check_period_rounds - self.min_check_period_rounds
+        return self.min_check_period_rounds + int(span * closeness)
+
+
+    async def check(
+        self,
+        contract_table: ContractTable,
+        del_apps: Dict[int, dict],
+        current_round: int
+    ) -> int:
+        """Check the balances of the due delegators and record the breaches of the stake limits.
+
+        Args:
+            contract_table (ContractTable): Delegator contracts.
+            del_apps (Dict[int, dict]): Delegator app IDs and states, by app ID.
+            current_round (int): Current round.
+
+        Returns:
+            int: Number of submitted breaches.
+        """
+        eligible_ids = contract_table.app_id[contract_table.get_breach_eligible_mask(current_round)].tolist()
+        self.next_check_rounds = {k: v for k, v in self.next_check_rounds.items() if k in del_apps}
+        self.submitted_breaches = {k: v for k, v in self.submitted_breaches.items() if k in del_apps}
+        due_ids = [
+            del_app_id for del_app_id in eligible_ids
+            if self.next_check_rounds.get(del_app_id, 0) <= current_round and
+            self.submitted_breaches.get(del_app_id) != del_apps[del_app_id]['state'].last_breach_round
+        ]
+        if len(due_ids) == 0:
+            return 0
+        # Taken before any await, as the engine keeps updating the table and the delegator apps in the meantime
+        del_app_states = {del_app_id: del_apps[del_app_id]['state'] for del_app_id in due_ids}
+
+        breached_ids = []
+        for i in range(0, len(due_ids), self.batch_size):
+            batch_ids = due_ids[i:i + self.batch_size]
+            balances = await asyncio.gather(
+                *[self._get_balance(del_app_states[del_app_id].del_acc) for del_app_id in batch_ids],
+                return_exceptions=True
+            )
+            for del_app_id, balance in zip(batch_ids, balances):
+                if isinstance(balance, BaseException):
+                    self.logger.warning(f'Could not read balance of delegator app with ID {del_app_id} ({balance}).')
+                    continue
+                val_config_man = del_app_states[del_app_id].val_config_man
+                self.num_of_checks += 1
+                self.next_check_rounds[del_app_id] = current_round + self.get_check_period(
+                    balance, val_config_man.min_amt, val_config_man.max_amt
+                )
+                if balance < val_config_man.min_amt or balance > val_config_man.max_amt:
+                    self.logger.info(
+                        f'Delegator app with ID {del_app_id} breached the stake limits (balance {balance}, ' +
+                        f'limits {val_config_man.min_amt} - {val_config_man.max_amt}).'
+                    )
+                    breached_ids.append(del_app_id)
+        self.logger.debug(f'Checked the balances of {len(due_ids)} delegator(s), {len(breached_ids)} breached.')
+
+        num_of_submitted = 0
+        for i in range(0, len(breached_ids), self.MAX_GROUP_SIZE):
+            group = [(del_app_id, del_app_states[del_app_id].del_acc) for del_app_id in breached_ids[i:i + self.MAX_GROUP_SIZE]]
+            try:
+                # The generated client is blocking, hence run it in a separate thread
+                outcomes = await asyncio.to_thread(self._execute_group, group)
+            except Exception as e:
+                self.logger.warning(f'Recording {len(group)} stake limit breach(es) failed ({e}).')
+                continue
+            for (del_app_id, _), outcome in zip(group, outcomes):
+                if outcome is None or outcome.would_succeed:
+                    num_of_submitted += 1
+                    self.submitted_breaches[del_app_id] = del_app_states[del_app_id].last_breach_round
+                else:
+                    self.logger.info(
+                        f'Stake limit breach of delegator app with ID {del_app_id} would fail: ' +
+                        outcome.failure_message
+                    )
+        if num_of_submitted > 0:
+            self.num_of_breaches += num_of_submitted
+            self.logger.info(f'Recorded {num_of_submitted} stake limit breach(es).')
+        return num_of_submitted
+
+
+    async def _get_balance(
+        self,
+        del_acc: str
+    ) -> int:
+        return (await self.algod_client.account_info(del_acc, exclude='all'))['amount']
+
+
+    def _execute_group(
+        self,
+        group: List[Tuple[int, str]]
+    ) -> List[SimulationOutcome | None]:
+
+        def build_composer(idx, suggested_params):
+            atc = AtomicTransactionComposer()   # Shared by the calls to the different delegator contracts
+            composer = None
+            for i, sp in zip(idx, suggested_params):
+                del_app_id, del_acc = group[i]
+                composer = self.client_registry.get_delegator_contract_client(del_app_id).compose(atc)
+                composer.stake_limit_breach(
+                    transaction_parameters=TransactionParameters(
+                        sender=self.manager.address,
+                        signer=self.manager.signer,
+                        accounts=[del_acc],
+                        suggested_params=sp
+                    )
+                )
+            return composer
+
+        outcomes, _ = self.simulation_guard.execute(
+            build_composer,
+            [(self.METHOD_STAKE_LIMIT_BREACH, del_app_id) for del_app_id, _ in group],
+            self.params_provider.get()
+        )
+        return outcomes
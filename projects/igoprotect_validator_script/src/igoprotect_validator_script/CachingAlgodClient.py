@@ -0,0 +1,232 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from .AsyncAlgodClient import AsyncAlgodClient
+from .AlgodEndpoints import AlgodEndpointPool
+from .HttpTransport import LatencyStats, RetryPolicy
+from .RateLimiter import RateLimiter
+
+
+
+class CachingAlgodClient(AsyncAlgodClient):
+
+
+    def __init__(
+        self,
+        algod_address: str,
+        algod_token: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout_s: float = 30,
+        connect_timeout_s: float = 5,
+        max_connections: int = 10,
+        retry_policy: RetryPolicy | None = None,
+        latency_stats: LatencyStats | None = None,
+        endpoint_pool: AlgodEndpointPool | None = None,
+        rate_limiter: RateLimiter | None = None,
+        status_ttl_s: float = 0.5
+    ) -> None:
+        """Initialize an asynchronous algod client, which caches the read endpoints per round.
+
+        Notes:
+            The chain state can only change with a new round, hence the responses of `account_info`,
+            `application_info`, and `application_box_by_name` are memoized until the round advances.
+            The round is learned from the responses of `status` and `status_after_block` (and `observe_round`),
+            so that the cache is invalidated as soon as a new round is seen. The status itself is only cached for
+            `status_ttl_s`, since it is the means of noticing new rounds.
+            Concurrent identical requests are coalesced into a single request (single-flight).
+            Cached responses are shared, i.e. must not be modified by the caller.
+
+        Args:
+            algod_address (str): Algod server address, including the port.
+            algod_token (str): Algod API token.
+            headers (Optional[Dict[str, str]], optional): Additional request headers. Defaults to None.
+            timeout_s (float, optional): Request timeout in seconds. Defaults to 30.
+            connect_timeout_s (float, optional): Connection timeout in seconds. Defaults to 5.
+            max_connections (int, optional): Maximum number of pooled connections. Defaults to 10.
+            retry_policy (RetryPolicy | None, optional): Retries of idempotent requests. Defaults to None (default
+                policy).
+            latency_stats (LatencyStats | None, optional): Shared latency statistics. Defaults to None (own).
+            endpoint_pool (AlgodEndpointPool | None, optional): Ranked algod endpoints. Defaults to None (only
+                `algod_address`).
+            rate_limiter (RateLimiter | None, optional): Shared request budget. Defaults to None (unlimited).
+            status_ttl_s (float, optional): Time for which a status response is reused. Defaults to 0.5.
+        """
+        super().__init__(
+            algod_address,
+            algod_token,
+            headers,
+            timeout_s,
+            connect_timeout_s,
+            max_connections,
+            retry_policy,
+            latency_stats,
+            endpoint_pool,
+            rate_limiter
+        )
+        self.status_ttl_s = status_ttl_s
+
+        self.current_round = 0
+        self.cache: Dict[tuple, object] = dict()                # Responses of the current round
+        self.in_flight: Dict[tuple, asyncio.Future] = dict()    # Pending requests of the current round
+        self.status_response: dict | None = None
+        self.status_time = 0.0
+
+        self.num_of_hits = 0
+        self.num_of_misses = 0
+        self.num_of_coalesced = 0
+
+
+    def observe_round(
+        self,
+        round_num: int
+    ) -> None:
+        """Invalidate the cache if the round advanced.
+
+        Args:
+            round_num (int): Latest known round.
+        """
+        if round_num > self.current_round:
+            self.current_round = round_num
+            self.cache.clear()
+            self.in_flight.clear()
+
+
+    async def status(
+        self
+    ) -> dict:
+        """Get the node status, reusing a response not older than `status_ttl_s`.
+
+        Returns:
+            dict: Node status.
+        """
+        if self.status_response is not None and time.monotonic() - self.status_time < self.status_ttl_s:
+            self.num_of_hits += 1
+            return self.status_response
+        response = await self._single_flight(('status',), super().status)
+        if response is not self.status_response:
+            self.status_response = response
+            self.status_time = time.monotonic()
+            self.observe_round(response['last-round'])
+        return response
+
+
+    async def status_after_block(
+        self,
+        round_num: int
+    ) -> dict:
+        """Get the node status as soon as the block after `round_num` is committed.
+
+        Args:
+            round_num (int): Round to wait after.
+
+        Returns:
+            dict: Node status.
+        """
+        response = await self._single_flight(
+            ('status_after_block', round_num),
+            lambda: super(CachingAlgodClient, self).status_after_block(round_num)
+        )
+        self.observe_round(response['last-round'])
+        return response
+
+
+    async def account_info(
+        self,
+        address: str,
+        exclude: Optional[str] = None
+    ) -> dict:
+        """Get the account information, cached for the current round.
+
+        Args:
+            address (str): Account address.
+            exclude (Optional[str], optional): Resources to exclude, e.g. `all`. Defaults to None.
+
+        Returns:
+            dict: Account information.
+        """
+        return await self._cached(
+            ('account_info', address, exclude),
+            lambda: super(CachingAlgodClient, self).account_info(address, exclude)
+        )
+
+
+    async def application_info(
+        self,
+        application_id: int
+    ) -> dict:
+        """Get the application information, cached for the current round.
+
+        Args:
+            application_id (int): Application ID.
+
+        Returns:
+            dict: Application information.
+        """
+        return await self._cached(
+            ('application_info', application_id),
+            lambda: super(CachingAlgodClient, self).application_info(application_id)
+        )
+
+
+    async def application_box_by_name(
+        self,
+        application_id: int,
+        box_name: bytes
+    ) -> dict:
+        """Get a box of an application, cached for the current round.
+
+        Args:
+            application_id (int): Application ID.
+            box_name (bytes): Box name.
+
+        Returns:
+            dict: Box with its name and value (base64 encoded) and the round of the read.
+        """
+        return await self._cached(
+            ('application_box_by_name', application_id, bytes(box_name)),
+            lambda: super(CachingAlgodClient, self).application_box_by_name(application_id, box_name)
+        )
+
+
+    def get_stats(
+        self
+    ) -> dict:
+        """Get the cache statistics.
+
+        Returns:
+            dict: Number of cache hits, misses (requests to algod), and coalesced requests.
+        """
+        return dict(hits=self.num_of_hits, misses=self.num_of_misses, coalesced=self.num_of_coalesced)
+
+
+    async def _cached(
+        self,
+        key: tuple,
+        fetch: Callable[[], Awaitable[object]]
+    ) -> object:
+        if key in self.cache:
+            self.num_of_hits += 1
+            return self.cache[key]
+        round_num = self.current_round
+        response = await self._single_flight(key, fetch)
+        if self.current_round == round_num:     # Do not cache a response of a round that already passed
+            self.cache[key] = response
+        return response
+
+
+    async def _single_flight(
+        self,
+        key: tuple,
+        fetch: Callable[[], Awaitable[object]]
+    ) -> object:
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.num_of_coalesced += 1
+        else:
+            self.num_of_misses += 1
+            future = asyncio.ensure_future(fetch())
+            self.in_flight[key] = future
+            future.add_done_callback(lambda f: self.in_flight.pop(key, None) if self.in_flight.get(key) is f else None)
+        # Shielded, so that a cancelled caller does not cancel the request of the others
+        return await asyncio.shield(future)
@@ -0,0 +1,116 @@
+import threading
+from collections import OrderedDict
+from typing import Type, TypeVar
+
+from algosdk.v2client import algod
+
+from .DelegatorContractClient import DelegatorContractClient
+from .GeneralValidatorAdClient import GeneralValidatorAdClient
+from .NoticeboardClient import NoticeboardClient
+
+
+AppClient = TypeVar('AppClient', DelegatorContractClient, GeneralValidatorAdClient, NoticeboardClient)
+
+
+
+class ClientRegistry(object):
+
+
+    def __init__(
+        self,
+        algod_client: algod.AlgodClient,
+        max_size: int = 1024
+    ) -> None:
+        """Initialize a registry of the generated app clients, reused per app ID.
+
+        Notes:
+            The app specification of each generated client is parsed once, when its module is imported, and shared
+            by all its instances. The registry additionally keeps the latest `max_size` clients (least recently used
+            are dropped), so that repeatedly reading or calling the same app does not construct a new client.
+            Thread-safe, since the clients are used from the threads of the blocking calls.
+
+        Args:
+            algod_client (algod.AlgodClient): Algod client, used by all clients.
+            max_size (int, optional): Maximum number of kept clients. Defaults to 1024.
+        """
+        self.algod_client = algod_client
+        self.max_size = max_size
+        self.clients: OrderedDict[tuple, object] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.num_of_hits = 0
+        self.num_of_misses = 0
+
+
+    def get(
+        self,
+        client_class: Type[AppClient],
+        app_id: int
+    ) -> AppClient:
+        """Get the client of an app, constructing it if it is not kept.
+
+        Args:
+            client_class (Type[AppClient]): Generated client class.
+            app_id (int): App ID.
+
+        Returns:
+            AppClient: Client.
+        """
+        key = (client_class, app_id)
+        with self.lock:
+            client = self.clients.get(key)
+            if client is not None:
+                self.num_of_hits += 1
+                self.clients.move_to_end(key)
+                return client
+            self.num_of_misses += 1
+            client = client_class(algod_client=self.algod_client, app_id=app_id)
+            self.clients[key] = client
+            while len(self.clients) > self.max_size:
+                self.clients.popitem(last=False)
+            return client
+
+
+    def get_delegator_contract_client(
+        self,
+        del_app_id: int
+    ) -> DelegatorContractClient:
+        """Get the client of a delegator contract.
+
+        Args:
+            del_app_id (int): Delegator app ID.
+
+        Returns:
+            DelegatorContractClient: Client.
+        """
+        return self.get(DelegatorContractClient, del_app_id)
+
+
+    def get_validator_ad_client(
+        self,
+        val_app_id: int
+    ) -> GeneralValidatorAdClient:
+        """Get the client of a validator ad.
+
+        Args:
+            val_app_id (int): Validator ad app ID.
+
+        Returns:
+            GeneralValidatorAdClient: Client.
+        """
+        return self.get(GeneralValidatorAdClient, val_app_id)
+
+
+    def get_noticeboard_client(
+        self,
+        noticeboard_app_id: int
+    ) -> NoticeboardClient:
+        """Get the client of a noticeboard.
+
+        Args:
+            noticeboard_app_id (int): Noticeboard app ID.
+
+        Returns:
+            NoticeboardClient: Client.
+        """
+        return self.get(NoticeboardClient, noticeboard_app_id)
@@ -0,0 +1,336 @@
+from typing import Iterable, List
+
+import numpy as np
+
+from .StateModels import DelegatorContractState
+
+
+
+class ContractTable(object):
+
+    # Columns of the table, i.e. the fields of the delegator app states that determine their processing
+    COLUMNS = (
+        'app_id',
+        'round_start',
+        'round_end',
+        'setup_deadline',
+        'confirmation_deadline',
+        'part_keys_deposited',
+        'keys_confirmed',
+        'contract_breached',
+        'num_breach',
+        'last_breach_round',
+        'breach_rounds',
+        'max_breach',
+    )
+
+    # Values are capped, so that they fit into and can be added as 64-bit integers (e.g. a `breach_rounds` of 2^64-1)
+    MAX_VALUE = 2 ** 62
+
+
+    def __init__(
+        self,
+        data: np.ndarray
+    ) -> None:
+        """Initialize a columnar table of delegator contracts.
+
+        Notes:
+            Each row is a contract and each column one of COLUMNS, all stored as 64-bit integers in a single
+            two-dimensional array, sorted by app ID. The columns are exposed as views, e.g. `table.round_end`, so that
+            the lifecycle of contracts is classified with one vectorized mask per event instead of a walk over
+            the contracts.
+            The table is kept across passes: the rows of the re-read contracts are updated or inserted (`upsert`) and
+            those of the deleted ones removed (`remove`), without touching the other rows.
+
+        Args:
+            data (np.ndarray): Array of shape (number of contracts, number of columns), sorted by app ID.
+        """
+        self._set_data(data)
+
+
+    @classmethod
+    def from_del_app_list(
+        cls,
+        del_app_list: List[dict]
+    ) -> 'ContractTable':
+        """Make a table from the decoded delegator apps.
+
+        Args:
+            del_app_list (List[dict]): Delegator app IDs and states (DelegatorContractState).
+
+        Returns:
+            ContractTable: Contract table.
+        """
+        return cls(cls._get_rows(del_app_list))
+
+
+    def __len__(
+        self
+    ) -> int:
+        return self.data.shape[0]
+
+
+    def upsert(
+        self,
+        del_app_list: List[dict]
+    ) -> np.ndarray:
+        """Update the rows of known contracts and insert the rows of new ones.
+
+        Args:
+            del_app_list (List[dict]): Delegator app IDs and states (DelegatorContractState).
+
+        Returns:
+            np.ndarray: App IDs of the contracts, which are new or whose row changed.
+        """
+        rows = self._get_rows(del_app_list)
+        idx = self._get_index(rows[:, 0])
+        is_known = idx >= 0
+        is_changed = ~is_known
+        is_changed[is_known] = np.any(self.data[idx[is_known]] != rows[is_known], axis=1)
+        self.data[idx[is_known]] = rows[is_known]
+        if not np.all(is_known):
+            new_rows = rows[~is_known]
+            self._set_data(np.insert(self.data, np.searchsorted(self.app_id, new_rows[:, 0]), new_rows, axis=0))
+        return rows[is_changed, 0]
+
+
+    def remove(
+        self,
+        app_ids: Iterable[int]
+    ) -> None:
+        """Remove the rows of contracts, e.g. of those that were deleted.
+
+        Args:
+            app_ids (Iterable[int]): Delegator app IDs. Unknown ones are ignored.
+        """
+        idx = self._get_index(np.fromiter(app_ids, dtype=np.int64))
+        if np.any(idx >= 0):
+            self._set_data(np.delete(self.data, idx[idx >= 0], axis=0))
+
+
+    def select(
+        self,
+        app_ids: Iterable[int]
+    ) -> 'ContractTable':
+        """Get a table of a subset of the contracts.
+
+        Args:
+            app_ids (Iterable[int]): Delegator app IDs. Unknown ones are ignored.
+
+        Returns:
+            ContractTable: Contract table with a copy of the rows, sorted by app ID.
+        """
+        idx = self._get_index(np.unique(np.fromiter(app_ids, dtype=np.int64)))
+        return ContractTable(self.data[idx[idx >= 0]])
+
+
+    def get_created_mask(
+        self
+    ) -> np.ndarray:
+        """Get the contracts, for which the keys have not been deposited yet.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return (self.part_keys_deposited == 0) & (self.keys_confirmed == 0)
+
+
+    def get_deposited_mask(
+        self
+    ) -> np.ndarray:
+        """Get the contracts, for which the keys have been deposited but not confirmed yet.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return (self.part_keys_deposited != 0) & (self.keys_confirmed == 0)
+
+
+    def get_active_mask(
+        self
+    ) -> np.ndarray:
+        """Get the contracts, for which the keys have been confirmed.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return self.keys_confirmed != 0
+
+
+    def get_due_for_generation_mask(
+        self,
+        current_round: int
+    ) -> np.ndarray:
+        """Get the created contracts, for which keys can still be generated and deposited before the setup deadline.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return self.get_created_mask() & (current_round <= self.setup_deadline)
+
+
+    def get_unconfirmed_mask(
+        self,
+        current_round: int
+    ) -> np.ndarray:
+        """Get the deposited contracts, whose keys were not confirmed before the confirmation deadline.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return self.get_deposited_mask() & (current_round > self.confirmation_deadline)
+
+
+    def get_expired_mask(
+        self,
+        current_round: int
+    ) -> np.ndarray:
+        """Get the active contracts, which have expired.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return self.get_active_mask() & (current_round > self.round_end)
+
+
+    def get_breached_mask(
+        self
+    ) -> np.ndarray:
+        """Get the active contracts, which marked themselves as breached, i.e. reached the maximum number of breaches.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return self.get_active_mask() & (self.contract_breached != 0)
+
+
+    def get_breach_eligible_mask(
+        self,
+        current_round: int
+    ) -> np.ndarray:
+        """Get the active contracts, for which a new breach can be recorded.
+
+        Notes:
+            Mirrors the round conditions of the delegator contract's `stake_limit_breach`: not yet breached, more
+            than `breach_rounds` since the last breach, and within the contract's validity.
+            Whether the delegator actually breached the terms is not known from the contract state.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        return \
+            self.get_active_mask() & \
+            (self.contract_breached == 0) & \
+            (self.last_breach_round + self.breach_rounds < current_round) & \
+            (self.round_start < current_round) & \
+            (current_round < self.round_end)
+
+
+    def get_next_due_rounds(
+        self,
+        current_round: int
+    ) -> np.ndarray:
+        """Get the round, from which on each contract is due for an event, as long as its state does not change.
+
+        Notes:
+            The created contracts are due for the generation of their keys and the breached ones for their
+            termination right away. The deposited contracts are due after their confirmation deadline and the
+            active ones after their end.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            np.ndarray: Rounds.
+        """
+        return np.select(
+            [self.get_breached_mask(), self.get_active_mask(), self.get_deposited_mask()],
+            [current_round, self.round_end + 1, self.confirmation_deadline + 1],
+            default=current_round
+        )
+
+
+    def get_changed_mask(
+        self,
+        previous: 'ContractTable | None'
+    ) -> np.ndarray:
+        """Get the contracts, which are new or whose row changed since a previous table.
+
+        Args:
+            previous (ContractTable | None): Previous table.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        if previous is None or len(previous) == 0:
+            return np.ones(len(self), dtype=bool)
+        idx = np.minimum(np.searchsorted(previous.app_id, self.app_id), len(previous) - 1)
+        is_same = (previous.app_id[idx] == self.app_id) & np.all(previous.data[idx] == self.data, axis=1)
+        return ~is_same
+
+
+    def _set_data(
+        self,
+        data: np.ndarray
+    ) -> None:
+        self.data = data
+        for i, column in enumerate(self.COLUMNS):
+            setattr(self, column, data[:, i])
+
+
+    def _get_index(
+        self,
+        app_ids: np.ndarray
+    ) -> np.ndarray:
+        """Get the row of each app ID, or -1 for the unknown ones."""
+        if len(self) == 0:
+            return np.full(len(app_ids), -1, dtype=np.int64)
+        idx = np.minimum(np.searchsorted(self.app_id, app_ids), len(self) - 1)
+        return np.where(self.app_id[idx] == app_ids, idx, -1)
+
+
+    @classmethod
+    def _get_rows(
+        cls,
+        del_app_list: List[dict]
+    ) -> np.ndarray:
+        """Get the rows of the decoded delegator apps, capped at MAX_VALUE and sorted by app ID."""
+        data = np.array(
+            [cls._get_row(del_app['id'], del_app['state']) for del_app in del_app_list],
+            dtype=np.uint64     # Holds the uncapped values, e.g. 2^64-1
+        ).reshape(-1, len(cls.COLUMNS))
+        data = np.minimum(data, np.uint64(cls.MAX_VALUE)).astype(np.int64)
+        return data[np.argsort(data[:, 0], kind='stable')]
+
+
+    @staticmethod
+    def _get_row(
+        del_app_id: int,
+        del_app_state: DelegatorContractState
+    ) -> tuple:
+        return (
+            del_app_id,
+            del_app_state.round_start,
+            del_app_state.round_end,
+            del_app_state.setup_deadline,
+            del_app_state.partkey_confirmation_deadline,
+            del_app_state.part_keys_deposited,
+            del_app_state.keys_confirmed,
+            del_app_state.contract_breached,
+            del_app_state.num_breach,
+            del_app_state.last_breach_round,
+            del_app_state.val_config_man.breach_rounds,
+            del_app_state.val_config_man.max_breach,
+        )
@@ -0,0 +1,740 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from algokit_utils.beta.account_manager import AddressAndSigner
+from algosdk import error
+from algosdk.logic import get_application_address
+
+from .AsyncAlgodClient import AsyncAlgodClient
+from .BlockFollower import BlockEvents, BlockFollower, Keyreg
+from .BreachWatcher import BreachWatcher
+from .Bouncer import Bouncer
+from .ContractTable import ContractTable
+from .KeygenPool import KeygenPool
+from .Locksmith import Locksmith
+from .NoticeboardClient import NoticeboardClient
+from .ParticipationHealth import ParticipationHealth
+from .Scheduler import DeadlineScheduler
+from .SuggestedParamsProvider import SuggestedParamsProvider
+from .utils import decode_del_app_from_app_info, decode_del_app_list_from_account_info
+
+
+
+class Engine(object):
+
+    # Lifecycle events of the delegator apps, each due when its mask over the contract table is set
+    EVENT_GENERATE = 'generate'                 # Keys should be generated and deposited
+    EVENT_CONFIRMATION = 'confirmation'         # Deadline for the delegator to confirm the keys has passed
+    EVENT_EXPIRY = 'expiry'                     # Contract has expired or was breached
+    EVENT_DEREGISTRATION = 'deregistration'     # Delegator went offline or registered other keys
+
+    # Number of passes between logging the latency statistics and the request budget of the endpoints
+    LATENCY_REPORT_PERIOD_PASSES = 100
+
+
+    def __init__(
+        self,
+        logger: object,
+        algod_client: AsyncAlgodClient,
+        params_provider: SuggestedParamsProvider,
+        locksmith: Locksmith,
+        bouncer: Bouncer,
+        noticeboard_client: NoticeboardClient,
+        manager: AddressAndSigner,
+        val_app_id: int,
+        max_concurrency: int = 4,
+        keygen_workers: int = 2,
+        loop_mode: str = 'block',
+        round_period: int = 1,
+        loop_period_s: int = 10,
+        breach_watcher: BreachWatcher | None = None,
+        block_follower: BlockFollower | None = None,
+        full_scan_period_rounds: int = 1000,
+        participation_health: ParticipationHealth | None = None,
+        keep_deregistered_partkeys: bool = False
+    ) -> None:
+        """Initialize the asynchronous engine, which processes the delegator contracts of a validator ad.
+
+        Notes:
+            Each delegator contract is processed in its own task, with at most one task per delegator.
+            At most `max_concurrency` tasks run an operation on the node or submit a deposit at the same time.
+            Terminations are batched by the bouncer, so waiting for them does not count towards this limit.
+            A pass does not wait for the tasks it spawned, so that e.g. a slow key generation does not delay the
+            handling of other contracts in the succeeding passes.
+            The contracts are kept in a columnar table, in which only the rows of the re-read contracts are updated,
+            and which is only rebuilt when all contracts are read. The next deadline of each new or changed contract
+            is scheduled on a heap, so that a pass only evaluates the contracts, whose state changed or whose deadline
+            has arrived, with one vectorized mask per event. Once an event was handled, it is not handled again for
+            the same contract until its state changes (e.g. when a node, lagging behind, still returns the previous
+            state), or until the handling failed.
+            Keys are generated by a separate pool of `keygen_workers` workers, earliest setup deadline first, and each
+            key is deposited as soon as it is generated.
+            The stake limits of the delegators are checked by the breach watcher in a background task, at most one at
+            a time, and the contracts that marked themselves as breached are terminated like the expired ones.
+            With a block follower, the contracts created or called in the blocks since the previous pass are read
+            individually, so that a new contract is handled about a block after its creation without reading all
+            contracts. All contracts are still read on the first pass, when blocks were skipped, and every
+            `full_scan_period_rounds` rounds.
+            The key registrations in the followed blocks are compared with the keys of the contracts. A delegator,
+            who went offline or registered other keys, is marked as deregistered until the deposited keys are
+            registered again. As the delegator contract does not accept a report of it from the script yet
+            (`dereg_breach`), the contract is kept, whereas the partkey of a deregistered delegator is deleted from the
+            node, unless `keep_deregistered_partkeys` is set (then it is only deleted once the contract ends).
+            A delegator, who registers the deposited keys after their partkey was deleted, is warned about.
+            The participation of the hosted delegators is tracked from the proposers of the followed blocks and from
+            periodic samples of their partkeys, the latter in a background task, at most one at a time.
+
+        Args:
+            logger (object): Python logger.
+            algod_client (AsyncAlgodClient): Asynchronous algod client, used for reading the chain.
+            params_provider (SuggestedParamsProvider): Provider of the transaction parameters, shared with the
+                locksmith and bouncer, and advanced to the round of each pass.
+            locksmith (Locksmith): Participation key manager.
+            bouncer (Bouncer): Contract lifecycle manager.
+            noticeboard_client (NoticeboardClient): Noticeboard client, used for issuing transactions.
+            manager (AddressAndSigner): Validator ad manager.
+            val_app_id (int): Validator ad app ID.
+            max_concurrency (int, optional): Maximum number of concurrent partkey deletions and deposits. Defaults to 4.
+            keygen_workers (int, optional): Maximum number of concurrently generated keys. Defaults to 2.
+            loop_mode (str, optional): Either `block` or `sleep`. Defaults to `block`.
+            round_period (int, optional): Number of rounds between passes in `block` mode. Defaults to 1.
+            loop_period_s (int, optional): Number of seconds between passes in `sleep` mode. Defaults to 10.
+            breach_watcher (BreachWatcher | None, optional): Watcher of the delegators' stake limits. Defaults to None
+                (stake limits are not checked).
+            block_follower (BlockFollower | None, optional): Follower of the blocks. Defaults to None (all contracts are
+                read on each pass).
+            full_scan_period_rounds (int, optional): Number of rounds between reading all contracts when following
+                the blocks. Defaults to 1000.
+            participation_health (ParticipationHealth | None, optional): Tracking of the delegators' participation.
+                Defaults to None (not tracked).
+            keep_deregistered_partkeys (bool, optional): Flag, indicating whether to keep the partkey of a
+                deregistered delegator until the contract ends. Defaults to False (the partkey is deleted).
+        """
+        self.logger = logger
+        self.algod_client = algod_client
+        self.params_provider = params_provider
+        self.locksmith = locksmith
+        self.bouncer = bouncer
+        self.noticeboard_client = noticeboard_client
+        self.manager = manager
+        self.val_app_id = val_app_id
+        self.val_app_address = get_application_address(val_app_id)
+        self.loop_mode = loop_mode
+        self.round_period = round_period
+        self.loop_period_s = loop_period_s
+        self.breach_watcher = breach_watcher
+        self.block_follower = block_follower
+        self.full_scan_period_rounds = full_scan_period_rounds
+        self.last_full_scan_round = None
+        self.participation_health = participation_health
+        self.keep_deregistered_partkeys = keep_deregistered_partkeys
+
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.keygen_pool = KeygenPool(logger, locksmith, keygen_workers)
+        self.in_flight: Dict[str, asyncio.Task] = dict()    # Task currently processing each delegator
+        self.breach_task: asyncio.Task | None = None        # Task currently checking the stake limits
+        self.health_task: asyncio.Task | None = None        # Task currently sampling the participation
+        self.last_processed_round = None
+        self.num_of_passes = 0
+
+        self.contract_table: ContractTable | None = None    # Latest state of the delegator apps
+        self.scheduler = DeadlineScheduler()                # Round, at which each delegator app is due for evaluation
+        self.del_apps: Dict[int, dict] = dict()             # Latest state of each delegator app
+        self.handled_events: Dict[int, str] = dict()        # Event handled for the current state of a delegator app
+        self.del_app_ids_by_acc: Dict[str, int] = dict()    # Delegator app of each delegator account
+        self.deregistered: Dict[int, int] = dict()          # Round of the deregistration of each delegator app
+        self.deleted_partkeys: Dict[int, int] = dict()      # Round of the deletion of the partkey of each delegator app
+        self.event_handlers = {
+            self.EVENT_GENERATE: self.process_created_del_app,
+            self.EVENT_CONFIRMATION: self.process_deposited_del_app,
+            self.EVENT_EXPIRY: self.process_active_del_app,
+            self.EVENT_DEREGISTRATION: self.process_deregistered_del_app,
+        }
+
+
+    async def run(
+        self
+    ) -> None:
+        """Continuously run passes over the delegator contracts."""
+        while True:
+
+            current_round = await self.wait_for_pass_round()
+            start_time = time.time()
+
+            self.logger.debug(f"Started new validator loop.")
+            try:
+                await self.run_pass(current_round)
+            except Exception as e:
+                self.logger.warning(f"Encountered exception {e}")
+                self.params_provider.invalidate()   # In case the parameters caused it, e.g. a changed fee
+            self.last_processed_round = current_round
+            self.num_of_passes += 1
+            if self.num_of_passes % self.LATENCY_REPORT_PERIOD_PASSES == 0:
+                self.logger.info(f'Algod latency: {self.algod_client.latency_stats.summary()}')
+                if self.algod_client.rate_limiter is not None:
+                    self.logger.info(f'Request budget: {self.algod_client.rate_limiter.summary()}')
+
+            if self.loop_mode == 'sleep':
+                elapsed_time_s = time.time() - start_time
+                slept = max(self.loop_period_s - elapsed_time_s, 0.0)
+                await asyncio.sleep(slept)
+                self.logger.debug(f'Waking up after sleeping {round(slept, 1)} seconds')
+            else:
+                self.logger.debug(
+                    f'Finished pass for round {current_round} in {round(time.time() - start_time, 1)} seconds'
+                )
+
+
+    async def close(
+        self
+    ) -> None:
+        """Stop the key generation, the background and processing tasks, and close the connections.
+
+        Notes:
+            Stopping the key generation kills the running `goal` commands.
+        """
+        await self.keygen_pool.close()
+        tasks = [task for task in (self.breach_task, self.health_task) if task is not None]
+        tasks += list(self.in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.locksmith.part_key_fetcher.close()
+        await self.algod_client.close()
+
+
+    async def wait_for_pass_round(
+        self
+    ) -> int:
+        """Get the round at which to run the next pass.
+
+        Notes:
+            In `block` mode, waits through algod's `status/wait-for-block-after` endpoint until the chain has advanced
+            by at least `round_period` rounds since the last pass.
+
+        Returns:
+            int: Current round.
+        """
+        current_round = (await self.algod_client.status())['last-round']
+        if self.loop_mode != 'block' or self.last_processed_round is None:
+            return current_round
+        target_round = self.last_processed_round + max(self.round_period, 1)
+        while current_round < target_round:
+            current_round = (await self.algod_client.status_after_block(current_round))['last-round']
+        return current_round
+
+
+    async def run_pass(
+        self,
+        current_round: int
+    ) -> None:
+        """Fetch the delegator contracts and spawn a processing task for each one that requires attention.
+
+        Args:
+            current_round (int): Current round.
+        """
+        self.keygen_pool.update_current_round(current_round)
+
+        ### Advance transaction parameters ###
+        # Only fetched from algod when the validity window is about to elapse or the fees are due for a check.
+        await self.params_provider.observe_round(current_round)
+
+        ### Refresh partkey snapshot ###
+        # Only if it was invalidated, i.e. on the first pass and after key generation in the previous passes.
+        await self.locksmith.part_key_fetcher.get_partkey_snapshot()
+
+        ### Follow the blocks since the previous pass ###
+        block_events = None
+        if self.block_follower is not None:
+            block_events = await self.block_follower.follow(current_round)
+
+        ### Fetch delegator contracts, associated with this validator ###
+        del_app_list, deleted_app_ids = await self.fetch_del_app_list(current_round, block_events)
+
+        ### Update the delegator contracts ###
+        self.update_del_apps(del_app_list, deleted_app_ids, current_round)
+
+        ### Track the keys of the active contracts ###
+        if block_events is not None and block_events.keyregs:
+            self.track_keyregs(block_events.keyregs)
+
+        ### Spawn processing tasks for the due events ###
+        # Only the contracts, which changed, reached their deadline, or are retried, are evaluated.
+        contract_table = self.contract_table.select(self.scheduler.pop_due(current_round))
+        due_masks = (
+            (self.EVENT_GENERATE, contract_table.get_due_for_generation_mask(current_round)),
+            (self.EVENT_CONFIRMATION, contract_table.get_unconfirmed_mask(current_round)),
+            (self.EVENT_EXPIRY, contract_table.get_expired_mask(current_round) | contract_table.get_breached_mask()),
+        )
+        num_of_spawned = 0
+        for event, due_mask in due_masks:
+            for del_app_id in contract_table.app_id[due_mask].tolist():
+                if self.handled_events.get(del_app_id) == event:
+                    continue
+                if self._spawn(self.del_apps[del_app_id], current_round, event):
+                    num_of_spawned += 1
+                else:
+                    self.scheduler.schedule(del_app_id, current_round + 1)  # Retry once the delegator is free
+        # Deadlines, which have not arrived yet (e.g. the end of a contract, whose keys were just confirmed)
+        next_due_rounds = contract_table.get_next_due_rounds(current_round)
+        is_pending = next_due_rounds > current_round
+        for del_app_id, due_round in zip(
+            contract_table.app_id[is_pending].tolist(),
+            next_due_rounds[is_pending].tolist()
+        ):
+            self.scheduler.schedule(del_app_id, due_round)
+        # Partkeys of the deregistered delegators, which have not been deleted yet
+        if not self.keep_deregistered_partkeys:
+            for del_app_id in list(self.deregistered):
+                if del_app_id in self.deleted_partkeys or \
+                        self.handled_events.get(del_app_id) == self.EVENT_DEREGISTRATION:
+                    continue
+                if self._spawn(self.del_apps[del_app_id], current_round, self.EVENT_DEREGISTRATION):
+                    num_of_spawned += 1
+        self.logger.debug(
+            f'Evaluated {len(contract_table)} delegator contract(s), spawned {num_of_spawned} task(s), ' +
+            f'{len(self.scheduler)} scheduled.'
+        )
+
+        ### Check the stake limits ###
+        # In the background, so that reading the balances does not delay the succeeding passes.
+        if self.breach_watcher is not None and (self.breach_task is None or self.breach_task.done()):
+            self.breach_task = asyncio.create_task(
+                self._run_breach_watcher(self.contract_table, self.del_apps, current_round)
+            )
+
+        ### Track the participation ###
+        if self.participation_health is not None:
+            if block_events is not None:
+                self.participation_health.record_proposers(block_events.proposers)
+            if self.participation_health.is_sample_due(current_round) and \
+                    (self.health_task is None or self.health_task.done()):
+                self.health_task = asyncio.create_task(self._run_participation_health(current_round, self.del_apps))
+
+        self.keygen_pool.report()
+
+
+    async def fetch_del_app_list(
+        self,
+        current_round: int,
+        events: BlockEvents | None = None
+    ) -> Tuple[List[dict], List[int] | None]:
+        """Fetch the delegator contracts, either all of them or only those created or called since the previous pass.
+
+        Args:
+            current_round (int): Current round.
+            events (BlockEvents | None, optional): Events of the blocks since the previous pass. Defaults to None
+                (all contracts are read).
+
+        Returns:
+            Tuple[List[dict], List[int] | None]: Read delegator app IDs and states, and the IDs of the deleted
+                delegator apps, or None if all delegator apps were read.
+        """
+        if events is not None:
+            is_scan_due = (
+                not events.is_complete or
+                self.last_full_scan_round is None or
+                current_round - self.last_full_scan_round >= self.full_scan_period_rounds
+            )
+            if not is_scan_due:
+                try:
+                    return await self.refresh_del_apps(
+                        set(events.created_app_ids) | (events.touched_app_ids & self.del_apps.keys())
+                    )
+                except Exception as e:
+                    self.logger.warning(f"Refreshing the delegator apps failed ({e}), reading all of them.")
+
+        del_app_list = decode_del_app_list_from_account_info(
+            await self.algod_client.account_info(self.val_app_address),
+            self.val_app_id
+        )
+        self.last_full_scan_round = current_round
+        return del_app_list, None
+
+
+    async def refresh_del_apps(
+        self,
+        app_ids: set
+    ) -> Tuple[List[dict], List[int]]:
+        """Read again the given delegator contracts.
+
+        Notes:
+            Contracts that no longer exist (i.e. were deleted on termination) are reported as deleted, and apps that
+            are not delegator contracts of this validator are ignored.
+
+        Args:
+            app_ids (set): IDs of the created or called delegator apps.
+
+        Returns:
+            Tuple[List[dict], List[int]]: Read delegator app IDs and states, sorted by app ID, and the IDs of the
+                deleted delegator apps.
+        """
+        del_app_list, deleted_app_ids = [], []
+        app_ids = sorted(app_ids)
+        app_infos = await asyncio.gather(
+            *[self.algod_client.application_info(app_id) for app_id in app_ids],
+            return_exceptions=True
+        )
+        for app_id, app_info in zip(app_ids, app_infos):
+            if isinstance(app_info, error.AlgodHTTPError) and app_info.code == 404:
+                deleted_app_ids.append(app_id)
+                continue
+            if isinstance(app_info, BaseException):
+                raise app_info
+            del_app = decode_del_app_from_app_info(app_info, self.val_app_id)
+            if del_app is not None:
+                del_app_list.append(del_app)
+        return del_app_list, deleted_app_ids
+
+
+    def update_del_apps(
+        self,
+        del_app_list: List[dict],
+        deleted_app_ids: List[int] | None,
+        current_round: int
+    ) -> None:
+        """Merge the read delegator contracts into the known ones and schedule the new or changed ones.
+
+        Notes:
+            With all contracts read, the table is rebuilt and the contracts, which were not read, are forgotten.
+            Otherwise, only the rows of the read and deleted contracts are updated.
+            A new or changed contract is due for evaluation right away, i.e. its handled event is reset.
+
+        Args:
+            del_app_list (List[dict]): Read delegator app IDs and states.
+            deleted_app_ids (List[int] | None): IDs of the deleted delegator apps, or None if all of them were read.
+            current_round (int): Current round.
+        """
+        if deleted_app_ids is None or self.contract_table is None:
+            contract_table = ContractTable.from_del_app_list(del_app_list)
+            changed_app_ids = contract_table.app_id[contract_table.get_changed_mask(self.contract_table)].tolist()
+            del_apps = {del_app['id']: del_app for del_app in del_app_list}
+            deleted_app_ids = [del_app_id for del_app_id in self.del_apps if del_app_id not in del_apps]
+            self.contract_table, self.del_apps = contract_table, del_apps
+            self.del_app_ids_by_acc = {del_app['state'].del_acc: del_app['id'] for del_app in del_app_list}
+            self.logger.debug(
+                f'The following number of delegator contracts was found ({len(contract_table)} in total): ' +
+                f'{contract_table.get_active_mask().sum()} active, ' +
+                f'{contract_table.get_deposited_mask().sum()} deposited, and ' +
+                f'{contract_table.get_created_mask().sum()} created.'
+            )
+        else:
+            changed_app_ids = self.contract_table.upsert(del_app_list).tolist()
+            self.contract_table.remove(deleted_app_ids)
+            for del_app in del_app_list:
+                self.del_apps[del_app['id']] = del_app
+                self.del_app_ids_by_acc[del_app['state'].del_acc] = del_app['id']
+            for del_app_id in deleted_app_ids:
+                del_app = self.del_apps.pop(del_app_id, None)
+                if del_app is not None and self.del_app_ids_by_acc.get(del_app['state'].del_acc) == del_app_id:
+                    del self.del_app_ids_by_acc[del_app['state'].del_acc]
+
+        for del_app_id in deleted_app_ids:
+            self.scheduler.discard(del_app_id)
+            self.handled_events.pop(del_app_id, None)
+            self.deregistered.pop(del_app_id, None)
+            self.deleted_partkeys.pop(del_app_id, None)
+        for del_app_id in changed_app_ids:
+            self.scheduler.schedule(del_app_id, current_round)
+            self.handled_events.pop(del_app_id, None)
+            del_app_state = self.del_apps[del_app_id]['state']
+            if self.participation_health is not None and del_app_state.keys_confirmed:
+                self.participation_health.track(del_app_state.del_acc)
+
+
+    def track_keyregs(
+        self,
+        keyregs: List[Keyreg]
+    ) -> None:
+        """Compare the key registrations of the delegators with the keys deposited to their contracts.
+
+        Notes:
+            Going offline or registering keys other than the deposited ones marks an active contract as
+            deregistered, whereas registering the deposited keys again (e.g. the registration that confirmed them)
+            clears the mark, unless the partkey of the deregistered delegator was already deleted.
+            Registering the deposited keys, whose partkey was already deleted from the node (e.g. a confirmation after
+            the deadline), leaves the delegator online with keys that no participation node holds, which is warned
+            about.
+
+        Args:
+            keyregs (List[Keyreg]): Key registrations, in the order of the blocks.
+        """
+        for keyreg in keyregs:
+            del_app_id = self.del_app_ids_by_acc.get(keyreg.sender)
+            if del_app_id is None:
+                continue
+            del_app_state = self.del_apps[del_app_id]['state']
+            if keyreg.vote_key == del_app_state.vote_key and keyreg.sel_key == del_app_state.sel_key:
+                if self.deregistered.pop(del_app_id, None) is not None:
+                    self.logger.info(
+                        f'Delegator of app with ID {del_app_id} registered the deposited keys again in round ' +
+                        f'{keyreg.round_num}.'
+                    )
+                if del_app_id in self.deleted_partkeys:
+                    self.logger.warning(
+                        f'Delegator of app with ID {del_app_id} registered the deposited keys in round ' +
+                        f'{keyreg.round_num}, but their partkey was deleted from the node in round ' +
+                        f'{self.deleted_partkeys[del_app_id]}. The delegator is not participating.'
+                    )
+                continue
+            if not del_app_state.keys_confirmed or del_app_state.contract_breached:
+                continue
+            self.logger.warning(
+                f'Delegator of app with ID {del_app_id} ' +
+                ('went offline' if keyreg.is_offline else 'registered other keys') + f' in round {keyreg.round_num}. ' +
+                'The contract does not accept a report of it yet, so the contract is kept' +
+                (' together with the partkey.' if self.keep_deregistered_partkeys else ', but the partkey is deleted.')
+            )
+            self.deregistered[del_app_id] = keyreg.round_num
+
+
+    def retry_del_app(
+        self,
+        del_app_id: int
+    ) -> None:
+        """Mark a delegator contract for re-evaluation in the next pass (e.g. after a failed transaction).
+
+        Args:
+            del_app_id (int): Delegator app ID.
+        """
+        self.handled_events.pop(del_app_id, None)
+        self.scheduler.schedule(del_app_id, 0)
+
+
+    async def _run_breach_watcher(
+        self,
+        contract_table: ContractTable,
+        del_apps: Dict[int, dict],
+        current_round: int
+    ) -> None:
+        try:
+            await self.breach_watcher.check(contract_table, del_apps, current_round)
+        except Exception as e:
+            self.logger.warning(f"Checking the stake limits failed ({e}).")
+
+
+    async def _run_participation_health(
+        self,
+        current_round: int,
+        del_apps: Dict[int, dict]
+    ) -> None:
+        try:
+            await self.participation_health.sample(current_round, del_apps)
+        except Exception as e:
+            self.logger.warning(f"Sampling the participation failed ({e}).")
+
+
+    def _spawn(
+        self,
+        del_app: dict,
+        current_round: int,
+        event: str
+    ) -> bool:
+        """Spawn a processing task for a delegator contract, unless the delegator is already being processed.
+
+        Args:
+            del_app (dict): Delegator app ID and state.
+            current_round (int): Current round.
+            event (str): Due event, determining the processing coroutine.
+
+        Returns:
+            bool: Flag, indicating whether the task was spawned.
+        """
+        del_acc = del_app['state'].del_acc
+        if del_acc in self.in_flight:
+            self.logger.debug(f"Delegator app with ID {del_app['id']} is still being processed.")
+            return False
+        self.handled_events[del_app['id']] = event   # Until the task fails
+        task = asyncio.create_task(self._run_task(del_app, del_acc, current_round, self.event_handlers[event]))
+        self.in_flight[del_acc] = task
+        task.add_done_callback(lambda _: self.in_flight.pop(del_acc, None))
+        return True
+
+
+    async def _run_task(
+        self,
+        del_app: dict,
+        del_acc: str,
+        current_round: int,
+        handler: Callable[[dict, str, int], Awaitable[None]]
+    ) -> None:
+        """Run the handler and log any uncaught exception.
+
+        Notes:
+            A failed delegator contract is re-evaluated in the next pass.
+
+        Args:
+            del_app (dict): Delegator app ID and state.
+            del_acc (str): Delegator account address.
+            current_round (int): Current round.
+            handler (Callable[[dict, str, int], Awaitable[None]]): Processing coroutine.
+        """
+        try:
+            await handler(del_app, del_acc, current_round)
+        except Exception as e:
+            self.logger.warning(f"Encountered exception {e}")
+            self.retry_del_app(del_app['id'])
+
+
+    async def process_created_del_app(
+        self,
+        del_app: dict,
+        del_acc: str,
+        current_round: int
+    ) -> None:
+        """Generate and deposit the participation keys for a freshly-created delegator contract.
+
+        Notes:
+            Waiting for the key generation pool does not count towards the concurrency limit, the deposit does.
+
+        Args:
+            del_app (dict): Delegator app ID and state.
+            del_acc (str): Delegator account address.
+            current_round (int): Current round.
+        """
+        setup_deadline = Bouncer.get_del_app_setup_deadline(del_app['state'])
+        if current_round > setup_deadline:
+            self.logger.info(f"Setup deadline passed for delegator app with ID {del_app['id']}, not generating partkey.")
+            return
+
+        partkey = await self.keygen_pool.generate_partkey(
+            del_app['id'],
+            del_acc,
+            del_app['state'].round_start,
+            del_app['state'].round_end,
+            setup_deadline
+        )
+        self.logger.info(f"Generated partkey for delegator app with ID {del_app['id']}.")
+
+        async with self.semaphore:
+            self.logger.info(f"Depositing partkey for delegator app with ID {del_app['id']}.")
+            result = await self.locksmith.deposit_partkey(
+                partkey,
+                self.noticeboard_client,
+                del_acc,
+                self.manager,
+                del_app['id'],
+                self.val_app_id
+            )
+            self.logger.info(f"Deposited partkey.")
+            assert(result)
+
+
+    async def process_deposited_del_app(
+        self,
+        del_app: dict,
+        del_acc: str,
+        current_round: int
+    ) -> None:
+        """Terminate a delegator contract whose keys were not confirmed in time.
+
+        Args:
+            del_app (dict): Delegator app ID and state.
+            del_acc (str): Delegator account address.
+            current_round (int): Current round.
+        """
+        if not Bouncer.has_del_app_partkey_confirmation_time_elapsed(current_round, del_app['state']):
+            return
+
+        self.logger.info(f"Partkeys not confirmed on time for delegator app with ID {del_app['id']}.")
+        if del_app['id'] not in self.deleted_partkeys:   # Not again when retrying the termination
+            self.logger.info(f"Deleting keys for delegator app with ID {del_app['id']}.")
+            try:
+                async with self.semaphore:
+                    await self.locksmith.delete_del_app_partkey(del_acc)
+                self.deleted_partkeys[del_app['id']] = current_round
+                self.logger.info(f"Partkeys deleted.")
+            except Exception as e:
+                self.logger.warning(f"Encountered exception {e}")
+
+        self.logger.info(f"Terminating unconfirmed delegator app with ID {del_app['id']}.")
+        await self.bouncer.end_del_app_due_to_unconfirmed_keys(
+            del_acc,
+            del_app['id'],
+            self.val_app_id,
+            self.manager,
+            self.noticeboard_client
+        )
+        self.logger.info(f"Contract terminated.")
+
+
+    async def process_active_del_app(
+        self,
+        del_app: dict,
+        del_acc: str,
+        current_round: int
+    ) -> None:
+        """Terminate an active delegator contract if it has expired or if the delegator has breached the terms.
+
+        Args:
+            del_app (dict): Delegator app ID and state.
+            del_acc (str): Delegator account address.
+            current_round (int): Current round.
+        """
+        has_del_app_expired = Bouncer.has_del_app_expired(current_round, del_app['state'])
+        has_del_indefinitely_breached_terms = Bouncer.has_del_indefinitely_breached_terms(
+            current_round,
+            del_app['state']
+        )
+        if not (has_del_app_expired or has_del_indefinitely_breached_terms):
+            return
+
+        if has_del_app_expired:
+            self.logger.info(f"Terminating expired delegator app with ID {del_app['id']}.")
+        else:
+            self.logger.info(f"Terminating breached-terms delegator app with ID {del_app['id']}.")
+        try:
+            await self.bouncer.end_del_app_due_to_expiry(
+                del_acc,
+                del_app['id'],
+                self.val_app_id,
+                self.manager,
+                self.noticeboard_client
+            )
+            self.logger.info(f"Contract terminated.")
+        except Exception as e:
+            self.logger.warning(f"Encountered exception {e}")
+            self.retry_del_app(del_app['id'])
+
+        if del_app['id'] in self.deleted_partkeys:  # Not again when retrying the termination
+            return
+        try:
+            async with self.semaphore:
+                await self.locksmith.delete_del_app_partkey(del_acc)
+            self.logger.info('Deleted partkeys.')
+        except Exception:
+            self.logger.info('Tried deleting non-existent partkeys (expected behavior for expired delegator app).')
+        self.deleted_partkeys[del_app['id']] = current_round
+
+
+    async def process_deregistered_del_app(
+        self,
+        del_app: dict,
+        del_acc: str,
+        current_round: int
+    ) -> None:
+        """Delete the partkey of a delegator, who went offline or registered other keys.
+
+        Notes:
+            The contract is kept, since it does not accept a report of the deregistration from the script yet.
+            A partkey, which is no longer on the node, is considered deleted.
+
+        Args:
+            del_app (dict): Delegator app ID and state.
+            del_acc (str): Delegator account address.
+            current_round (int): Current round.
+        """
+        if del_app['id'] not in self.deregistered or del_app['id'] in self.deleted_partkeys:
+            return  # Registered the deposited keys again or the partkey was deleted in the meantime
+
+        self.logger.info(f"Deleting keys for deregistered delegator app with ID {del_app['id']}.")
+        async with self.semaphore:
+            await self.locksmith.part_key_fetcher.get_partkey_snapshot()   # Only refreshes if invalidated
+            if len(self.locksmith.part_key_fetcher.partkey_table.get_by_address(del_acc)) == 0:
+                self.logger.info(f"No partkeys found for delegator app with ID {del_app['id']}.")
+            else:
+                result = await self.locksmith.delete_del_app_partkey(del_acc)
+                assert(result)
+                self.logger.info(f"Partkeys deleted.")
+        self.deleted_partkeys[del_app['id']] = current_round
@@ -0,0 +1,159 @@
+import copy
+from dataclasses import dataclass
+from typing import Dict
+
+from algosdk.constants import MIN_TXN_FEE
+from algosdk.transaction import SuggestedParams
+
+
+
+@dataclass(slots=True)
+class FeeProfile:
+    num_of_inner_txns: int          # Inner transactions (at any depth), whose fee is pooled into the outer call
+    txn_size: int                   # Approximate size of the signed outer call in bytes, for the per-byte fee
+
+
+
+class FeeEstimator(object):
+
+    # Fee profiles of the called methods, traced from the contracts:
+    #   deposit_keys: noticeboard -> validator ad -> delegator contract
+    #   keys_not_confirmed, end_expired_or_breached_delegator_contract: noticeboard -> validator ad -> delegator
+    #       contract (deleted), and the validator ad's payment of the contract's MBR back to the noticeboard
+    #   stake_limit_breach: called on the delegator contract directly, without inner transactions
+    STATIC_PROFILES = {
+        'deposit_keys': FeeProfile(num_of_inner_txns=2, txn_size=500),
+        'keys_not_confirmed': FeeProfile(num_of_inner_txns=3, txn_size=300),
+        'end_expired_or_breached_delegator_contract': FeeProfile(num_of_inner_txns=3, txn_size=300),
+        'stake_limit_breach': FeeProfile(num_of_inner_txns=0, txn_size=250),
+    }
+
+    # Profile of calls without a (static or learned) profile, equal to the previous fixed fee of 3x the minimum fee
+    DEFAULT_PROFILE = FeeProfile(num_of_inner_txns=2, txn_size=500)
+
+
+    def __init__(
+        self,
+        logger: object,
+        profiles: Dict[str, FeeProfile] | None = None
+    ) -> None:
+        """Initialize the estimation of the exact fee of app calls.
+
+        Notes:
+            The contracts issue their inner transactions with a zero fee, so the outer call has to pay for them as
+            well (fee pooling). The number of inner transactions of each method is taken from the static profiles
+            and replaced by the number observed in simulation, if available (see `learn`).
+            The outer call pays the larger of the minimum fee and the per-byte fee, which algod only suggests when the
+            network is congested.
+
+        Args:
+            logger (object): Python logger.
+            profiles (Dict[str, FeeProfile] | None, optional): Fee profile of each method. Defaults to None
+                (STATIC_PROFILES).
+        """
+        self.logger = logger
+        self.profiles = dict(profiles if profiles is not None else self.STATIC_PROFILES)
+        self.learned_num_of_inner_txns: Dict[str, int] = dict()
+        self.min_fee = MIN_TXN_FEE
+        self.fee_per_byte = 0
+
+
+    def update_network_params(
+        self,
+        suggested_params: SuggestedParams
+    ) -> None:
+        """Update the minimum fee and the congestion (per-byte) fee from the parameters, suggested by algod.
+
+        Args:
+            suggested_params (SuggestedParams): Transaction parameters as returned by algod, i.e. not flat-fee.
+        """
+        if suggested_params.min_fee:
+            self.min_fee = suggested_params.min_fee
+        fee_per_byte = 0 if suggested_params.flat_fee else suggested_params.fee
+        if fee_per_byte != self.fee_per_byte:
+            self.logger.info(f'Network fee per byte changed from {self.fee_per_byte} to {fee_per_byte} microALGO.')
+        self.fee_per_byte = fee_per_byte
+
+
+    def learn(
+        self,
+        method: str,
+        num_of_inner_txns: int
+    ) -> None:
+        """Record the number of inner transactions of a method, as observed in simulation.
+
+        Args:
+            method (str): Method name.
+            num_of_inner_txns (int): Number of inner transactions.
+        """
+        if self.learned_num_of_inner_txns.get(method) == num_of_inner_txns:
+            return
+        profile = self.get_profile(method)
+        if profile.num_of_inner_txns != num_of_inner_txns:
+            self.logger.info(
+                f'Method `{method}` issues {num_of_inner_txns} inner transactions ' +
+                f'(expected {profile.num_of_inner_txns}), updating its fee.'
+            )
+        self.learned_num_of_inner_txns[method] = num_of_inner_txns
+
+
+    def get_profile(
+        self,
+        method: str | None
+    ) -> FeeProfile:
+        """Get the fee profile of a method.
+
+        Args:
+            method (str | None): Method name or `None` for the default profile.
+
+        Returns:
+            FeeProfile: Profile, with the number of inner transactions as observed in simulation, if available.
+        """
+        profile = self.profiles.get(method, self.DEFAULT_PROFILE)
+        if method in self.learned_num_of_inner_txns:
+            profile = FeeProfile(self.learned_num_of_inner_txns[method], profile.txn_size)
+        return profile
+
+
+    def get_fee(
+        self,
+        method: str | None = None,
+        num_of_inner_txns: int | None = None
+    ) -> int:
+        """Get the exact fee of a call.
+
+        Args:
+            method (str | None, optional): Method name. Defaults to None (default profile).
+            num_of_inner_txns (int | None, optional): Number of inner transactions, overriding the profile.
+                Defaults to None.
+
+        Returns:
+            int: Fee in microALGO.
+        """
+        profile = self.get_profile(method)
+        if num_of_inner_txns is None:
+            num_of_inner_txns = profile.num_of_inner_txns
+        return max(self.min_fee, self.fee_per_byte * profile.txn_size) + num_of_inner_txns * self.min_fee
+
+
+    def get_params(
+        self,
+        suggested_params: SuggestedParams,
+        method: str | None = None,
+        num_of_inner_txns: int | None = None
+    ) -> SuggestedParams:
+        """Copy the transaction parameters with the exact (flat) fee of a call.
+
+        Args:
+            suggested_params (SuggestedParams): Transaction parameters.
+            method (str | None, optional): Method name. Defaults to None (default profile).
+            num_of_inner_txns (int | None, optional): Number of inner transactions, overriding the profile.
+                Defaults to None.
+
+        Returns:
+            SuggestedParams: Transaction parameters with the fee of the call.
+        """
+        fee_params = copy.copy(suggested_params)
+        fee_params.fee = self.get_fee(method, num_of_inner_txns)
+        fee_params.flat_fee = True
+        return fee_params
@@ -0,0 +1,478 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib import parse
+
+import httpx
+from algosdk import constants, error
+from algosdk.v2client import algod, indexer
+
+from .RateLimiter import RateLimiter
+
+
+
+class LatencyStats(object):
+
+    # Path segments replaced by a placeholder in the endpoint name, i.e. round numbers, app IDs, addresses, and IDs
+    ID_SEGMENT_PATTERN = re.compile(r'^(\d+|[A-Z2-7]{52,58})$')
+
+
+    def __init__(
+        self,
+        max_num_of_samples: int = 1000
+    ) -> None:
+        """Initialize the latency statistics of HTTP requests per endpoint.
+
+        Notes:
+            Thread-safe, since the generated clients issue their requests in separate threads.
+
+        Args:
+            max_num_of_samples (int, optional): Number of latest latencies kept per endpoint. Defaults to 1000.
+        """
+        self.max_num_of_samples = max_num_of_samples
+        self.samples: Dict[str, deque] = dict()
+        self.counts: Dict[str, Dict[str, int]] = dict()
+        self.lock = threading.Lock()
+
+
+    @classmethod
+    def get_endpoint_name(
+        cls,
+        method: str,
+        path: str
+    ) -> str:
+        """Get the name of an endpoint, under which the latency of a request is recorded.
+
+        Args:
+            method (str): Request method.
+            path (str): Request path, without query parameters.
+
+        Returns:
+            str: Endpoint name, e.g. `GET /v2/accounts/{}`.
+        """
+        segments = ['{}' if cls.ID_SEGMENT_PATTERN.match(s) else s for s in path.split('/')]
+        return f'{method} {"/".join(segments)}'
+
+
+    def record(
+        self,
+        endpoint: str,
+        duration_s: float,
+        is_ok: bool = True,
+        num_of_retries: int = 0
+    ) -> None:
+        """Record the latency of a request.
+
+        Args:
+            endpoint (str): Endpoint name.
+            duration_s (float): Request duration, including retries.
+            is_ok (bool, optional): Flag, indicating whether the request succeeded. Defaults to True.
+            num_of_retries (int, optional): Number of retries of the request. Defaults to 0.
+        """
+        with self.lock:
+            if endpoint not in self.samples:
+                self.samples[endpoint] = deque(maxlen=self.max_num_of_samples)
+                self.counts[endpoint] = dict(requests=0, errors=0, retries=0)
+            self.samples[endpoint].append(duration_s)
+            counts = self.counts[endpoint]
+            counts['requests'] += 1
+            counts['errors'] += 0 if is_ok else 1
+            counts['retries'] += num_of_retries
+
+
+    def get_stats(
+        self
+    ) -> Dict[str, dict]:
+        """Get the statistics of each endpoint.
+
+        Returns:
+            Dict[str, dict]: Number of requests, errors, and retries, and the median, 95th percentile, and maximum
+                latency (over the latest samples) in milliseconds of each endpoint.
+        """
+        with self.lock:
+            stats = dict()
+            for endpoint, samples in self.samples.items():
+                latencies = sorted(samples)
+                stats[endpoint] = dict(
+                    self.counts[endpoint],
+                    p50_ms=round(1000 * latencies[len(latencies) // 2], 1),
+                    p95_ms=round(1000 * latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)], 1),
+                    max_ms=round(1000 * latencies[-1], 1)
+                )
+            return stats
+
+
+    def summary(
+        self
+    ) -> str:
+        """Summarize the statistics of each endpoint.
+
+        Returns:
+            str: Summary.
+        """
+        return '; '.join(
+            f'{endpoint}: {s["requests"]} req, {s["errors"]} err, {s["retries"]} retries, ' +
+            f'p50 {s["p50_ms"]} ms, p95 {s["p95_ms"]} ms'
+            for endpoint, s in sorted(self.get_stats().items())
+        )
+
+
+
+class RetryPolicy(object):
+
+    # Only requests without side effects are retried
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD'})
+
+    # Statuses, returned by an overloaded or restarting node (or its proxy), after which a request is retried
+    RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay_s: float = 0.2,
+        max_delay_s: float = 5
+    ) -> None:
+        """Initialize the retries of idempotent requests with jittered exponential backoff.
+
+        Args:
+            max_retries (int, optional): Maximum number of retries of a request. Defaults to 3.
+            base_delay_s (float, optional): Upper bound of the delay before the first retry. Defaults to 0.2.
+            max_delay_s (float, optional): Upper bound of the delay before any retry. Defaults to 5.
+        """
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+
+
+    def can_retry(
+        self,
+        method: str,
+        attempt: int
+    ) -> bool:
+        """Check whether a failed request may be retried.
+
+        Args:
+            method (str): Request method.
+            attempt (int): Number of the failed attempt, starting with 0.
+
+        Returns:
+            bool: Flag, indicating whether to retry.
+        """
+        return method.upper() in self.IDEMPOTENT_METHODS and attempt < self.max_retries
+
+
+    def get_delay_s(
+        self,
+        attempt: int
+    ) -> float:
+        """Get the delay before retrying a request (full jitter).
+
+        Args:
+            attempt (int): Number of the failed attempt, starting with 0.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2 ** attempt))
+
+
+
+class PooledHttpTransport(object):
+
+
+    def __init__(
+        self,
+        logger: object,
+        base_url: str,
+        timeout_s: float = 30,
+        connect_timeout_s: float = 5,
+        max_connections: int = 10,
+        retry_policy: RetryPolicy | None = None,
+        latency_stats: LatencyStats | None = None,
+        rate_limiter: RateLimiter | None = None
+    ) -> None:
+        """Initialize a blocking HTTP transport with a pool of keep-alive connections.
+
+        Notes:
+            Connections (and their TLS sessions) are reused across requests and threads, instead of opening a new
+            connection per request. Idempotent requests are retried on connection errors and on the statuses of an
+            overloaded node. With a rate limiter, each attempt waits for the budget of the server, according to the
+            priority of the request.
+
+        Args:
+            logger (object): Python logger.
+            base_url (str): Server address, including the port.
+            timeout_s (float, optional): Default request timeout in seconds. Defaults to 30.
+            connect_timeout_s (float, optional): Connection timeout in seconds. Defaults to 5.
+            max_connections (int, optional): Maximum number of pooled connections. Defaults to 10.
+            retry_policy (RetryPolicy | None, optional): Retries of idempotent requests. Defaults to None (default
+                policy).
+            latency_stats (LatencyStats | None, optional): Shared latency statistics. Defaults to None (own).
+            rate_limiter (RateLimiter | None, optional): Shared request budget. Defaults to None (unlimited).
+        """
+        self.logger = logger
+        self.base_url = base_url.rstrip('/')
+        self.timeout_s = timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.latency_stats = latency_stats or LatencyStats()
+        self.rate_limiter = rate_limiter
+        self.http_client = httpx.Client(
+            timeout=httpx.Timeout(timeout_s, connect=connect_timeout_s),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        data: Optional[bytes] = None,
+        timeout_s: Optional[float] = None
+    ) -> httpx.Response:
+        """Execute a request, retrying it if it is idempotent and failed transiently.
+
+        Args:
+            method (str): Request method.
+            path (str): Request path, including the query parameters.
+            headers (Dict[str, str]): Request headers.
+            data (Optional[bytes], optional): Request body. Defaults to None.
+            timeout_s (Optional[float], optional): Request timeout, overriding the default. Defaults to None.
+
+        Raises:
+            httpx.TransportError: The request failed on all attempts.
+
+        Returns:
+            httpx.Response: Response, possibly with an error status.
+        """
+        endpoint = self.latency_stats.get_endpoint_name(method, path.split('?')[0])
+        timeout = httpx.Timeout(timeout_s if timeout_s is not None else self.timeout_s, connect=self.connect_timeout_s)
+        priority = RateLimiter.get_priority(method, path)
+        start_time = time.monotonic()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(self.base_url, priority)
+            try:
+                response = self.http_client.request(
+                    method, self.base_url + path, headers=headers, content=data, timeout=timeout
+                )
+            except httpx.TransportError as e:
+                if not self.retry_policy.can_retry(method, attempt):
+                    self.latency_stats.record(endpoint, time.monotonic() - start_time, False, attempt)
+                    raise
+                self.logger.debug(f'Retrying {endpoint} after {type(e).__name__}.')
+            else:
+                if (
+                    response.status_code not in self.retry_policy.RETRY_STATUS_CODES or
+                    not self.retry_policy.can_retry(method, attempt)
+                ):
+                    is_ok = response.status_code < 400
+                    self.latency_stats.record(endpoint, time.monotonic() - start_time, is_ok, attempt)
+                    return response
+                self.logger.debug(f'Retrying {endpoint} after status {response.status_code}.')
+            time.sleep(self.retry_policy.get_delay_s(attempt))
+            attempt += 1
+
+
+    def close(
+        self
+    ) -> None:
+        """Close the pooled connections."""
+        self.http_client.close()
+
+
+
+class PooledAlgodClient(algod.AlgodClient):
+
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        transport: PooledHttpTransport,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Initialize an algod client, which issues its requests through a pooled HTTP transport.
+
+        Args:
+            algod_token (str): Algod API token.
+            algod_address (str): Algod server address, including the port.
+            transport (PooledHttpTransport): Pooled transport to the same address.
+            headers (Optional[Dict[str, str]], optional): Additional request headers. Defaults to None.
+        """
+        super().__init__(algod_token, algod_address, headers)
+        self.transport = transport
+
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[dict] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_format: Optional[str] = 'json',
+        timeout: Optional[int] = 30,
+    ) -> dict | bytes:
+        """Execute a given request (same interface and errors as `algod.AlgodClient.algod_request`)."""
+        return self.decode_response(
+            self.send_request(self.transport, self.algod_token, method, requrl, params, data, headers, timeout),
+            response_format
+        )
+
+
+    def send_request(
+        self,
+        transport: PooledHttpTransport,
+        algod_token: str,
+        method: str,
+        requrl: str,
+        params: Optional[dict] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[int] = 30,
+    ) -> httpx.Response:
+        """Send a request through a transport.
+
+        Args:
+            transport (PooledHttpTransport): Transport to an algod endpoint.
+            algod_token (str): API token of the endpoint.
+            method (str): Request method.
+            requrl (str): Unversioned URL path of the request, e.g. `/status`.
+            params (Optional[dict], optional): Query parameters. Defaults to None.
+            data (Optional[bytes], optional): Request body. Defaults to None.
+            headers (Optional[Dict[str, str]], optional): Additional request headers. Defaults to None.
+            timeout (Optional[int], optional): Request timeout in seconds. Defaults to 30.
+
+        Raises:
+            error.AlgodRequestError: The request failed on all attempts.
+
+        Returns:
+            httpx.Response: Response, possibly with an error status.
+        """
+        header = {'User-Agent': 'py-algorand-sdk'}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + '?' + parse.urlencode(params)
+
+        try:
+            return transport.request(method, requrl, header, data, timeout)
+        except httpx.TransportError as e:
+            raise error.AlgodRequestError(str(e)) from e
+
+
+    @staticmethod
+    def decode_response(
+        response: httpx.Response,
+        response_format: Optional[str] = 'json'
+    ) -> dict | bytes:
+        """Decode a response as `algod.AlgodClient.algod_request` does.
+
+        Args:
+            response (httpx.Response): Response.
+            response_format (Optional[str], optional): Either `json` or `msgpack`. Defaults to `json`.
+
+        Raises:
+            error.AlgodHTTPError: Algod returned an error status.
+            error.AlgodResponseError: The JSON response can not be parsed.
+
+        Returns:
+            dict | bytes: Decoded JSON response or the raw response body.
+        """
+        if response.status_code >= 400:
+            message, body = response.text, dict()
+            try:
+                body = json.loads(response.text)
+                message = body['message']
+            except Exception:
+                pass
+            raise error.AlgodHTTPError(message, response.status_code, body.get('data'))
+        if response_format == 'json':
+            if len(response.content) == 0:
+                return dict()
+            try:
+                return response.json()
+            except Exception as e:
+                raise error.AlgodResponseError('Failed to parse JSON response from algod') from e
+        return response.content
+
+
+
+class PooledIndexerClient(indexer.IndexerClient):
+
+
+    def __init__(
+        self,
+        indexer_token: str,
+        indexer_address: str,
+        transport: PooledHttpTransport,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Initialize an indexer client, which issues its requests through a pooled HTTP transport.
+
+        Args:
+            indexer_token (str): Indexer API token.
+            indexer_address (str): Indexer server address, including the port.
+            transport (PooledHttpTransport): Pooled transport to the same address.
+            headers (Optional[Dict[str, str]], optional): Additional request headers. Defaults to None.
+        """
+        super().__init__(indexer_token, indexer_address, headers)
+        self.transport = transport
+
+
+    def indexer_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        timeout=30
+    ) -> dict:
+        """Execute a given request (same interface and errors as `indexer.IndexerClient.indexer_request`)."""
+        header = dict()
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.indexer_auth_header] = self.indexer_token
+        if requrl not in constants.unversioned_paths:
+            requrl = indexer.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + '?' + parse.urlencode(params)
+
+        try:
+            response = self.transport.request(method, requrl, header, data, timeout)
+        except httpx.TransportError as e:
+            raise error.IndexerHTTPError(str(e)) from e
+
+        if response.status_code >= 400:
+            message = response.text
+            try:
+                message = json.loads(response.text)['message']
+            except Exception:
+                pass
+            raise error.IndexerHTTPError(message)
+
+        def recursively_sort_dict(dictionary):
+            return {
+                k: recursively_sort_dict(v) if isinstance(v, dict) else v
+                for k, v in sorted(dictionary.items())
+            }
+
+        return recursively_sort_dict(response.json())
@@ -0,0 +1,269 @@
+import asyncio
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .KeygenStats import KeygenStats
+from .Locksmith import Locksmith
+from .PartkeyRegistry import ParticipationKey
+
+
+
+@dataclass(slots=True)
+class KeygenJob:
+    del_app_id: int
+    del_acc: str
+    round_start: int
+    round_end: int
+    deadline: int                   # Last round for depositing the keys, i.e. `round_start + setup_rounds`
+    future: asyncio.Future = field(repr=False)
+    submit_time: float = 0
+
+
+
+class KeygenPool(object):
+
+    # Average duration of a round on Algorand, used for converting durations to rounds
+    ROUND_TIME_S = KeygenStats.ROUND_TIME_S
+
+    # Weight of the latest duration in the (exponential) moving average of key generation durations
+    DURATION_SMOOTHING = 0.3
+
+
+    def __init__(
+        self,
+        logger: object,
+        locksmith: Locksmith,
+        num_of_workers: int = 2,
+        initial_generation_duration_s: float = 60,
+        round_time_s: float = ROUND_TIME_S
+    ) -> None:
+        """Initialize a bounded pool of workers, generating participation keys earliest-deadline-first.
+
+        Notes:
+            Jobs are ordered by their setup deadline, so that a burst of new contracts does not make the most urgent
+            ones miss the deadline. Jobs whose deadline has already passed when a worker becomes free are rejected,
+            since the keys could not be deposited anymore.
+            The workers are started lazily, on the first submitted job.
+
+        Args:
+            logger (object): Python logger.
+            locksmith (Locksmith): Participation key manager.
+            num_of_workers (int, optional): Number of keys generated at the same time. Defaults to 2.
+            initial_generation_duration_s (float, optional): Estimated duration of generating a key, until the first
+                key is generated. Defaults to 60.
+            round_time_s (float, optional): Average duration of a round. Defaults to ROUND_TIME_S.
+        """
+        self.logger = logger
+        self.locksmith = locksmith
+        self.num_of_workers = max(num_of_workers, 1)
+        self.generation_duration_s = initial_generation_duration_s
+        self.round_time_s = round_time_s
+
+        self.queue = asyncio.PriorityQueue()    # Items are (deadline, sequence number, job)
+        self.counter = itertools.count()        # Tie-breaker, keeping FIFO order for equal deadlines
+        self.queued_deadlines: Dict[int, int] = dict()  # Deadline of each queued job, keyed by sequence number
+        self.workers: List[asyncio.Task] = []
+        self.num_of_running = 0
+        self.current_round = 0
+
+
+    def update_current_round(
+        self,
+        current_round: int
+    ) -> None:
+        """Update the round, used for rejecting late jobs and estimating completion.
+
+        Args:
+            current_round (int): Current round.
+        """
+        self.current_round = current_round
+
+
+    def submit(
+        self,
+        del_app_id: int,
+        del_acc: str,
+        round_start: int,
+        round_end: int,
+        deadline: int
+    ) -> asyncio.Future:
+        """Queue the generation of a participation key.
+
+        Args:
+            del_app_id (int): Delegator app ID.
+            del_acc (str): Delegator account address.
+            round_start (int): First round of validity.
+            round_end (int): Last round of validity.
+            deadline (int): Last round for depositing the keys.
+
+        Returns:
+            asyncio.Future: Future, resolving to the generated participation key.
+        """
+        self._start_workers()
+        job = KeygenJob(
+            del_app_id=del_app_id,
+            del_acc=del_acc,
+            round_start=round_start,
+            round_end=round_end,
+            deadline=deadline,
+            future=asyncio.get_running_loop().create_future(),
+            submit_time=time.monotonic()
+        )
+        sequence_number = next(self.counter)
+        self.queued_deadlines[sequence_number] = deadline
+        self.queue.put_nowait((deadline, sequence_number, job))
+
+        expected_round = self.get_expected_completion_round(deadline)
+        self.logger.info(
+            f'Queued partkey generation for delegator app with ID {del_app_id} ' +
+            f'(queue depth {self.get_queue_depth()}, deadline {deadline}, expected completion round {expected_round}).'
+        )
+        if expected_round > deadline:
+            self.logger.warning(
+                f'Partkey for delegator app with ID {del_app_id} is expected to miss its deadline {deadline}.'
+            )
+        return job.future
+
+
+    async def generate_partkey(
+        self,
+        del_app_id: int,
+        del_acc: str,
+        round_start: int,
+        round_end: int,
+        deadline: int
+    ) -> ParticipationKey:
+        """Queue the generation of a participation key and wait for it.
+
+        Args:
+            del_app_id (int): Delegator app ID.
+            del_acc (str): Delegator account address.
+            round_start (int): First round of validity.
+            round_end (int): Last round of validity.
+            deadline (int): Last round for depositing the keys.
+
+        Raises:
+            RuntimeError: Deadline passed before the generation started or the generation failed.
+
+        Returns:
+            ParticipationKey: Generated participation key.
+        """
+        return await self.submit(del_app_id, del_acc, round_start, round_end, deadline)
+
+
+    def get_queue_depth(
+        self
+    ) -> int:
+        """Get the number of queued (not yet started) jobs.
+
+        Returns:
+            int: Queue depth.
+        """
+        return self.queue.qsize()
+
+
+    def get_expected_completion_round(
+        self,
+        deadline: int | None = None
+    ) -> int:
+        """Estimate the round by which a job will be completed.
+
+        Notes:
+            Assumes the running jobs have just started and all workers take the average generation duration.
+
+        Args:
+            deadline (int | None, optional): Deadline of the job, which is preceded by all queued jobs with an earlier
+                or equal deadline. Defaults to None, i.e. the round by which the whole queue is processed.
+
+        Returns:
+            int: Expected completion round.
+        """
+        if deadline is None:
+            num_of_jobs_ahead = self.get_queue_depth()
+        else:
+            num_of_jobs_ahead = sum(1 for d in self.queued_deadlines.values() if d <= deadline)  # Includes the job itself
+        num_of_jobs = self.num_of_running + num_of_jobs_ahead
+        if num_of_jobs == 0:
+            return self.current_round
+        num_of_waves = math.ceil(num_of_jobs / self.num_of_workers)
+        return self.current_round + math.ceil(num_of_waves * self.generation_duration_s / self.round_time_s)
+
+
+    def report(
+        self
+    ) -> None:
+        """Log the queue depth and the expected completion round of the queued jobs."""
+        if self.num_of_running == 0 and self.get_queue_depth() == 0:
+            return
+        self.logger.debug(
+            f'Partkey generation: {self.num_of_running} running, {self.get_queue_depth()} queued, ' +
+            f'expected completion round {self.get_expected_completion_round()} ' +
+            f'(average generation duration {round(self.generation_duration_s, 1)} seconds).'
+        )
+
+
+    async def close(
+        self
+    ) -> None:
+        """Stop the workers."""
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+
+    def _start_workers(
+        self
+    ) -> None:
+        if self.workers:
+            return
+        self.workers = [
+            asyncio.create_task(self._work(), name=f'keygen-worker-{i}') for i in range(self.num_of_workers)
+        ]
+
+
+    async def _work(
+        self
+    ) -> None:
+        while True:
+            _, sequence_number, job = await self.queue.get()
+            self.queued_deadlines.pop(sequence_number, None)
+            try:
+                if job.future.cancelled():
+                    continue
+                if self.current_round > job.deadline:
+                    job.future.set_exception(RuntimeError(
+                        f'Deadline {job.deadline} for generating partkey of delegator app with ID {job.del_app_id} '
+                        f'passed while queued (round {self.current_round}).'
+                    ))
+                    continue
+                await self._run_job(job)
+            finally:
+                self.queue.task_done()
+
+
+    async def _run_job(
+        self,
+        job: KeygenJob
+    ) -> None:
+        self.num_of_running += 1
+        start_time = time.monotonic()
+        try:
+            self.logger.info(
+                f'Generating partkey for delegator app with ID {job.del_app_id} ' +
+                f'(waited {round(start_time - job.submit_time, 1)} seconds).'
+            )
+            partkey = await self.locksmith.generate_partkey(job.del_acc, job.round_start, job.round_end)
+        except Exception as e:
+            if not job.future.cancelled():
+                job.future.set_exception(e)
+        else:
+            duration_s = time.monotonic() - start_time
+            self.generation_duration_s += self.DURATION_SMOOTHING * (duration_s - self.generation_duration_s)
+            if not job.future.cancelled():
+                job.future.set_result(partkey)
+        finally:
+            self.num_of_running -= 1
@@ -0,0 +1,184 @@
+import csv
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, asdict, fields
+from pathlib import Path
+from typing import List
+
+
+
+@dataclass(slots=True)
+class KeygenRecord:
+    timestamp: float            # Unix time at the end of the generation
+    del_acc: str
+    round_start: int
+    round_end: int
+    vote_key_dilution: int
+    duration_s: float
+
+    @property
+    def num_of_rounds(self) -> int:
+        return self.round_end - self.round_start + 1
+
+
+
+class KeygenStats(object):
+
+    # Average duration of a round on Algorand, used for converting durations to rounds
+    ROUND_TIME_S = 2.8
+
+
+    def __init__(
+        self,
+        logger: object,
+        stats_path: str | None = None,
+        max_num_of_records: int = 1000,
+        round_time_s: float = ROUND_TIME_S
+    ) -> None:
+        """Initialize the statistics of participation key generation durations.
+
+        Notes:
+            The duration is related to the contract length (number of rounds), since the number of generated keys grows
+            with it. Each record is optionally appended to a CSV file, so that operators can size `setup_rounds` from
+            data measured on their host.
+
+        Args:
+            logger (object): Python logger.
+            stats_path (str | None, optional): Path to the CSV file of the records. Defaults to None (not stored).
+            max_num_of_records (int, optional): Number of latest records kept in memory. Defaults to 1000.
+            round_time_s (float, optional): Average duration of a round. Defaults to ROUND_TIME_S.
+        """
+        self.logger = logger
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.records = deque(maxlen=max_num_of_records)
+        self.round_time_s = round_time_s
+
+
+    def add(
+        self,
+        del_acc: str,
+        round_start: int,
+        round_end: int,
+        vote_key_dilution: int,
+        duration_s: float
+    ) -> KeygenRecord:
+        """Record the duration of a key generation.
+
+        Args:
+            del_acc (str): Delegator account address.
+            round_start (int): First round of validity.
+            round_end (int): Last round of validity.
+            vote_key_dilution (int): Key dilution.
+            duration_s (float): Generation duration.
+
+        Returns:
+            KeygenRecord: Added record.
+        """
+        record = KeygenRecord(time.time(), del_acc, round_start, round_end, vote_key_dilution, duration_s)
+        self.records.append(record)
+        if self.stats_path is not None:
+            self._append_to_file(record)
+        self.logger.info(
+            f'Generated partkey for {record.num_of_rounds} rounds (dilution {vote_key_dilution}) in ' +
+            f'{round(duration_s, 1)} seconds (~{math.ceil(duration_s / self.round_time_s)} rounds). ' +
+            self.summary()
+        )
+        return record
+
+
+    def get_seconds_per_round(
+        self
+    ) -> float | None:
+        """Get the generation duration per round of validity, fitted over the recorded generations.
+
+        Returns:
+            float | None: Duration per round or `None` if there are no records.
+        """
+        sum_of_squares = sum(r.num_of_rounds ** 2 for r in self.records)
+        if sum_of_squares == 0:
+            return None
+        return sum(r.duration_s * r.num_of_rounds for r in self.records) / sum_of_squares   # Least squares fit
+
+
+    def estimate_duration_s(
+        self,
+        num_of_rounds: int
+    ) -> float | None:
+        """Estimate the generation duration of a key.
+
+        Args:
+            num_of_rounds (int): Number of rounds of validity.
+
+        Returns:
+            float | None: Estimated duration or `None` if there are no records.
+        """
+        seconds_per_round = self.get_seconds_per_round()
+        if seconds_per_round is None:
+            return None
+        return seconds_per_round * num_of_rounds
+
+
+    def estimate_setup_rounds(
+        self,
+        num_of_rounds: int,
+        margin: float = 2
+    ) -> int | None:
+        """Estimate the number of setup rounds needed to generate a key (without waiting for other generations).
+
+        Args:
+            num_of_rounds (int): Number of rounds of validity.
+            margin (float, optional): Safety factor, applied to the estimated duration. Defaults to 2.
+
+        Returns:
+            int | None: Number of rounds or `None` if there are no records.
+        """
+        duration_s = self.estimate_duration_s(num_of_rounds)
+        if duration_s is None:
+            return None
+        return math.ceil(margin * duration_s / self.round_time_s)
+
+
+    def get_durations_s(
+        self
+    ) -> List[float]:
+        """Get the recorded durations, sorted.
+
+        Returns:
+            List[float]: Durations.
+        """
+        return sorted(r.duration_s for r in self.records)
+
+
+    def summary(
+        self
+    ) -> str:
+        """Summarize the recorded generations.
+
+        Returns:
+            str: Summary.
+        """
+        durations_s = self.get_durations_s()
+        if len(durations_s) == 0:
+            return 'No partkey generations recorded.'
+        seconds_per_round = self.get_seconds_per_round()
+        return (
+            f'Over {len(durations_s)} generation(s): median {round(durations_s[len(durations_s) // 2], 1)} s, ' +
+            f'max {round(durations_s[-1], 1)} s, {round(seconds_per_round * 1e6, 1)} s per million rounds.'
+        )
+
+
+    def _append_to_file(
+        self,
+        record: KeygenRecord
+    ) -> None:
+        columns = [f.name for f in fields(KeygenRecord)] + ['num_of_rounds']
+        try:
+            is_new_file = not self.stats_path.is_file()
+            with open(self.stats_path, 'a', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                if is_new_file:
+                    writer.writeheader()
+                writer.writerow(dict(asdict(record), num_of_rounds=record.num_of_rounds))
+        except OSError as e:
+            self.logger.warning(f'Can not write partkey generation statistics to {self.stats_path} ({e}).')
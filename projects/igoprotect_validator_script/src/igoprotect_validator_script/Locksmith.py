@@ -1,61 +1,121 @@
+import asyncio
+import contextlib
 import logging
-import subprocess
-from typing import Tuple, List
+import time
+from typing import AsyncIterator, Tuple, List
 from math import sqrt
-from dataclasses import dataclass
 import base64
 
-import numpy as np
-import pandas as pd
-from algosdk.transaction import SuggestedParams
+from algosdk.error import AlgodHTTPError
 from algokit_utils import TransactionParameters
-from algokit_utils.beta.algorand_client import AlgorandClient
 from algokit_utils.beta.account_manager import AddressAndSigner
 
+from .AsyncAlgodClient import AsyncAlgodClient
+from .KeygenStats import KeygenStats
 from .NoticeboardClient import NoticeboardClient
+from .PartkeyRegistry import ParticipationKey, PartkeyRegistry
+from .PartkeyinfoParser import PartkeyinfoParser
+from .ProcessLimits import ProcessLimits
+from .SimulationGuard import SimulationFailedError, SimulationGuard
+from .SuggestedParamsProvider import SuggestedParamsProvider
 
 
 
-@dataclass
-class ParticipationKey:
-    sel_key: str            # str, from `goal account partkeyinfo`
-    vote_key: str           # str, from `goal account partkeyinfo`
-    state_proof_key: str    # str, from `goal account partkeyinfo`
-    vote_key_dilution: int  # int(round(Sqrt(duration)))
-    round_start: int        # Take from delegator contract
-    round_end: int          # Take from delegator contract
-
-
-
-def run_cmd_command_and_wait_for_output(
+async def run_cmd_command_and_wait_for_output(
     logger: object,
-    command_args: List[str]
+    command_args: List[str],
+    process_limits: ProcessLimits | None = None
 ) -> Tuple[bool, str]:
     """Run a command in the command line, wait for its output, and capture the output.
 
+    Notes:
+        The command is run as an asyncio subprocess, so that other tasks can progress while waiting.
+        If the waiting is cancelled (e.g. on shutdown), the command is killed.
+
     Args:
         logger (object): Python logger.
         command_args (List[str]): Strings of individual words that make up the command.
+        process_limits (ProcessLimits | None, optional): CPU and I/O limits of the command. Defaults to None.
 
     Returns:
         Tuple[bool, str]: Command validity (execution successful = 0) and the captured STDOUT.
 
     """
     command_validity = False
-    result = None
+    if process_limits is not None:
+        command_args = process_limits.wrap_command(command_args)
     logger.debug(f"Issuing cmd command `{' '.join(command_args)}`")
     try:
-        result = subprocess.run(command_args, capture_output=True, text=True)
-        if result.returncode == 0:
+        process = await asyncio.create_subprocess_exec(
+            *command_args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await process.communicate()
+        finally:
+            if process.returncode is None:  # Cancelled
+                process.kill()
+                await process.wait()
+        stdout = stdout.decode()
+        if process.returncode == 0:
             command_validity = True
-        elif result.returncode < 0:
-            logger.warning(f"`{' '.join(command_args)}` returned code {result.returncode} and {result.stdout}.")
+        elif process.returncode < 0:
+            logger.warning(f"`{' '.join(command_args)}` returned code {process.returncode} and {stdout}.")
         else:
-            logger.warning(f"`{' '.join(command_args)}` returned error `{result.stderr}`.")
-        return command_validity, result.stdout
+            logger.warning(f"`{' '.join(command_args)}` returned error `{stderr.decode()}`.")
+        return command_validity, stdout
     except OSError as e:
         logger.warning(f"Calling `{' '.join(command_args)}` raised error {e}.")
-        return command_validity, result
+        return command_validity, None
+
+
+
+async def stream_cmd_command_output(
+    logger: object,
+    command_args: List[str]
+) -> AsyncIterator[str]:
+    """Run a command in the command line and yield its STDOUT line by line, while the command is still running.
+
+    Notes:
+        STDERR is collected in the background, so that a verbose command can not stall on a full pipe.
+        When stopping early, close the generator (e.g., with `contextlib.aclosing`) to terminate the command.
+
+    Args:
+        logger (object): Python logger.
+        command_args (List[str]): Strings of individual words that make up the command.
+
+    Raises:
+        RuntimeError: The command could not be run or did not finish successfully.
+
+    Yields:
+        str: Line of the captured STDOUT, including the line break.
+    """
+    logger.debug(f"Streaming cmd command `{' '.join(command_args)}`")
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command_args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except OSError as e:
+        raise RuntimeError(f"Calling `{' '.join(command_args)}` raised error {e}.") from e
+    stderr_task = asyncio.create_task(process.stderr.read())
+    try:
+        async for line in process.stdout:
+            yield line.decode()
+        await process.wait()
+        stderr = await stderr_task
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"`{' '.join(command_args)}` returned code {process.returncode} and error `{stderr.decode()}`."
+            )
+    finally:
+        if process.returncode is None:  # Consumer stopped early or got cancelled
+            process.kill()
+            await process.wait()
+        if not stderr_task.done():
+            stderr_task.cancel()
 
 
 
@@ -65,22 +125,106 @@ class PartkeyFetcher(object):
             self,
             logger: object
         ) -> None:
-        """Initialize the interface for fetching participation key details.
+        """Initialize the interface for managing participation keys on the node.
+
+        Notes:
+            The fetched keys are kept in a snapshot (the partkey table), which is kept up to date by the fetcher's own
+            mutations where possible. Otherwise, a mutation invalidates the snapshot, which is then refreshed once,
+            when it is next needed, no matter how many mutations preceded it or how many tasks are waiting for it.
 
         Args:
             logger (object): Python logger.
-            use_algokit (bool): Flag, indicating whether to use `goal` through `algokit` or standalone.
+        """
+        self.logger = logger
+        self.partkey_table = PartkeyRegistry()
+        self.partkey_table_version = 0              # Incremented on each invalidation
+        self.partkey_table_refreshed_version = -1   # Version at the start of the last refresh (stale initially)
+        self.partkey_table_lock = asyncio.Lock()
+        self.num_of_refreshes = 0
+
+
+    async def _fetch_partkeys(
+        self
+    ) -> List[ParticipationKey]:
+        """Fetch all participation keys from the node.
+
+        Returns:
+            List[ParticipationKey]: Participation keys.
         """
         pass
 
-    def get_partkey_details(
+
+    def is_partkey_table_stale(
+        self
+    ) -> bool:
+        """Check whether the partkey table was invalidated since its last refresh.
+
+        Returns:
+            bool: Flag, indicating whether the partkey table is stale.
+        """
+        return self.partkey_table_refreshed_version != self.partkey_table_version
+
+
+    def invalidate_partkey_table(
+        self
+    ) -> None:
+        """Mark the partkey table as stale, e.g., after the node's keys changed without updating the table."""
+        self.partkey_table_version += 1
+
+
+    async def refresh_partkey_table(
+        self
+    ) -> PartkeyRegistry:
+        """Retrieve participation keys and update the internal partkey table, regardless of whether it is stale.
+
+        Returns:
+            PartkeyRegistry: Registry of participation keys, updated in place.
+        """
+        async with self.partkey_table_lock:
+            await self._refresh_partkey_table()
+        return self.partkey_table
+
+
+    async def get_partkey_snapshot(
+        self
+    ) -> PartkeyRegistry:
+        """Get the partkey table, refreshing it first only if it is stale.
+
+        Notes:
+            Concurrent callers share a single refresh.
+
+        Returns:
+            PartkeyRegistry: Registry of participation keys.
+        """
+        if self.is_partkey_table_stale():
+            async with self.partkey_table_lock:
+                if self.is_partkey_table_stale():   # Skip if refreshed while waiting for the lock
+                    await self._refresh_partkey_table()
+        return self.partkey_table
+
+
+    def get_partkey_table(
+            self
+        ) -> PartkeyRegistry:
+        """Retrieve the internal participation key table (as is, without refreshing).
+
+        Returns:
+            PartkeyRegistry: Registry of participation keys.
+        """
+        return self.partkey_table
+
+
+    async def get_partkey_details(
         self,
-        partkey_id: int
+        partkey_id: str
     ) -> ParticipationKey:
         """Get the participation key details.
 
+        Notes:
+            The partkey table is only refreshed if the key is missing and the table is stale.
+
         Args:
-            partkey_id (int): ID of the partkey.
+            partkey_id (str): ID of the partkey.
 
         Raises:
             ValueError: No keys found for ID.
@@ -88,9 +232,94 @@ class PartkeyFetcher(object):
         Returns:
             ParticipationKey: Participation key details.
         """
+        partkey = self.partkey_table.get(partkey_id)
+        if partkey is None:
+            partkey = (await self.get_partkey_snapshot()).get(partkey_id)
+        if partkey is None:
+            raise ValueError(f'No keys found for ID {partkey_id}')
+        return partkey
+
+
+    def get_partkey_id_from_acc(
+        self,
+        acc: str
+    ) -> str:
+        """Get the ID of the partkey, generated for an account.
+
+        Args:
+            acc (str): Account address.
+
+        Raises:
+            ValueError: No or multiple keys found for the account.
+
+        Returns:
+            str: ID of the partkey.
+        """
+        partkeys = self.partkey_table.get_by_address(acc)
+        if len(partkeys) == 0:
+            raise ValueError(f'No partkeys found for account ID {acc}')
+        elif len(partkeys) > 1:
+            raise ValueError(f'More than one parkey found for account ID {acc}')
+        return partkeys[0].participation_id
+
+
+    async def generate_partkey(
+        self,
+        acc: str,
+        first_valid: int,
+        last_valid: int
+    ) -> str:
+        """Generate a participation key on the node.
+
+        Notes:
+            The generated key is either added to the partkey table or the table is invalidated.
+
+        Args:
+            acc (str): Account address.
+            first_valid (int): First round of validity.
+            last_valid (int): Last round of validity.
+
+        Raises:
+            RuntimeError: Key generation failed.
+
+        Returns:
+            str: ID of the generated partkey.
+        """
+        pass
+
+
+    async def delete_partkey(
+        self,
+        partkey_id: str
+    ) -> bool:
+        """Delete a participation key from the node.
+
+        Args:
+            partkey_id (str): ID of the partkey.
+
+        Returns:
+            bool: Flag, indicating whether the deletion was successful.
+        """
+        pass
+
+
+    async def close(
+        self
+    ) -> None:
+        """Release the resources of the fetcher (e.g. connections)."""
         pass
 
 
+    async def _refresh_partkey_table(
+        self
+    ) -> None:
+        version = self.partkey_table_version    # Invalidations during the fetch keep the table stale
+        self.partkey_table.update(await self._fetch_partkeys())
+        self.partkey_table_refreshed_version = version
+        self.num_of_refreshes += 1
+        self.logger.debug(f'Refreshed partkey table with {len(self.partkey_table)} keys.')
+
+
 
 class PartkeyFetcherGoal(PartkeyFetcher):
 
@@ -102,162 +331,204 @@ class PartkeyFetcherGoal(PartkeyFetcher):
     COMMAND_LIST_WITH_ALGOKIT = ["algokit", "goal", "account", "listpartkeys"]
     COMMAND_LIST_GOAL_ONLY = ["goal", "account", "listpartkeys"]
 
-    # Columns used in the participation key table (parameters of each partkey)
-    COLUMNS = dict(
-        participation_id='Participation ID',
-        parent_address='Parent address',
-        last_vote_round='Last vote round',
-        last_block_proposal_round='Last block proposal round',
-        effective_first_round='Effective first round',
-        effective_last_round='Effective last round',
-        first_round='First round',
-        last_round='Last round',
-        key_dilution='Key dilution',
-        selection_key='Selection key',
-        voting_key='Voting key',
-        state_proof_key='State proof key'
-    )
-
-
     def __init__(
         self,
         logger: object,
-        use_algokit: bool = True
+        use_algokit: bool = True,
+        process_limits: ProcessLimits | None = None
     ) -> None:
         """Initialize the interface for fetching participation keys, based on the `algokit goal` command.
 
         Args:
             logger (object): Python logger.
             use_algokit (bool): Flag, indicating whether to use `goal` through `algokit` or standalone.
+            process_limits (ProcessLimits | None, optional): CPU and I/O limits of the key generation command.
+                Defaults to None. Not applied with `algokit`, which runs `goal` inside the LocalNet container, out of
+                reach of the limits of the host.
         """
-        self.logger = logger
+        super().__init__(logger)
+        self.use_algokit = use_algokit
+        if use_algokit and process_limits is not None and process_limits.is_active():
+            logger.warning(
+                'Key generation limits do not apply to `goal` run through `algokit` (inside the container), ignoring them.'
+            )
+            process_limits = None
+        self.process_limits = process_limits
         if use_algokit:
             self.COMMAND_INFO = self.COMMAND_INFO_WITH_ALGOKIT
             self.COMMAND_LIST = self.COMMAND_LIST_WITH_ALGOKIT
         else:
             self.COMMAND_INFO = self.COMMAND_INFO_GOAL_ONLY
             self.COMMAND_LIST = self.COMMAND_LIST_GOAL_ONLY
-        self.partkey_table = None
-        self.refresh_partkey_table()
 
 
-    def get_partkey_details(
+    async def generate_partkey(
         self,
-        partkey_id: int,
-        refresh_table: bool = True
-    ) -> ParticipationKey:
-        """Get the participation key details.
+        acc: str,
+        first_valid: int,
+        last_valid: int
+    ) -> str:
+        """Generate a participation key with `goal account addpartkey`.
+
+        Notes:
+            If the command prints the complete key, it is added to the partkey table directly.
+            Otherwise, only its ID is taken from the output and the table is invalidated.
 
         Args:
-            partkey_id (int): ID of the partkey.
-            refresh_table (bool): Flag, indicating whether to first refresh the internal partkey table. Default is `True`.
+            acc (str): Account address.
+            first_valid (int): First round of validity.
+            last_valid (int): Last round of validity.
 
         Raises:
-            ValueError: No keys found for ID.
-            RuntimeError: Multiple keys found.
+            RuntimeError: Invalid command call.
 
         Returns:
-            ParticipationKey: Participation key details.
+            str: ID of the generated partkey.
         """
-        if refresh_table:
-            self.refresh_partkey_table()
-        row = self.partkey_table.query(f'participation_id == "{partkey_id}"')
-        num_of_keys = row.shape[0]
-        if num_of_keys == 0:
-            raise ValueError(f'No keys found for ID {partkey_id}')
-        elif num_of_keys > 1:
-            raise RuntimeError(f'Multiple keys found ({num_of_keys})')
-        partkey = ParticipationKey(
-            sel_key=row['selection_key'].values[0],
-            vote_key=row['voting_key'].values[0],
-            state_proof_key=row['state_proof_key'].values[0],
-            vote_key_dilution=int(row['key_dilution'].values[0]),
-            round_start=int(row['first_round'].values[0]),
-            round_end=int(row['last_round'].values[0])
+        command_args = self._addpartkey_cmd_command_args( acc, first_valid, last_valid )
+        valid, result = await run_cmd_command_and_wait_for_output(
+            self.logger,
+            command_args,
+            self.process_limits
         )
-        return partkey
+        if not valid:
+            raise RuntimeError(f'Invalid command call {" ".join(command_args)}')
+        partkey_id = self._get_partkey_id(result)
+        self.invalidate_partkey_table()
+        return partkey_id
 
 
-    def get_partkey_id_from_acc(
+    async def delete_partkey(
         self,
-        acc: str
-    ) -> str:
-        row = self.partkey_table.query(f'parent_address == "{acc}"')
-        if len(row) == 0:
-            raise ValueError(f'No partkeys found for account ID {acc}')
-        elif len(row) > 1:
-            raise ValueError(f'More than one parkey found for account ID {acc}')
-        return row['participation_id'].values[0]
+        partkey_id: str
+    ) -> bool:
+        """Delete a participation key with `goal account deletepartkey`.
+
+        Args:
+            partkey_id (str): ID of the partkey.
+
+        Returns:
+            bool: Command validity.
+        """
+        command_args = self._deletepartkey_cmd_command_args( partkey_id )
+        valid, _ = await run_cmd_command_and_wait_for_output(
+            self.logger,
+            command_args
+        )
+        if valid:
+            self.partkey_table.remove(partkey_id)
+        return valid
 
 
-    def refresh_partkey_table(
+    async def _fetch_partkeys(
         self
-    ) -> pd.DataFrame:
-        """Retrieve participation keys and updated the internal partkey table.
+    ) -> List[ParticipationKey]:
+        """Fetch all participation keys from the node.
 
         Notes:
-            Issues two blocking system calls to `algokit` in order to fetch the participation key information.
+            Issues two system calls to `algokit` in order to fetch the participation key information, where the info
+            output is parsed line by line while it is being printed.
 
         Raises:
             RuntimeError: List or/and info command invalid.
 
         Returns:
-            pd.DataFrame: Table of participation keys.
+            List[ParticipationKey]: Participation keys.
         """
-        list_cmd_validity, list_cmd_result = run_cmd_command_and_wait_for_output(
+        list_cmd_validity, list_cmd_result = await run_cmd_command_and_wait_for_output(
             self.logger,
             self.COMMAND_LIST
         )
-        info_cmd_validity, info_cmd_result = run_cmd_command_and_wait_for_output(
-            self.logger,
-            self.COMMAND_INFO
+        if not list_cmd_validity:
+            raise RuntimeError(f'List command invalid ({list_cmd_validity})')
+        # The (potentially long) info output is parsed while it is being printed
+        parser = PartkeyinfoParser(self.logger)
+        partkeys = []
+        async with contextlib.aclosing(stream_cmd_command_output(self.logger, self.COMMAND_INFO)) as info_lines:
+            async for line in info_lines:
+                partkey = parser.feed(line)
+                if partkey is not None:
+                    partkeys.append(partkey)
+        parser.finish()
+        self._check_number_of_partkeys(
+            self._get_number_if_partkeys_from_listpartkeys_stdout(list_cmd_result),
+            len(partkeys)
         )
-        if list_cmd_validity and info_cmd_validity:
-            # Keep the worker function separate for easier testing
-            self.partkey_table = self._make_partkey_table_from_stdout(
-                list_cmd_result,
-                info_cmd_result
-            )
-            return self.partkey_table
+        return partkeys
+
+
+    def _addpartkey_cmd_command_args(
+        self,
+        del_acc: str,
+        first_valid: int,
+        last_valid: int
+    ) -> str:
+        dilution = int(round(sqrt(last_valid - last_valid)))
+        command = ['goal', 'account', 'addpartkey',
+                f'-a={del_acc}',
+                f'--roundFirstValid={first_valid}',
+                f'--roundLastValid={last_valid}',
+                f'--keyDilution={dilution}']
+        if self.use_algokit:
+            return ['algokit'] + command
         else:
-            raise RuntimeError(f'List or/and info command invalid ({list_cmd_validity} and {info_cmd_validity})')
+            return command
 
 
-    def get_partkey_table(
-            self
-        ) -> pd.DataFrame:
-        """Retrieve the internal participation key table.
+    def _deletepartkey_cmd_command_args(
+        self,
+        partkey_id: str
+    ) -> str:
+        command = ['goal', 'account', 'deletepartkey', f'--partkeyid={partkey_id}']
+        if self.use_algokit:
+            return ['algokit'] + command
+        else:
+            return command
+
+
+    @staticmethod
+    def _get_partkey_id(
+        cmd_command_return: str
+    ) -> str:
+        """Get the partkey ID from the `addpartkey` STDOUT.
+
+        Notes:
+            The ID follows `Participation ID: ` in the line that reports the successful generation, e.g.
+            `Participation key generation successful. Participation ID: <ID>`, which may be preceded by other lines
+            (e.g., Algokit update notification).
+
+        Args:
+            cmd_command_return (str): STDOUT from calling `addpartkey`.
+
+        Raises:
+            RuntimeError: No participation ID in the output.
 
         Returns:
-            pd.DataFrame: Table of participation keys.
+            str: Partkey ID.
         """
-        return self.partkey_table
+        target_str = 'Participation ID: '
+        start_index = cmd_command_return.find(target_str)
+        tokens = cmd_command_return[start_index + len(target_str):].split() if start_index >= 0 else []
+        if len(tokens) == 0:
+            raise RuntimeError(f'No participation ID in `addpartkey` output {cmd_command_return}')
+        return tokens[0]
 
 
-    def _make_partkey_table_from_stdout(
+    def _check_number_of_partkeys(
             self,
-            list_cmd_result: str,
-            info_cmd_result: str
-        ) -> pd.DataFrame:
-        """Get the participation keys from the `partkeyinfo` STDOUT.
+            num_of_listed_keys: int,
+            num_of_parsed_keys: int
+        ) -> None:
+        """Compare the number of keys from `listpartkeys` with the number of keys parsed from `partkeyinfo`.
 
         Args:
-            list_cmd_result (str): STDOUT from calling `listpartkeys`.
-            info_cmd_result (str): STDOUT from calling `partkeyinfo`.
-
-        Returns:
-            pd.DataFrame: Table of participation keys.
+            num_of_listed_keys (int): Number of keys from `listpartkeys`, the reference for the output's validity.
+            num_of_parsed_keys (int): Number of valid keys from `partkeyinfo`.
         """
-        # Get a reference number of keys for verifying master the output's validity
-        num_of_keys = self._get_number_if_partkeys_from_listpartkeys_stdout(list_cmd_result)
-        partkey_list_raw = self._filter_partkeys_from_partkeyinfo_stdout(info_cmd_result)
-        if len(partkey_list_raw) != num_of_keys:
+        if num_of_parsed_keys != num_of_listed_keys:
             self.logger.warning(
-                f'Number of keys from list {num_of_keys} and info {len(partkey_list_raw)} command do not match.'
-            )
-            # return None   # Warning, not error
-        partkey_table = self._convert_partkey_list_raw_to_table(partkey_list_raw)
-        return partkey_table
+                f'Number of keys from list {num_of_listed_keys} and info {num_of_parsed_keys} command do not match.'
+            )   # Warning, not error
 
 
     def _get_number_if_partkeys_from_listpartkeys_stdout(
@@ -282,146 +553,198 @@ class PartkeyFetcherGoal(PartkeyFetcher):
         return num_of_partkeys
 
 
-    def _filter_partkeys_from_partkeyinfo_stdout(
-            self,
-            info_cmd_result: str
-        ) -> List[List[str]]:
-        """Generate a list, containing a nested list of lines associated with an individual partkey.
+class PartkeyFetcherAlgod(PartkeyFetcher):
+
+
+    def __init__(
+        self,
+        logger: object,
+        algod_client: AsyncAlgodClient,
+        generation_timeout_s: float = 3600,
+        poll_period_s: float = 1
+    ) -> None:
+        """Initialize the interface for managing participation keys, based on algod's `/v2/participation` endpoints.
 
         Args:
-            info_cmd_result (str): STDOUT from calling `partkeyinfo`.
+            logger (object): Python logger.
+            algod_client (AsyncAlgodClient): Algod client, configured with the node's admin API token.
+            generation_timeout_s (float, optional): Time to wait for a key to be generated. Defaults to 3600.
+            poll_period_s (float, optional): Period of checking whether a key was generated. Defaults to 1.
+        """
+        super().__init__(logger)
+        self.algod_client = algod_client
+        self.generation_timeout_s = generation_timeout_s
+        self.poll_period_s = poll_period_s
+
+
+    async def close(
+        self
+    ) -> None:
+        """Close the connections of the algod client."""
+        await self.algod_client.close()
+
+
+    async def _fetch_partkeys(
+        self
+    ) -> List[ParticipationKey]:
+        """Fetch all participation keys from the node.
 
         Returns:
-            List[List[str]]: Nested list of lines associated with an individual partkey.
+            List[ParticipationKey]: Participation keys.
         """
-        # Convert string to list
-        # res = info_cmd_result.split('\n')[1:]  # Drop header
+        return [self._convert_partkey_response(partkey) for partkey in await self._list_partkeys()]
 
-        # Check if the output of `goal` features leading whitespaces
-        is_there_a_leading_space_in_partkeyinfo = self._is_there_a_leading_space_in_partkeyinfo(info_cmd_result)
-        if is_there_a_leading_space_in_partkeyinfo:
-            delimiter = ' '
-        else:
-            delimiter = ''
-
-        # Search for first entry, since number of header lines might change (e.g., Algokit update notification)
-        first_participation_id_idx = info_cmd_result.find(f'{delimiter}Participation ID:') # Note the required leading space
-        res = info_cmd_result[first_participation_id_idx:].split('\n')
-        if res[-1] == '': res.pop() # Delete final empty char in case it is the '' delimiter to avoid sspawning empty key
-        res = [delimiter] + res  # Legacy, to load first partkey after updating the retrieval function
-
-        # Get the start/end line indexes, separating individual partkeys
-        delimiter_idx = np.array([], dtype=int)
-        for i, r in enumerate(res):
-            if r == delimiter:
-                delimiter_idx = np.r_[delimiter_idx, i]
-        delimiter_idx = np.r_[delimiter_idx, len(res)]
-
-        # Group the lines of a partkey
-        partkey_list_raw = []
-        for i in range(delimiter_idx.size - 1):
-            start_idx = delimiter_idx[i] + 1
-            end_idx = delimiter_idx[i + 1]
-            partkey_list_raw.append(res[start_idx:end_idx])
-
-        # Get rid of leading space to make the succeeding format test easier
-        if is_there_a_leading_space_in_partkeyinfo:
-            partkey_list_raw = self._remove_leading_space_from_raw_partkey_rows(
-                partkey_list_raw
+
+    async def refresh_partkey(
+        self,
+        partkey_id: str
+    ) -> ParticipationKey | None:
+        """Retrieve a single participation key and update it in the internal partkey table.
+
+        Args:
+            partkey_id (str): ID of the partkey.
+
+        Returns:
+            ParticipationKey | None: Participation key or `None` if it no longer exists (and was thus removed).
+        """
+        try:
+            partkey = self._convert_partkey_response(
+                await self.algod_client.participation_key(partkey_id)
             )
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                self.partkey_table.remove(partkey_id)
+                return None
+            raise
+        self.partkey_table.upsert(partkey)
+        return partkey
 
-        if self._check_partkey_list_raw_format_validity(partkey_list_raw):
-            return partkey_list_raw
-        else:
-            self.logger.warning('Partkey format does not seem valid.')
-            return None
 
+    async def get_partkey_details(
+        self,
+        partkey_id: str
+    ) -> ParticipationKey:
+        """Get the participation key details.
 
-    def _is_there_a_leading_space_in_partkeyinfo(
-            self,
-            info_cmd_result: str
-        ) -> bool:
-        """Check if a space preceeds the key information provided by `partkeyinfo`.
+        Notes:
+            A key, missing from the partkey table, is requested directly from the node by its ID.
 
         Args:
-            info_cmd_result (str): STDOUT from calling `partkeyinfo`.
+            partkey_id (str): ID of the partkey.
+
+        Raises:
+            ValueError: No keys found for ID.
 
         Returns:
-            bool: flag, indicating the presence of a white space.
+            ParticipationKey: Participation key details.
         """
-        if info_cmd_result.find('Dumping participation key info') > -1:
-            if info_cmd_result.find(' Dumping participation key info') > -1:
-                return True
-            else:
-                return False
-        else:
-            self.logger.warning("Can not detect 'Dumping participation key info' in partkey info output.")
-            return None
+        partkey = self.partkey_table.get(partkey_id)
+        if partkey is None:
+            partkey = await self.refresh_partkey(partkey_id)
+        if partkey is None:
+            raise ValueError(f'No keys found for ID {partkey_id}')
+        return partkey
 
 
-    def _remove_leading_space_from_raw_partkey_rows(
-            self,
-            partkey_list_raw: List[List[str]]
-        ) -> List[List[str]]:
-        """Remove the leading space for each row.
+    async def generate_partkey(
+        self,
+        acc: str,
+        first_valid: int,
+        last_valid: int
+    ) -> str:
+        """Generate a participation key through algod and wait for it to become available.
+
+        Notes:
+            The generated key is added to the partkey table as soon as the node lists it.
 
         Args:
-            partkey_list_raw (_type_): Nested list of lines associated with an individual partkey.
+            acc (str): Account address.
+            first_valid (int): First round of validity.
+            last_valid (int): Last round of validity.
+
+        Raises:
+            RuntimeError: Key was not generated in time.
 
         Returns:
-            List[List[str]]: Nested list of lines associated with an individual partkey.
+            str: ID of the generated partkey.
         """
-        for pk_idx, partkey_raw in enumerate(partkey_list_raw):         # Loop partkeys
-            for row_pk_idx, row_pk in enumerate(partkey_raw):           # Loop partkey rows
-                if row_pk[0] == ' ':                                    # Check for a leading space
-                    partkey_list_raw[pk_idx][row_pk_idx] = row_pk[1:]   # Remove
-        return partkey_list_raw
+        await self.algod_client.generate_participation_key(acc, first_valid, last_valid)
+        elapsed_time_s = 0
+        while elapsed_time_s < self.generation_timeout_s:
+            for partkey in await self._list_partkeys():
+                if partkey['address'] == acc and \
+                    partkey['key']['vote-first-valid'] == first_valid and \
+                    partkey['key']['vote-last-valid'] == last_valid:
+                    self.partkey_table.upsert(self._convert_partkey_response(partkey))
+                    return partkey['id']
+            await asyncio.sleep(self.poll_period_s)
+            elapsed_time_s += self.poll_period_s
+        raise RuntimeError(f'Partkey for {acc} not generated in {self.generation_timeout_s} seconds.')
+
+
+    async def delete_partkey(
+        self,
+        partkey_id: str
+    ) -> bool:
+        """Delete a participation key through algod.
 
+        Args:
+            partkey_id (str): ID of the partkey.
 
-    def _check_partkey_list_raw_format_validity(
-            self,
-            partkey_list_raw: List[List[str]]
-        ) -> bool:
-        """Check the number of lines and the names (and order) of the partkey data, obtained via STDOUT.
+        Returns:
+            bool: Flag, indicating whether the deletion was successful.
+        """
+        try:
+            await self.algod_client.delete_participation_key(partkey_id)
+            self.partkey_table.remove(partkey_id)
+            return True
+        except AlgodHTTPError as e:
+            self.logger.warning(f'Deleting partkey {partkey_id} returned error `{e}`.')
+            return False
 
-        Args:
-            partkey_list_raw (List[List[str]]): Nested list of lines associated with an individual partkey.
+
+    async def _list_partkeys(
+        self
+    ) -> List[dict]:
+        """List the participation keys installed on the node.
 
         Returns:
-            bool: Indicator whether valid.
+            List[dict]: Participation keys, as returned by algod (empty if the node reports none).
         """
-        for partkey in partkey_list_raw:
-            if len(partkey) != 12:
-                return False
-            for line, col_val in zip(partkey, self.COLUMNS.values()):
-                if line[:len(col_val)] != col_val:
-                    return False
-        return True
+        try:
+            return await self.algod_client.participation_keys() or []
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return []
+            raise
 
 
-    def _convert_partkey_list_raw_to_table(
-            self,
-            partkey_list_raw: List[List[str]]
-        ) -> pd.DataFrame:
-        """Convert the nested list of partkey info to a table.
+    @staticmethod
+    def _convert_partkey_response(
+        partkey: dict
+    ) -> ParticipationKey:
+        """Convert the participation key, as returned by algod, to the internal format.
 
         Args:
-            partkey_list_raw (List[List[str]]): Nested list of lines associated with an individual partkey.
+            partkey (dict): Participation key, as returned by algod.
 
         Returns:
-            pd.DataFrame: Table of participation keys.
+            ParticipationKey: Participation key details.
         """
-        partkey_table = pd.DataFrame(columns=(self.COLUMNS), index=[*range(len(partkey_list_raw))])
-        for i, partkey in enumerate(partkey_list_raw):
-            # df = pd.DataFrame(columns=list(self.COLUMNS), index=[i])
-            for line in partkey:
-                key, value = line.split(':')
-                key = key.strip()   # Remove leading (and trailing spaces)
-                value = value.strip()   # Remove leading (and trailing spaces)
-                column = list(self.COLUMNS.keys())[np.squeeze(np.where( np.array(list(self.COLUMNS.values())) == key ))]
-                partkey_table.loc[i, column] = value
-            # partkey_table = pd.concat([partkey_table, df])
-        return partkey_table
+        return ParticipationKey(
+            sel_key=partkey['key']['selection-participation-key'],
+            vote_key=partkey['key']['vote-participation-key'],
+            state_proof_key=partkey['key']['state-proof-key'],
+            vote_key_dilution=int(partkey['key']['vote-key-dilution']),
+            round_start=int(partkey['key']['vote-first-valid']),
+            round_end=int(partkey['key']['vote-last-valid']),
+            participation_id=partkey['id'],
+            parent_address=partkey['address'],
+            last_vote_round=partkey.get('last-vote'),
+            last_block_proposal_round=partkey.get('last-block-proposal'),
+            effective_first_round=partkey.get('effective-first-valid'),
+            effective_last_round=partkey.get('effective-last-valid')
+        )
 
 
 
@@ -432,40 +755,32 @@ class Locksmith(object):
         self,
         logger: object,
         partkey_fetcher: PartkeyFetcher,
-        suggested_params: SuggestedParams,
-        use_algokit: bool = True
+        params_provider: SuggestedParamsProvider,
+        keygen_stats: KeygenStats | None = None,
+        simulation_guard: SimulationGuard | None = None
     ) -> None:
         self.logger = logger
         self.part_key_fetcher = partkey_fetcher
-        self.use_algokit = use_algokit
-        self.update_suggested_params(suggested_params)
-
-    def update_suggested_params(
-        self,
-        suggested_params: SuggestedParams
-    ):
-        self.suggested_params = suggested_params
+        self.keygen_stats = keygen_stats if keygen_stats is not None else KeygenStats(logger)
+        self.simulation_guard = simulation_guard or SimulationGuard(logger, enabled=False)
+        self.params_provider = params_provider
 
-    def generate_partkey(
+    async def generate_partkey(
         self: object,
         del_acc: str,
         round_start: int,
         round_end: int
     ) -> ParticipationKey:
-        command_args = self._addpartkey_cmd_command_args( del_acc, round_start, round_end )
-        valid, result = run_cmd_command_and_wait_for_output(
-            self.logger,
-            command_args
-        )
-        if not valid:
-            raise RuntimeError(f'Invalid command call {command_args.join(" ")}')
-        partkey_id = self._get_partkey_id(result)
-        self.part_key_fetcher.refresh_partkey_table()
-        partkey = self.part_key_fetcher.get_partkey_details(partkey_id)
+        start_time = time.monotonic()
+        partkey_id = await self.part_key_fetcher.generate_partkey( del_acc, round_start, round_end )
+        duration_s = time.monotonic() - start_time
+        # Served from the partkey table, which is refreshed at most once for concurrently generated keys
+        partkey = await self.part_key_fetcher.get_partkey_details(partkey_id)
+        self.keygen_stats.add(del_acc, round_start, round_end, partkey.vote_key_dilution, duration_s)
         return partkey
 
 
-    def deposit_partkey(
+    async def deposit_partkey(
         self,
         partkey: ParticipationKey,
         noticeboard_client: NoticeboardClient,
@@ -474,82 +789,54 @@ class Locksmith(object):
         del_app_id: int,
         val_app_id: int
     ) -> int:
-        result = noticeboard_client.deposit_keys(
-            del_acc=del_acc,
-            sel_key=base64.b64decode(partkey.sel_key),
-            vote_key=base64.b64decode(partkey.vote_key),
-            state_proof_key=base64.b64decode(partkey.state_proof_key),
-            vote_key_dilution=round(sqrt(partkey.vote_key_dilution)),
-            round_start=partkey.round_start,
-            round_end=partkey.round_end,
-            transaction_parameters=TransactionParameters(
-                sender=manager.address,
-                signer=manager.signer,
-                foreign_apps=[val_app_id, del_app_id],
-                accounts=[del_acc],
-                suggested_params=self.suggested_params,
-            ),
-        )
-        return result.confirmed_round
-
-
-    def _addpartkey_cmd_command_args(
-        self,
-        del_acc: str,
-        first_valid: int,
-        last_valid: int
-    ) -> str:
-        dilution = int(round(sqrt(last_valid - last_valid)))
-        command = ['goal', 'account', 'addpartkey',
-                f'-a={del_acc}',
-                f'--roundFirstValid={first_valid}',
-                f'--roundLastValid={last_valid}',
-                f'--keyDilution={dilution}']
-        if self.use_algokit:
-            return ['algokit'] + command
-        else:
-            return command
-
-
-    def _deletepartkey_cmd_command_args(
-        self,
-        partkey_id: str
-    ) -> str:
-        command = ['goal', 'account', 'deletepartkey', f'--partkeyid={partkey_id}']
-        if self.use_algokit:
-            return ['algokit'] + command
-        else:
-            return command
 
+        def build_composer(idx, suggested_params):
+            return noticeboard_client.compose().deposit_keys(
+                del_acc=del_acc,
+                sel_key=base64.b64decode(partkey.sel_key),
+                vote_key=base64.b64decode(partkey.vote_key),
+                state_proof_key=base64.b64decode(partkey.state_proof_key),
+                vote_key_dilution=round(sqrt(partkey.vote_key_dilution)),
+                round_start=partkey.round_start,
+                round_end=partkey.round_end,
+                transaction_parameters=TransactionParameters(
+                    sender=manager.address,
+                    signer=manager.signer,
+                    foreign_apps=[val_app_id, del_app_id],
+                    accounts=[del_acc],
+                    suggested_params=suggested_params[0],
+                ),
+            )
 
-    def _get_partkey_id(
-        self,
-        cmd_command_return: int
-    ) -> str:
-        target_str = 'Participation ID: '
-        start_index = cmd_command_return.split('\n')[1].find(target_str) + len(target_str)
-        partkey_id = cmd_command_return.split('\n')[1][start_index:]
-        return partkey_id
+        # The generated client is blocking, hence run it in a separate thread
+        outcomes, result = await asyncio.to_thread(
+            self.simulation_guard.execute,
+            build_composer,
+            [('deposit_keys', del_app_id)],
+            self.params_provider.get()
+        )
+        if result is None:
+            raise SimulationFailedError(
+                f'Depositing partkey to delegator app with ID {del_app_id} would fail: {outcomes[0].failure_message}'
+            )
+        return result.confirmed_round
 
 
-    def delete_del_app_partkey(
+    async def delete_del_app_partkey(
             self,
             del_acc: str
-        ) -> tuple:
+        ) -> bool:
             """Delete participation key, generated for a delegator application.
 
             Args:
                 del_acc (str): Delegator account address with checksum and base32 encoded.
 
             Returns:
-                tuple: Command validity and stdout.
+                bool: Flag, indicating whether the deletion was successful.
             """
+            await self.part_key_fetcher.get_partkey_snapshot()  # Only refreshes if invalidated
             partkey_id = self.part_key_fetcher.get_partkey_id_from_acc( del_acc )
-            command_args = self._deletepartkey_cmd_command_args( partkey_id )
-            return run_cmd_command_and_wait_for_output(
-                self.logger,
-                command_args
-            )
+            return await self.part_key_fetcher.delete_partkey( partkey_id )
 
 
 
@@ -632,19 +919,12 @@ if __name__ == '__main__':
     logger = logging.getLogger('main_logger')
     logger.setLevel(logging.DEBUG)
 
-    algorand_client = AlgorandClient.default_local_net()
-    algorand_client.set_suggested_params_timeout(0)
-
-    suggested_params = algorand_client.client.algod.suggested_params()
-    suggested_params.fee = 3 * suggested_params.min_fee
-
     locksmith = Locksmith(
         logger,
         PartkeyFetcherGoal(logger, True),
-        suggested_params,
-        True
+        SuggestedParamsProvider(logger, AsyncAlgodClient('http://localhost:4001', 'a' * 64))
     )
 
-    res = locksmith.part_key_fetcher._filter_partkeys_from_partkeyinfo_stdout(tmp)
+    res = list(PartkeyinfoParser(logger).parse(tmp.splitlines()))
 
     pass
@@ -0,0 +1,305 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .Locksmith import PartkeyFetcher
+
+
+
+@dataclass(slots=True)
+class ParticipationStats:
+    uptime: float | None                    # Share of the observed rounds with evidenced participation (lower bound),
+                                            # None if not observed
+    num_of_up_rounds: int                   # Rounds with evidenced participation
+    num_of_observed_rounds: int
+    num_of_proposals: int
+    last_vote_round: int | None
+    last_proposal_round: int | None
+
+
+
+class UptimeSeries(object):
+
+    __slots__ = (
+        'max_len',
+        'proposal_rounds',
+        'sample_rounds',
+        'cum_up_rounds',
+        'cum_observed_rounds',
+        'last_vote_round',
+    )
+
+
+    def __init__(
+        self,
+        max_len: int = 1000
+    ) -> None:
+        """Initialize the rolling participation record of an account.
+
+        Notes:
+            Stored in compact arrays of unsigned 64-bit integers, sorted by round, so that any window is looked up
+            with a binary search instead of a scan.
+            Only the rounds, in which the participation is evidenced, are counted as up: the last vote round, if it
+            changed since the previous sample, and the rounds of the blocks proposed in between, each round once.
+            As a sample only shows the last of the rounds, in which the key voted, the uptime is a lower bound of the
+            actual one, e.g. it is at most a few percent with a sample every 100 rounds.
+            The up and observed rounds are stored as cumulative sums, so that the uptime of a window is the difference
+            of two entries. Only the latest `max_len` samples and proposals are kept.
+
+        Args:
+            max_len (int, optional): Number of kept samples and proposals. Defaults to 1000.
+        """
+        self.max_len = max_len
+        self.proposal_rounds = array('Q')       # Rounds of the proposed blocks
+        self.sample_rounds = array('Q')         # Rounds of the samples of the last vote
+        self.cum_up_rounds = array('Q')         # Rounds with evidenced participation up to each sample
+        self.cum_observed_rounds = array('Q')   # Rounds observed up to each sample
+        self.last_vote_round = None
+
+
+    def add_proposal(
+        self,
+        round_num: int
+    ) -> None:
+        """Record a block proposed by the account.
+
+        Args:
+            round_num (int): Round of the block.
+        """
+        if self.proposal_rounds and round_num <= self.proposal_rounds[-1]:
+            return
+        self.proposal_rounds.append(round_num)
+        self._trim(self.proposal_rounds)
+
+
+    def add_sample(
+        self,
+        round_num: int,
+        last_vote_round: int | None
+    ) -> None:
+        """Record the last vote round of the account's key, as seen at a round.
+
+        Args:
+            round_num (int): Round of the sample.
+            last_vote_round (int | None): Last round, in which the key voted, or None if it has not voted yet.
+        """
+        if self.sample_rounds and round_num <= self.sample_rounds[-1]:
+            return
+        if self.sample_rounds:
+            previous_round = self.sample_rounds[-1]
+            num_of_rounds = round_num - previous_round
+            up_rounds = set(self.proposal_rounds[
+                bisect_right(self.proposal_rounds, previous_round):bisect_right(self.proposal_rounds, round_num)
+            ])
+            if last_vote_round is not None and last_vote_round != self.last_vote_round and \
+                    previous_round < last_vote_round <= round_num:
+                up_rounds.add(last_vote_round)  # A proposal round is a vote round too, hence counted once
+            num_of_up_rounds = len(up_rounds)
+            self.cum_up_rounds.append(self.cum_up_rounds[-1] + num_of_up_rounds)
+            self.cum_observed_rounds.append(self.cum_observed_rounds[-1] + num_of_rounds)
+        else:
+            self.cum_up_rounds.append(0)
+            self.cum_observed_rounds.append(0)
+        self.sample_rounds.append(round_num)
+        self.last_vote_round = last_vote_round
+        if len(self.sample_rounds) > 2 * self.max_len:
+            for values in (self.sample_rounds, self.cum_up_rounds, self.cum_observed_rounds):
+                del values[:len(values) - self.max_len]
+
+
+    def get_stats(
+        self,
+        first_round: int,
+        last_round: int
+    ) -> ParticipationStats:
+        """Get the participation of the account within a window of rounds.
+
+        Notes:
+            Only the periods between samples, which lie completely within the window, are counted.
+
+        Args:
+            first_round (int): First round of the window.
+            last_round (int): Last round of the window.
+
+        Returns:
+            ParticipationStats: Participation statistics.
+        """
+        i = bisect_left(self.sample_rounds, first_round)
+        j = bisect_right(self.sample_rounds, last_round) - 1
+        num_of_up_rounds, num_of_observed_rounds = 0, 0
+        if j > i:
+            num_of_up_rounds = self.cum_up_rounds[j] - self.cum_up_rounds[i]
+            num_of_observed_rounds = self.cum_observed_rounds[j] - self.cum_observed_rounds[i]
+        k = bisect_right(self.proposal_rounds, last_round)
+        return ParticipationStats(
+            uptime=num_of_up_rounds / num_of_observed_rounds if num_of_observed_rounds > 0 else None,
+            num_of_up_rounds=num_of_up_rounds,
+            num_of_observed_rounds=num_of_observed_rounds,
+            num_of_proposals=k - bisect_left(self.proposal_rounds, first_round),
+            last_vote_round=self.last_vote_round,
+            last_proposal_round=self.proposal_rounds[k - 1] if k > 0 else None
+        )
+
+
+    def _trim(
+        self,
+        values: array
+    ) -> None:
+        if len(values) > 2 * self.max_len:  # Amortized, instead of shifting the array on each append
+            del values[:len(values) - self.max_len]
+
+
+
+class ParticipationHealth(object):
+
+
+    def __init__(
+        self,
+        logger: object,
+        partkey_fetcher: PartkeyFetcher,
+        sample_period_rounds: int = 100,
+        window_rounds: int = 10_000,
+        max_len: int = 1000
+    ) -> None:
+        """Initialize the tracking of the participation of the hosted delegators.
+
+        Notes:
+            The record of a delegator is started once its contract becomes active (see `track`).
+            Proposals are recorded from the proposer field of the followed block headers, and from the last proposal
+            round of the delegators' partkeys (for networks, whose block headers do not include the proposer).
+            Every `sample_period_rounds` rounds, the partkeys are read from the node and their last vote round is
+            sampled. The participation of a delegator over the latest `window_rounds` rounds is then logged, with a
+            warning if none was evidenced over the whole window.
+            The uptime, guaranteed in the contract (`uptime_gar`), is not checked, as the samples only yield a lower
+            bound of the actual uptime.
+
+        Args:
+            logger (object): Python logger.
+            partkey_fetcher (PartkeyFetcher): Partkey fetcher, whose table is refreshed for the samples.
+            sample_period_rounds (int, optional): Number of rounds between samples. Defaults to 100.
+            window_rounds (int, optional): Number of latest rounds, over which the uptime is reported. Defaults to
+                10_000.
+            max_len (int, optional): Number of samples and proposals kept for each delegator. Defaults to 1000.
+        """
+        self.logger = logger
+        self.partkey_fetcher = partkey_fetcher
+        self.sample_period_rounds = sample_period_rounds
+        self.window_rounds = window_rounds
+        self.max_len = max_len
+
+        self.series: Dict[str, UptimeSeries] = dict()   # Participation record of each hosted delegator account
+        self.last_sample_round = None
+
+
+    def track(
+        self,
+        del_acc: str
+    ) -> None:
+        """Start the participation record of a delegator account, whose contract became active.
+
+        Args:
+            del_acc (str): Delegator account address.
+        """
+        self.get_series(del_acc)
+
+
+    def get_series(
+        self,
+        del_acc: str
+    ) -> UptimeSeries:
+        """Get the participation record of a delegator account, starting a new one if there is none.
+
+        Args:
+            del_acc (str): Delegator account address.
+
+        Returns:
+            UptimeSeries: Participation record.
+        """
+        series = self.series.get(del_acc)
+        if series is None:
+            series = self.series[del_acc] = UptimeSeries(self.max_len)
+        return series
+
+
+    def record_proposers(
+        self,
+        proposers: List[Tuple[int, str]]
+    ) -> None:
+        """Record the blocks proposed by the hosted delegators, whose record was started.
+
+        Args:
+            proposers (List[Tuple[int, str]]): Round and proposer address of each followed block.
+        """
+        for round_num, proposer in proposers:
+            series = self.series.get(proposer)
+            if series is not None:
+                series.add_proposal(round_num)
+
+
+    def is_sample_due(
+        self,
+        current_round: int
+    ) -> bool:
+        """Check whether the partkeys are due for a sample.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            bool: Flag, indicating whether a sample is due.
+        """
+        return self.last_sample_round is None or current_round - self.last_sample_round >= self.sample_period_rounds
+
+
+    async def sample(
+        self,
+        current_round: int,
+        del_apps: Dict[int, dict]
+    ) -> Dict[int, ParticipationStats]:
+        """Sample the partkeys of the active delegator contracts and report the delegators' participation.
+
+        Args:
+            current_round (int): Current round.
+            del_apps (Dict[int, dict]): Delegator app IDs and states, by app ID.
+
+        Returns:
+            Dict[int, ParticipationStats]: Participation statistics over the latest window, by delegator app ID.
+        """
+        self.last_sample_round = current_round
+        partkey_table = await self.partkey_fetcher.refresh_partkey_table()
+        active_del_apps = {
+            del_app_id: del_app for del_app_id, del_app in del_apps.items() if del_app['state'].keys_confirmed
+        }
+        active_del_accs = {del_app['state'].del_acc for del_app in active_del_apps.values()}
+        self.series = {k: v for k, v in self.series.items() if k in active_del_accs}
+
+        del_app_stats = dict()
+        for del_app_id, del_app in active_del_apps.items():
+            del_app_state = del_app['state']
+            series = self.get_series(del_app_state.del_acc)
+            partkeys = partkey_table.get_by_address(del_app_state.del_acc)
+            last_vote_rounds = [pk.last_vote_round for pk in partkeys if pk.last_vote_round is not None]
+            last_proposal_rounds = [
+                pk.last_block_proposal_round for pk in partkeys if pk.last_block_proposal_round is not None
+            ]
+            if last_proposal_rounds:
+                series.add_proposal(max(last_proposal_rounds))
+            series.add_sample(current_round, max(last_vote_rounds) if last_vote_rounds else None)
+
+            stats = series.get_stats(max(current_round - self.window_rounds, 0), current_round)
+            del_app_stats[del_app_id] = stats
+            if stats.uptime is None:
+                continue
+            self.logger.debug(
+                f'Delegator app with ID {del_app_id}: participation evidenced in {stats.num_of_up_rounds} of ' +
+                f'{stats.num_of_observed_rounds} rounds, {stats.num_of_proposals} proposal(s), last vote in round ' +
+                f'{stats.last_vote_round}, last proposal in round {stats.last_proposal_round}.'
+            )
+            if stats.num_of_up_rounds == 0 and \
+                    stats.num_of_observed_rounds >= self.window_rounds - self.sample_period_rounds:
+                self.logger.warning(
+                    f'Delegator app with ID {del_app_id} neither voted nor proposed in the last ' +
+                    f'{stats.num_of_observed_rounds} rounds.'
+                )
+        return del_app_stats
@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List
+
+
+
+@dataclass(slots=True)
+class ParticipationKey:
+    sel_key: str            # str, from `goal account partkeyinfo`
+    vote_key: str           # str, from `goal account partkeyinfo`
+    state_proof_key: str    # str, from `goal account partkeyinfo`
+    vote_key_dilution: int  # int(round(Sqrt(duration)))
+    round_start: int        # Take from delegator contract
+    round_end: int          # Take from delegator contract
+    participation_id: str = ''                  # ID of the key on the node
+    parent_address: str = ''                    # Account for which the key was generated
+    last_vote_round: int | None = None          # None if the key has not voted yet
+    last_block_proposal_round: int | None = None
+    effective_first_round: int | None = None    # None if the key is not registered on chain
+    effective_last_round: int | None = None
+
+
+
+class PartkeyRegistry(object):
+
+
+    def __init__(
+        self
+    ) -> None:
+        """Initialize an in-memory registry of participation keys, indexed by participation ID and parent address."""
+        self.by_id: Dict[str, ParticipationKey] = dict()
+        self.by_address: Dict[str, Dict[str, ParticipationKey]] = dict()
+
+
+    def __len__(
+        self
+    ) -> int:
+        return len(self.by_id)
+
+
+    def __iter__(
+        self
+    ) -> Iterator[ParticipationKey]:
+        return iter(list(self.by_id.values()))
+
+
+    def __contains__(
+        self,
+        partkey_id: str
+    ) -> bool:
+        return partkey_id in self.by_id
+
+
+    def get(
+        self,
+        partkey_id: str
+    ) -> ParticipationKey | None:
+        """Get a participation key by its ID.
+
+        Args:
+            partkey_id (str): ID of the partkey.
+
+        Returns:
+            ParticipationKey | None: Participation key or `None` if not registered.
+        """
+        return self.by_id.get(partkey_id)
+
+
+    def get_by_address(
+        self,
+        address: str
+    ) -> List[ParticipationKey]:
+        """Get the participation keys of an account.
+
+        Args:
+            address (str): Parent address.
+
+        Returns:
+            List[ParticipationKey]: Participation keys of the account.
+        """
+        return list(self.by_address.get(address, dict()).values())
+
+
+    def upsert(
+        self,
+        partkey: ParticipationKey
+    ) -> None:
+        """Add a participation key or replace the registered one with the same ID.
+
+        Args:
+            partkey (ParticipationKey): Participation key.
+        """
+        old_partkey = self.by_id.get(partkey.participation_id)
+        if old_partkey is not None and old_partkey.parent_address != partkey.parent_address:
+            self._remove_from_address_index(old_partkey)
+        self.by_id[partkey.participation_id] = partkey
+        self.by_address.setdefault(partkey.parent_address, dict())[partkey.participation_id] = partkey
+
+
+    def remove(
+        self,
+        partkey_id: str
+    ) -> ParticipationKey | None:
+        """Remove a participation key.
+
+        Args:
+            partkey_id (str): ID of the partkey.
+
+        Returns:
+            ParticipationKey | None: Removed participation key or `None` if it was not registered.
+        """
+        partkey = self.by_id.pop(partkey_id, None)
+        if partkey is not None:
+            self._remove_from_address_index(partkey)
+        return partkey
+
+
+    def update(
+        self,
+        partkeys: Iterable[ParticipationKey],
+        complete: bool = True
+    ) -> None:
+        """Update the registry in place.
+
+        Args:
+            partkeys (Iterable[ParticipationKey]): Fetched participation keys.
+            complete (bool, optional): Flag, indicating that the fetched keys are all the keys on the node, i.e. any
+                other registered keys should be removed. Defaults to True.
+        """
+        seen_ids = set()
+        for partkey in partkeys:
+            seen_ids.add(partkey.participation_id)
+            self.upsert(partkey)
+        if complete:
+            for partkey_id in set(self.by_id) - seen_ids:
+                self.remove(partkey_id)
+
+
+    def _remove_from_address_index(
+        self,
+        partkey: ParticipationKey
+    ) -> None:
+        address_partkeys = self.by_address.get(partkey.parent_address)
+        if address_partkeys is None:
+            return
+        address_partkeys.pop(partkey.participation_id, None)
+        if len(address_partkeys) == 0:
+            del self.by_address[partkey.parent_address]
@@ -0,0 +1,193 @@
+from typing import Iterable, Iterator
+
+from .PartkeyRegistry import ParticipationKey
+
+
+
+def parse_optional_round(
+    value: str
+) -> int | None:
+    """Parse a round number, reported by `goal`, which can also be `N/A`.
+
+    Args:
+        value (str): Reported value.
+
+    Returns:
+        int | None: Round number or `None` if not available.
+    """
+    return int(value) if value.isdigit() else None
+
+
+
+class PartkeyinfoParser(object):
+
+    # Columns used in the participation key table (parameters of each partkey), in the order printed by `goal`
+    COLUMNS = dict(
+        participation_id='Participation ID',
+        parent_address='Parent address',
+        last_vote_round='Last vote round',
+        last_block_proposal_round='Last block proposal round',
+        effective_first_round='Effective first round',
+        effective_last_round='Effective last round',
+        first_round='First round',
+        last_round='Last round',
+        key_dilution='Key dilution',
+        selection_key='Selection key',
+        voting_key='Voting key',
+        state_proof_key='State proof key'
+    )
+
+    # Column lookup by the name, printed by `goal`
+    COLUMN_KEYS = {column_name: column for column, column_name in COLUMNS.items()}
+
+    # Expected column at each line of a partkey
+    COLUMN_ORDER = tuple(COLUMNS)
+
+    # Name of the first line of each partkey
+    FIRST_COLUMN_NAME = COLUMNS['participation_id']
+
+
+    def __init__(
+        self,
+        logger: object = None
+    ) -> None:
+        """Initialize a single-pass parser of the `goal account partkeyinfo` output.
+
+        Notes:
+            Lines are fed one at a time, so the output can be parsed while it is being read from the command.
+            Anything before the first partkey (e.g., `algokit` update prompts and the `Dumping ...` header) is skipped
+            and leading or trailing spaces are ignored.
+            A partkey with missing, unknown, or out-of-order lines is dropped and counted in `num_of_invalid`.
+
+        Args:
+            logger (object, optional): Python logger. Defaults to None.
+        """
+        self.logger = logger
+        self.row = None             # Values of the partkey being parsed, keyed by the column
+        self.skipping = False       # Flag, indicating that the lines of an invalid partkey are being skipped
+        self.num_of_parsed = 0
+        self.num_of_invalid = 0
+
+
+    def feed(
+        self,
+        line: str
+    ) -> ParticipationKey | None:
+        """Parse a line of the output.
+
+        Args:
+            line (str): Line of the output.
+
+        Returns:
+            ParticipationKey | None: Participation key if the line completed one, otherwise `None`.
+        """
+        line = line.strip()
+        if not line:                                # Partkeys are separated by empty lines
+            if self.row is not None:
+                self._drop_row('incomplete')
+            self.skipping = False
+            return None
+        if self.skipping:
+            return None
+
+        name, separator, value = line.partition(':')
+        name = name.rstrip()
+        if self.row is None:
+            if not separator or name != self.FIRST_COLUMN_NAME:
+                return None                         # Header or other line outside of a partkey
+            self.row = dict()
+
+        column = self.COLUMN_ORDER[len(self.row)]
+        if not separator or self.COLUMN_KEYS.get(name) != column:
+            self._drop_row(f'unexpected line `{line}`')
+            self.skipping = True
+            return None
+        self.row[column] = value.strip()
+
+        if len(self.row) < len(self.COLUMN_ORDER):
+            return None
+        row, self.row = self.row, None
+        try:
+            partkey = self.convert_partkey_row(row)
+        except ValueError as e:
+            self.num_of_invalid += 1
+            self._warn(f'Dropping partkey {row["participation_id"]} with invalid values ({e}).')
+            return None
+        self.num_of_parsed += 1
+        return partkey
+
+
+    def finish(
+        self
+    ) -> None:
+        """Mark the end of the output, dropping a partkey that was cut short."""
+        if self.row is not None:
+            self._drop_row('incomplete')
+        self.skipping = False
+
+
+    def parse(
+        self,
+        lines: Iterable[str]
+    ) -> Iterator[ParticipationKey]:
+        """Parse the output, yielding the participation keys as they are completed.
+
+        Args:
+            lines (Iterable[str]): Lines of the output, e.g. an open file or `str.splitlines()`.
+
+        Yields:
+            ParticipationKey: Participation key.
+        """
+        for line in lines:
+            partkey = self.feed(line)
+            if partkey is not None:
+                yield partkey
+        self.finish()
+
+
+    @staticmethod
+    def convert_partkey_row(
+        row: dict
+    ) -> ParticipationKey:
+        """Convert the values of a partkey, printed by `goal`, to a participation key.
+
+        Args:
+            row (dict): Values of a partkey, keyed by the column.
+
+        Raises:
+            ValueError: Non-numeric dilution or validity rounds.
+
+        Returns:
+            ParticipationKey: Participation key.
+        """
+        return ParticipationKey(
+            sel_key=row['selection_key'],
+            vote_key=row['voting_key'],
+            state_proof_key=row['state_proof_key'],
+            vote_key_dilution=int(row['key_dilution']),
+            round_start=int(row['first_round']),
+            round_end=int(row['last_round']),
+            participation_id=row['participation_id'],
+            parent_address=row['parent_address'],
+            last_vote_round=parse_optional_round(row['last_vote_round']),
+            last_block_proposal_round=parse_optional_round(row['last_block_proposal_round']),
+            effective_first_round=parse_optional_round(row['effective_first_round']),
+            effective_last_round=parse_optional_round(row['effective_last_round'])
+        )
+
+
+    def _drop_row(
+        self,
+        reason: str
+    ) -> None:
+        self.num_of_invalid += 1
+        self._warn(f'Partkey format does not seem valid ({reason}), dropping partkey {self.row.get("participation_id")}.')
+        self.row = None
+
+
+    def _warn(
+        self,
+        message: str
+    ) -> None:
+        if self.logger is not None:
+            self.logger.warning(message)
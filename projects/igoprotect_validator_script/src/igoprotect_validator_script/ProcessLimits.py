@@ -0,0 +1,136 @@
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+
+
+class ProcessLimits(object):
+
+    # I/O scheduling classes, as accepted by `ionice -c`
+    IONICE_CLASSES = {'realtime': 1, 'best-effort': 2, 'idle': 3}
+
+    # Period of the cgroup v2 CPU bandwidth control
+    CGROUP_CPU_PERIOD_US = 100_000
+
+    # Shell wrapper, which moves itself into the cgroup (path as `$0`) and then executes the command in its place
+    # (without joining, if the cgroup can not be written, rather than failing the key generation)
+    CGROUP_WRAPPER = ['sh', '-c', 'echo $$ 2>/dev/null > "$0"; exec "$@"']
+
+
+    def __init__(
+        self,
+        logger: object,
+        nice: int | None = None,
+        ionice_class: str | None = None,
+        ionice_level: int | None = None,
+        cgroup_path: str | None = None,
+        cpu_quota_percent: float | None = None
+    ) -> None:
+        """Initialize the CPU and I/O limits of the processes spawned for heavy work (i.e. key generation).
+
+        Notes:
+            The niceness and I/O class are applied by prefixing the command with `nice` and `ionice`.
+            The CPU quota is applied through a cgroup (v2) with the corresponding `cpu.max`. The command is run
+            through a shell wrapper, which joins the cgroup before it executes the command, so that the command and
+            all its children are limited too. The cgroup is not joined in the forked child of the (multithreaded)
+            script, where only async-signal-safe work is safe.
+            The cgroup must either already exist or its parent must be writable (e.g., delegated to the user that runs
+            the script).
+            The limits only apply to processes on the host. They do not reach a command that is run inside a
+            container (e.g., `goal` of `algokit`, which is executed in the LocalNet container).
+            Limits that can not be applied on the host are disabled with a warning.
+
+        Args:
+            logger (object): Python logger.
+            nice (int | None, optional): Niceness increment. Defaults to None (inherit).
+            ionice_class (str | None, optional): I/O scheduling class (`realtime`, `best-effort`, or `idle`).
+                Defaults to None (inherit).
+            ionice_level (int | None, optional): I/O priority level within the class (0-7). Defaults to None.
+            cgroup_path (str | None, optional): Path to the cgroup for the spawned processes. Defaults to None.
+            cpu_quota_percent (float | None, optional): CPU quota of the cgroup in percent of a single CPU, e.g. 150
+                for one and a half CPUs. Defaults to None (no quota).
+
+        Raises:
+            ValueError: Unknown I/O scheduling class.
+        """
+        self.logger = logger
+        if ionice_class is not None and ionice_class not in self.IONICE_CLASSES:
+            raise ValueError(f'Unknown I/O scheduling class `{ionice_class}`, expected one of {list(self.IONICE_CLASSES)}.')
+
+        self.command_prefix = []
+        if nice is not None:
+            if shutil.which('nice'):
+                self.command_prefix += ['nice', '-n', str(nice)]
+            else:
+                self.logger.warning('Can not find `nice`, ignoring the niceness limit.')
+        if ionice_class is not None:
+            if shutil.which('ionice'):
+                self.command_prefix += ['ionice', '-c', str(self.IONICE_CLASSES[ionice_class])]
+                if ionice_level is not None and ionice_class != 'idle':
+                    self.command_prefix += ['-n', str(ionice_level)]
+            else:
+                self.logger.warning('Can not find `ionice`, ignoring the I/O scheduling limit.')
+
+        self.cgroup_path = None
+        if cgroup_path:
+            self.cgroup_path = self._setup_cgroup(Path(cgroup_path), cpu_quota_percent)
+        elif cpu_quota_percent is not None:
+            self.logger.warning('CPU quota requires a cgroup path, ignoring the CPU quota.')
+
+
+    def wrap_command(
+        self,
+        command_args: List[str]
+    ) -> List[str]:
+        """Wrap a command, so that it joins the cgroup, and prefix it with the niceness and I/O scheduling limits.
+
+        Args:
+            command_args (List[str]): Strings of individual words that make up the command.
+
+        Returns:
+            List[str]: Limited command.
+        """
+        cgroup_wrapper = []
+        if self.cgroup_path is not None:
+            cgroup_wrapper = self.CGROUP_WRAPPER + [str(Path(self.cgroup_path, 'cgroup.procs'))]
+        return cgroup_wrapper + self.command_prefix + list(command_args)
+
+
+    def is_active(
+        self
+    ) -> bool:
+        """Check whether any limit is applied.
+
+        Returns:
+            bool: Flag, indicating whether any limit is applied.
+        """
+        return len(self.command_prefix) > 0 or self.cgroup_path is not None
+
+
+    def _setup_cgroup(
+        self,
+        cgroup_path: Path,
+        cpu_quota_percent: float | None
+    ) -> Path | None:
+        """Create the cgroup and set its CPU quota.
+
+        Args:
+            cgroup_path (Path): Path to the cgroup.
+            cpu_quota_percent (float | None): CPU quota in percent of a single CPU.
+
+        Returns:
+            Path | None: Path to the cgroup or `None` if it can not be used.
+        """
+        try:
+            os.makedirs(cgroup_path, exist_ok=True)
+            if cpu_quota_percent is not None:
+                quota_us = max(int(self.CGROUP_CPU_PERIOD_US * cpu_quota_percent / 100), 1000)
+                Path(cgroup_path, 'cpu.max').write_text(f'{quota_us} {self.CGROUP_CPU_PERIOD_US}')
+            if not os.access(Path(cgroup_path, 'cgroup.procs'), os.W_OK):
+                raise PermissionError(f'{Path(cgroup_path, "cgroup.procs")} is not writable')
+        except OSError as e:
+            self.logger.warning(f'Can not set up cgroup {cgroup_path} ({e}), ignoring the cgroup limits.')
+            return None
+        self.logger.info(f'Key generation limited by cgroup {cgroup_path} (CPU quota {cpu_quota_percent} %).')
+        return cgroup_path
@@ -0,0 +1,284 @@
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+
+class TokenBucket(object):
+
+
+    def __init__(
+        self,
+        requests_per_s: float,
+        burst: float
+    ) -> None:
+        """Initialize a token bucket, which refills at `requests_per_s` up to `burst` tokens.
+
+        Notes:
+            Thread-safe, since the generated clients issue their requests in separate threads.
+
+        Args:
+            requests_per_s (float): Refill rate, i.e. the sustained number of requests per second.
+            burst (float): Capacity, i.e. the number of requests that can be issued at once.
+        """
+        self.requests_per_s = requests_per_s
+        self.burst = burst
+        self.tokens = burst
+        self.refill_time = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.num_of_requests = 0
+        self.num_of_throttled = 0
+        self.wait_s = 0.0
+
+
+    def take(
+        self,
+        num_of_needed_tokens: float
+    ) -> float:
+        """Take a token if at least `num_of_needed_tokens` are available.
+
+        Args:
+            num_of_needed_tokens (float): Number of tokens, which have to be available (at least one).
+
+        Returns:
+            float: Time to wait before trying again, or 0 if the token was taken.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.refill_time) * self.requests_per_s)
+            self.refill_time = now
+            if self.tokens >= num_of_needed_tokens:
+                self.tokens -= 1
+                self.num_of_requests += 1
+                return 0.0
+            return (num_of_needed_tokens - self.tokens) / self.requests_per_s
+
+
+    def get_remaining(
+        self
+    ) -> float:
+        """Get the number of tokens currently available.
+
+        Returns:
+            float: Number of tokens.
+        """
+        with self.lock:
+            elapsed_s = time.monotonic() - self.refill_time
+            return min(self.burst, self.tokens + elapsed_s * self.requests_per_s)
+
+
+
+class RateLimiter(object):
+
+    # Request priorities, from the most to the least urgent
+    PRIORITY_SUBMIT = 0         # Submission of transactions
+    PRIORITY_CRITICAL = 1       # Reads, on which deadlines and submissions depend
+    PRIORITY_BACKGROUND = 2     # Periodic refreshes, e.g. of the suggested parameters and of the endpoints' health
+
+    # Fraction of the burst, which a request of each priority leaves for the more urgent ones
+    RESERVE_FRACTIONS = {
+        PRIORITY_SUBMIT: 0.0,
+        PRIORITY_CRITICAL: 0.2,
+        PRIORITY_BACKGROUND: 0.5,
+    }
+
+    # Paths of the transaction submission endpoints
+    SUBMIT_PATHS = frozenset({'/v2/transactions', '/v2/transactions/async'})
+
+    # Paths of the endpoints, which are only refreshed in the background
+    BACKGROUND_PATHS = frozenset({'/v2/transactions/params'})
+
+
+    def __init__(
+        self,
+        logger: object,
+        requests_per_s: float,
+        burst: float | None = None
+    ) -> None:
+        """Initialize a client-side rate limiter with a request budget per endpoint (server address).
+
+        Notes:
+            Hosted algod and indexer providers limit the number of requests per second, hence each endpoint gets its
+            own token bucket, which refills at `requests_per_s` up to `burst` requests. Retries take a token too.
+            Less urgent requests leave a reserve of tokens to the more urgent ones, so that transaction submissions
+            and deadline-critical reads pass first when the budget runs low, while background refreshes wait.
+
+        Args:
+            logger (object): Python logger.
+            requests_per_s (float): Sustained number of requests per second to each endpoint.
+            burst (float | None, optional): Number of requests, which can be issued at once to each endpoint.
+                Defaults to None (one second's worth). At least one.
+
+        Raises:
+            ValueError: Non-positive rate.
+        """
+        if requests_per_s <= 0:
+            raise ValueError(f'Rate limit has to be positive, got {requests_per_s} requests per second.')
+        self.logger = logger
+        self.requests_per_s = requests_per_s
+        self.burst = max(1.0, float(burst if burst is not None else requests_per_s))
+
+        self.buckets: Dict[str, TokenBucket] = dict()
+        self.lock = threading.Lock()
+
+
+    @classmethod
+    def get_priority(
+        cls,
+        method: str,
+        path: str
+    ) -> int:
+        """Get the default priority of a request.
+
+        Args:
+            method (str): Request method.
+            path (str): Request path, possibly including the query parameters.
+
+        Returns:
+            int: Priority.
+        """
+        path = path.split('?')[0]
+        if method.upper() == 'POST' and path in cls.SUBMIT_PATHS:
+            return cls.PRIORITY_SUBMIT
+        if path in cls.BACKGROUND_PATHS:
+            return cls.PRIORITY_BACKGROUND
+        return cls.PRIORITY_CRITICAL
+
+
+    def get_bucket(
+        self,
+        endpoint: str
+    ) -> TokenBucket:
+        """Get the token bucket of an endpoint.
+
+        Args:
+            endpoint (str): Server address.
+
+        Returns:
+            TokenBucket: Token bucket.
+        """
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.setdefault(endpoint, TokenBucket(self.requests_per_s, self.burst))
+        return bucket
+
+
+    def try_acquire(
+        self,
+        endpoint: str,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> bool:
+        """Take a token for a request if the budget allows it now, without waiting.
+
+        Args:
+            endpoint (str): Server address.
+            priority (int, optional): Request priority. Defaults to PRIORITY_BACKGROUND.
+
+        Returns:
+            bool: Flag, indicating whether the request may be issued.
+        """
+        return self.get_bucket(endpoint).take(self._get_num_of_needed_tokens(priority)) == 0
+
+
+    def acquire(
+        self,
+        endpoint: str,
+        priority: int = PRIORITY_CRITICAL
+    ) -> None:
+        """Wait (blocking) until the budget allows a request.
+
+        Args:
+            endpoint (str): Server address.
+            priority (int, optional): Request priority. Defaults to PRIORITY_CRITICAL.
+        """
+        bucket = self.get_bucket(endpoint)
+        num_of_needed_tokens = self._get_num_of_needed_tokens(priority)
+        wait_s = bucket.take(num_of_needed_tokens)
+        if wait_s > 0:
+            start_time = time.monotonic()
+            while wait_s > 0:
+                time.sleep(wait_s)
+                wait_s = bucket.take(num_of_needed_tokens)
+            self._record_throttled(bucket, endpoint, priority, time.monotonic() - start_time)
+
+
+    async def acquire_async(
+        self,
+        endpoint: str,
+        priority: int = PRIORITY_CRITICAL
+    ) -> None:
+        """Wait (asynchronously) until the budget allows a request.
+
+        Args:
+            endpoint (str): Server address.
+            priority (int, optional): Request priority. Defaults to PRIORITY_CRITICAL.
+        """
+        bucket = self.get_bucket(endpoint)
+        num_of_needed_tokens = self._get_num_of_needed_tokens(priority)
+        wait_s = bucket.take(num_of_needed_tokens)
+        if wait_s > 0:
+            start_time = time.monotonic()
+            while wait_s > 0:
+                await asyncio.sleep(wait_s)
+                wait_s = bucket.take(num_of_needed_tokens)
+            self._record_throttled(bucket, endpoint, priority, time.monotonic() - start_time)
+
+
+    def get_stats(
+        self
+    ) -> Dict[str, dict]:
+        """Get the budget of each endpoint.
+
+        Returns:
+            Dict[str, dict]: Remaining requests (tokens), their share of the burst in percent, and the number of
+                requests, throttled requests, and the total throttling time in seconds of each endpoint.
+        """
+        stats = dict()
+        for endpoint, bucket in list(self.buckets.items()):
+            remaining = bucket.get_remaining()
+            stats[endpoint] = dict(
+                remaining=round(remaining, 1),
+                remaining_percent=round(100 * remaining / bucket.burst, 1),
+                requests=bucket.num_of_requests,
+                throttled=bucket.num_of_throttled,
+                wait_s=round(bucket.wait_s, 1)
+            )
+        return stats
+
+
+    def summary(
+        self
+    ) -> str:
+        """Summarize the budget of each endpoint.
+
+        Returns:
+            str: Summary.
+        """
+        return '; '.join(
+            f'{endpoint}: {s["remaining"]} req left ({s["remaining_percent"]} %), {s["requests"]} req, ' +
+            f'{s["throttled"]} throttled for {s["wait_s"]} s'
+            for endpoint, s in sorted(self.get_stats().items())
+        )
+
+
+    def _get_num_of_needed_tokens(
+        self,
+        priority: int
+    ) -> float:
+        return min(self.burst, 1 + self.RESERVE_FRACTIONS.get(priority, 0.0) * self.burst)
+
+
+    def _record_throttled(
+        self,
+        bucket: TokenBucket,
+        endpoint: str,
+        priority: int,
+        wait_s: float
+    ) -> None:
+        with bucket.lock:
+            bucket.num_of_throttled += 1
+            bucket.wait_s += wait_s
+        self.logger.debug(f'Throttled request (priority {priority}) to {endpoint} for {round(wait_s, 2)} s.')
@@ -0,0 +1,119 @@
+import heapq
+import itertools
+from typing import Dict, Hashable, List
+
+
+
+class DeadlineScheduler(object):
+
+    # Placeholder for entries that were rescheduled or discarded (lazy deletion from the heap)
+    REMOVED = '<removed>'
+
+
+    def __init__(
+        self
+    ) -> None:
+        """Initialize a priority queue of keys, keyed on the round at which they are due for an evaluation.
+
+        Notes:
+            Each key (e.g. a delegator app ID) has at most one pending due round.
+            Scheduling a key again replaces its pending due round.
+        """
+        self.heap: List[list] = []
+        self.entries: Dict[Hashable, list] = dict()
+        self.counter = itertools.count()    # Tie-breaker, keeping insertion order for keys due at the same round
+
+
+    def __len__(
+        self
+    ) -> int:
+        return len(self.entries)
+
+
+    def __contains__(
+        self,
+        key: Hashable
+    ) -> bool:
+        return key in self.entries
+
+
+    def schedule(
+        self,
+        key: Hashable,
+        due_round: int
+    ) -> None:
+        """Schedule a key, replacing its pending due round.
+
+        Args:
+            key (Hashable): Key, e.g. delegator app ID.
+            due_round (int): Round at which the key becomes due.
+        """
+        self.discard(key)
+        entry = [due_round, next(self.counter), key]
+        self.entries[key] = entry
+        heapq.heappush(self.heap, entry)
+
+
+    def discard(
+        self,
+        key: Hashable
+    ) -> None:
+        """Remove the pending due round of a key, if any.
+
+        Args:
+            key (Hashable): Key.
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            entry[-1] = self.REMOVED
+
+
+    def get(
+        self,
+        key: Hashable
+    ) -> int | None:
+        """Get the pending due round of a key.
+
+        Args:
+            key (Hashable): Key.
+
+        Returns:
+            int | None: Due round or `None` if nothing is pending.
+        """
+        entry = self.entries.get(key)
+        return entry[0] if entry is not None else None
+
+
+    def next_due_round(
+        self
+    ) -> int | None:
+        """Get the earliest pending due round.
+
+        Returns:
+            int | None: Round or `None` if nothing is pending.
+        """
+        while self.heap and self.heap[0][-1] is self.REMOVED:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+
+    def pop_due(
+        self,
+        current_round: int
+    ) -> List[Hashable]:
+        """Remove and return all keys that are due at the current round, earliest first.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            List[Hashable]: Due keys.
+        """
+        due = []
+        while self.heap and self.heap[0][0] <= current_round:
+            _, _, key = heapq.heappop(self.heap)
+            if key is self.REMOVED:
+                continue
+            del self.entries[key]
+            due.append(key)
+        return due
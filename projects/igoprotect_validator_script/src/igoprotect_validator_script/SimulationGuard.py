@@ -0,0 +1,218 @@
+import copy
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from algosdk.atomic_transaction_composer import AtomicTransactionResponse
+from algosdk.transaction import SuggestedParams
+
+from .FeeEstimator import FeeEstimator
+from .NoticeboardClient import Composer
+
+
+
+@dataclass(slots=True, frozen=True)
+class SimulationOutcome:
+    would_succeed: bool
+    failure_message: str = ''
+    num_of_inner_txns: int = 0      # Number of inner transactions (at any depth), issued by the call
+    fee: int = 0                    # Exact fee, covering the call and its inner transactions
+
+
+
+class SimulationFailedError(RuntimeError):
+    """A call was not submitted, because its simulation failed."""
+
+
+
+class SimulationGuard(object):
+
+    # Fee of each simulated call as a multiple of the minimum fee, high enough to cover the calls' inner transactions
+    SIMULATION_FEE_MULTIPLIER = 16
+
+
+    def __init__(
+        self,
+        logger: object,
+        enabled: bool = True,
+        max_cache_size: int = 10_000,
+        fee_estimator: FeeEstimator | None = None
+    ) -> None:
+        """Initialize the pre-flight check of app calls through algod's `simulate` endpoint.
+
+        Notes:
+            The outcome of each call is cached per key (e.g., method and contract) and round, so that a call that is
+            bound to fail is not simulated (nor submitted) again in the same round.
+            The number of inner transactions, reported by the simulation, is used for setting the exact fee of the
+            call, since the contracts issue their inner transactions with a zero fee (fee pooling). It is also passed
+            on to the fee estimator, which otherwise relies on the static fee profile of the method.
+            When disabled, calls are submitted without simulation at the fee of their profile.
+            The key of each call is a tuple, starting with the method name (e.g., method name and app ID).
+
+        Args:
+            logger (object): Python logger.
+            enabled (bool, optional): Flag, indicating whether to simulate calls before submitting them. Defaults to True.
+            max_cache_size (int, optional): Maximum number of cached outcomes. Defaults to 10_000.
+            fee_estimator (FeeEstimator | None, optional): Estimator of the calls' fees. Defaults to None (a new one
+                with the static fee profiles).
+        """
+        self.logger = logger
+        self.enabled = enabled
+        self.fee_estimator = fee_estimator or FeeEstimator(logger)
+        self.max_cache_size = max_cache_size
+        self.cache: OrderedDict[tuple, SimulationOutcome] = OrderedDict()
+
+
+    def get_cached_outcome(
+        self,
+        key: tuple,
+        round_num: int
+    ) -> SimulationOutcome | None:
+        """Get the cached outcome of a call.
+
+        Args:
+            key (tuple): Key of the call, i.e. method name and app ID.
+            round_num (int): Round of the simulation.
+
+        Returns:
+            SimulationOutcome | None: Outcome or `None` if the call was not simulated in this round.
+        """
+        return self.cache.get((key, round_num))
+
+
+    def simulate(
+        self,
+        build_composer: Callable[[List[int], List[SuggestedParams]], Composer],
+        keys: List[tuple],
+        suggested_params: SuggestedParams
+    ) -> List[SimulationOutcome]:
+        """Simulate a group of calls and cache the outcome of each call.
+
+        Notes:
+            Calls with a cached failure in the current round are not simulated again. If a call fails, the remaining
+            calls are simulated again without it, so that the outcome of each call is known.
+            Blocking, i.e. to be run in a separate thread.
+
+        Args:
+            build_composer (Callable[[List[int], List[SuggestedParams]], Composer]): Function, composing a group of
+                the calls with the given indexes from the transaction parameters of each of these calls.
+            keys (List[tuple]): Keys of the calls.
+            suggested_params (SuggestedParams): Transaction parameters, the first valid round of which is the current
+                round.
+
+        Returns:
+            List[SimulationOutcome]: Outcome of each call.
+        """
+        round_num = suggested_params.first
+        outcomes = [self.get_cached_outcome(key, round_num) for key in keys]
+        while True:
+            pending_idx = [i for i, outcome in enumerate(outcomes) if outcome is None]
+            if len(pending_idx) == 0:
+                return outcomes
+            simulation_params = self.make_fee_params(
+                suggested_params,
+                self.SIMULATION_FEE_MULTIPLIER * suggested_params.min_fee
+            )
+            result = build_composer(pending_idx, [simulation_params] * len(pending_idx)).simulate()
+            if result.failure_message:
+                failed_idx = pending_idx[result.failed_at[0]] if result.failed_at else pending_idx[0]
+                outcomes[failed_idx] = SimulationOutcome(False, result.failure_message)
+                self._cache(keys[failed_idx], round_num, outcomes[failed_idx])
+                self.logger.info(f'Simulation of {keys[failed_idx]} failed: {result.failure_message}')
+                continue
+            txn_results = result.simulate_response['txn-groups'][0]['txn-results']
+            for i, txn_result in zip(pending_idx, txn_results):
+                method = keys[i][0]
+                num_of_inner_txns = self.count_inner_txns(txn_result['txn-result'])
+                self.fee_estimator.learn(method, num_of_inner_txns)
+                outcomes[i] = SimulationOutcome(
+                    True,
+                    num_of_inner_txns=num_of_inner_txns,
+                    fee=self.fee_estimator.get_fee(method, num_of_inner_txns)
+                )
+                self._cache(keys[i], round_num, outcomes[i])
+
+
+    def execute(
+        self,
+        build_composer: Callable[[List[int], List[SuggestedParams]], Composer],
+        keys: List[tuple],
+        suggested_params: SuggestedParams
+    ) -> Tuple[List[SimulationOutcome | None], AtomicTransactionResponse | None]:
+        """Submit the calls whose simulation succeeds, as a group and at their exact fees.
+
+        Notes:
+            Blocking, i.e. to be run in a separate thread.
+
+        Args:
+            build_composer (Callable[[List[int], List[SuggestedParams]], Composer]): Function, composing a group of
+                the calls with the given indexes from the transaction parameters of each of these calls.
+            keys (List[tuple]): Keys of the calls.
+            suggested_params (SuggestedParams): Transaction parameters.
+
+        Returns:
+            Tuple[List[SimulationOutcome | None], AtomicTransactionResponse | None]: Outcome of each call (`None` if
+                the guard is disabled) and the execution result (`None` if nothing was submitted).
+        """
+        if not self.enabled:
+            idx = list(range(len(keys)))
+            return [None] * len(keys), build_composer(
+                idx,
+                [self.fee_estimator.get_params(suggested_params, key[0]) for key in keys]
+            ).execute()
+        outcomes = self.simulate(build_composer, keys, suggested_params)
+        idx = [i for i, outcome in enumerate(outcomes) if outcome.would_succeed]
+        if len(idx) == 0:
+            return outcomes, None
+        return outcomes, build_composer(
+            idx,
+            [self.make_fee_params(suggested_params, outcomes[i].fee) for i in idx]
+        ).execute()
+
+
+    @staticmethod
+    def count_inner_txns(
+        txn_result: dict
+    ) -> int:
+        """Count the inner transactions of a (simulated) transaction at any depth.
+
+        Args:
+            txn_result (dict): Transaction result, as returned by algod.
+
+        Returns:
+            int: Number of inner transactions.
+        """
+        inner_txns = txn_result.get('inner-txns', [])
+        return len(inner_txns) + sum(SimulationGuard.count_inner_txns(inner_txn) for inner_txn in inner_txns)
+
+
+    @staticmethod
+    def make_fee_params(
+        suggested_params: SuggestedParams,
+        fee: int
+    ) -> SuggestedParams:
+        """Copy the transaction parameters with a flat fee.
+
+        Args:
+            suggested_params (SuggestedParams): Transaction parameters.
+            fee (int): Flat fee.
+
+        Returns:
+            SuggestedParams: Transaction parameters with the flat fee.
+        """
+        fee_params = copy.copy(suggested_params)
+        fee_params.fee = fee
+        fee_params.flat_fee = True
+        return fee_params
+
+
+    def _cache(
+        self,
+        key: tuple,
+        round_num: int,
+        outcome: SimulationOutcome
+    ) -> None:
+        self.cache[(key, round_num)] = outcome
+        self.cache.move_to_end((key, round_num))
+        while len(self.cache) > self.max_cache_size:
+            self.cache.popitem(last=False)
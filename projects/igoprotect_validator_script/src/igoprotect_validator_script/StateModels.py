@@ -0,0 +1,173 @@
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from algosdk.encoding import encode_address
+
+
+# Layouts of the ABI-encoded configuration structs, as stored in the apps' global state
+VAL_CONFIG_MAN_STRUCT = struct.Struct('>11Q')       # ValConfigMan: 11 x uint64
+VAL_CONFIG_EXTRA_STRUCT = struct.Struct('>30s70s')  # ValConfigExtra: byte[30] name, byte[70] link
+EMPTY_VAL_CONFIG_EXTRA = bytes(VAL_CONFIG_EXTRA_STRUCT.size)
+
+
+
+def decode_address(
+    data: bytes | None
+) -> str | None:
+    """Encode the raw public key of an account, as stored in the global state, into its address.
+
+    Args:
+        data (bytes | None): Raw public key.
+
+    Returns:
+        str | None: Address with checksum and base32 encoded, or None if not set.
+    """
+    return encode_address(data) if data else None
+
+
+
+@dataclass(frozen=True, slots=True)
+class ValConfigMan:
+    hw_cat: int
+    min_amt: int
+    max_amt: int
+    fee_setup: int
+    fee_round: int
+    deposit: int
+    setup_rounds: int
+    confirmation_rounds: int
+    max_breach: int
+    breach_rounds: int
+    uptime_gar: int
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'ValConfigMan':
+        return cls(*VAL_CONFIG_MAN_STRUCT.unpack(data))
+
+
+
+@dataclass(frozen=True, slots=True)
+class ValConfigExtra:
+    name: bytes
+    link: bytes
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'ValConfigExtra':
+        return cls(*VAL_CONFIG_EXTRA_STRUCT.unpack(data))
+
+
+
+@dataclass(frozen=True, slots=True)
+class DelegatorContractState:
+    contract_breached: int
+    del_acc: str                            # Delegator account address
+    keys_confirmed: int
+    last_breach_round: int
+    noticeboard_app_id: int
+    num_breach: int
+    part_keys_deposited: int
+    round_end: int
+    round_start: int
+    sel_key: bytes = field(repr=False)
+    state_proof_key: bytes = field(repr=False)
+    val_app_id: int
+    val_config_extra: ValConfigExtra = field(repr=False)
+    val_config_man: ValConfigMan = field(repr=False)
+    vote_key: bytes = field(repr=False)
+    vote_key_dilution: int
+    # Derived from the above when decoded
+    setup_deadline: int = field(init=False)
+    partkey_confirmation_deadline: int = field(init=False)
+    expiry_deadline: int = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'setup_deadline', self.round_start + self.val_config_man.setup_rounds)
+        object.__setattr__(
+            self, 'partkey_confirmation_deadline', self.setup_deadline + self.val_config_man.confirmation_rounds
+        )
+        object.__setattr__(self, 'expiry_deadline', self.round_end)
+
+    @classmethod
+    def from_global_state(cls, data: Dict[bytes, bytes | int]) -> 'DelegatorContractState':
+        return cls(
+            contract_breached=data.get(b'contract_breached', 0),
+            del_acc=decode_address(data.get(b'del_acc')),
+            keys_confirmed=data.get(b'keys_confirmed', 0),
+            last_breach_round=data.get(b'last_breach_round', 0),
+            noticeboard_app_id=data.get(b'noticeboard_app_id', 0),
+            num_breach=data.get(b'num_breach', 0),
+            part_keys_deposited=data.get(b'part_keys_deposited', 0),
+            round_end=data.get(b'round_end', 0),
+            round_start=data.get(b'round_start', 0),
+            sel_key=data.get(b'sel_key', b''),
+            state_proof_key=data.get(b'state_proof_key', b''),
+            val_app_id=data.get(b'val_app_id', 0),
+            val_config_extra=ValConfigExtra.decode(data.get(b'val_config_extra', EMPTY_VAL_CONFIG_EXTRA)),
+            val_config_man=ValConfigMan.decode(data[b'val_config_man']),
+            vote_key=data.get(b'vote_key', b''),
+            vote_key_dilution=data.get(b'vote_key_dilution', 0),
+        )
+
+
+
+@dataclass(frozen=True, slots=True)
+class GeneralValidatorAdState:
+    del_cnt: int
+    del_contracts: Tuple[int, ...]          # Delegator app IDs, without the empty slots
+    live: int
+    manager: str                            # Manager account address
+    max_del_cnt: int
+    max_max_del_cnt: int
+    noticeboard_app_id: int
+    owner: str                              # Owner account address
+    val_config_extra: ValConfigExtra = field(repr=False)
+    val_config_man: ValConfigMan = field(repr=False)
+    val_deposit: int
+    val_earn_factor: int
+    val_earnings: int
+
+    @classmethod
+    def from_global_state(cls, data: Dict[bytes, bytes | int]) -> 'GeneralValidatorAdState':
+        del_contracts = data.get(b'del_contracts', b'')
+        return cls(
+            del_cnt=data.get(b'del_cnt', 0),
+            del_contracts=tuple(
+                i for i in struct.unpack(f'>{len(del_contracts) // 8}Q', del_contracts) if i != 0
+            ),
+            live=data.get(b'live', 0),
+            manager=decode_address(data.get(b'manager')),
+            max_del_cnt=data.get(b'max_del_cnt', 0),
+            max_max_del_cnt=data.get(b'max_max_del_cnt', 0),
+            noticeboard_app_id=data.get(b'noticeboard_app_id', 0),
+            owner=decode_address(data.get(b'owner')),
+            val_config_extra=ValConfigExtra.decode(data.get(b'val_config_extra', EMPTY_VAL_CONFIG_EXTRA)),
+            val_config_man=ValConfigMan.decode(data[b'val_config_man']),
+            val_deposit=data.get(b'val_deposit', 0),
+            val_earn_factor=data.get(b'val_earn_factor', 0),
+            val_earnings=data.get(b'val_earnings', 0),
+        )
+
+
+
+@dataclass(frozen=True, slots=True)
+class NoticeboardState:
+    blocked_amt: int
+    deposit_del_min: int
+    deposit_val_min: int
+    live: int
+    manager: str                            # Manager account address
+    val_earn_factor: int
+    val_factory_app_id: int
+
+    @classmethod
+    def from_global_state(cls, data: Dict[bytes, bytes | int]) -> 'NoticeboardState':
+        return cls(
+            blocked_amt=data.get(b'blocked_amt', 0),
+            deposit_del_min=data.get(b'deposit_del_min', 0),
+            deposit_val_min=data.get(b'deposit_val_min', 0),
+            live=data.get(b'live', 0),
+            manager=decode_address(data.get(b'manager')),
+            val_earn_factor=data.get(b'val_earn_factor', 0),
+            val_factory_app_id=data.get(b'val_factory_app_id', 0),
+        )
@@ -0,0 +1,152 @@
+import asyncio
+import copy
+
+from algosdk.transaction import SuggestedParams
+
+from .AsyncAlgodClient import AsyncAlgodClient
+from .FeeEstimator import FeeEstimator
+from .RateLimiter import RateLimiter
+
+
+
+class SuggestedParamsProvider(object):
+
+    # Number of rounds for which a transaction is valid (protocol maximum)
+    VALIDITY_ROUNDS = 1000
+
+
+    def __init__(
+        self,
+        logger: object,
+        algod_client: AsyncAlgodClient,
+        fee_estimator: FeeEstimator | None = None,
+        max_age_rounds: int = 100,
+        margin_rounds: int = 10
+    ) -> None:
+        """Initialize the shared provider of transaction parameters.
+
+        Notes:
+            The parameters are fetched from algod only when needed, instead of on each pass. Between fetches, the
+            validity window of the provided parameters follows the round observed by the engine (`observe_round`),
+            since the genesis and consensus parameters do not change from round to round.
+            The parameters are fetched again once the fetched validity window is about to elapse, at the latest after
+            `max_age_rounds` for noticing fee changes (e.g., congestion), or after being invalidated.
+            On each fetch, the fee estimator is updated and changes of the fees are logged.
+            A fetch only due to the age of the parameters is a background request towards a rate limiter, while a
+            fetch of missing, invalidated, or soon invalid parameters is critical.
+
+        Args:
+            logger (object): Python logger.
+            algod_client (AsyncAlgodClient): Asynchronous algod client.
+            fee_estimator (FeeEstimator | None, optional): Estimator of the calls' fees. Defaults to None (a new one
+                with the static fee profiles).
+            max_age_rounds (int, optional): Maximum number of rounds between fetches. Defaults to 100.
+            margin_rounds (int, optional): Number of rounds before the end of the fetched validity window, at which
+                the parameters are fetched again. Defaults to 10.
+        """
+        self.logger = logger
+        self.algod_client = algod_client
+        self.fee_estimator = fee_estimator or FeeEstimator(logger)
+        self.max_age_rounds = min(max_age_rounds, self.VALIDITY_ROUNDS - margin_rounds)
+        self.margin_rounds = margin_rounds
+
+        self.fetched_params: SuggestedParams | None = None   # As returned by algod, i.e. with the fee per byte
+        self.current_round = 0
+        self.is_invalidated = False
+        self.num_of_fetches = 0
+        self.lock = asyncio.Lock()
+
+
+    def needs_refresh(
+        self,
+        current_round: int
+    ) -> bool:
+        """Check whether the parameters have to be fetched again.
+
+        Args:
+            current_round (int): Current round.
+
+        Returns:
+            bool: Flag, indicating whether to fetch the parameters.
+        """
+        if self.fetched_params is None or self.is_invalidated:
+            return True
+        if current_round >= self.fetched_params.last - self.margin_rounds:
+            return True
+        return current_round - self.fetched_params.first >= self.max_age_rounds
+
+
+    def invalidate(
+        self
+    ) -> None:
+        """Fetch the parameters again on the next observed round, e.g. after a submission failed due to its fee."""
+        self.is_invalidated = True
+
+
+    async def observe_round(
+        self,
+        current_round: int
+    ) -> None:
+        """Advance the parameters to the current round, fetching them from algod if needed.
+
+        Args:
+            current_round (int): Current round.
+        """
+        self.current_round = max(self.current_round, current_round)
+        if self.needs_refresh(self.current_round):
+            is_due_to_age = self.fetched_params is not None and not self.is_invalidated and \
+                self.current_round < self.fetched_params.last - self.margin_rounds
+            await self.refresh(RateLimiter.PRIORITY_BACKGROUND if is_due_to_age else RateLimiter.PRIORITY_CRITICAL)
+
+
+    async def refresh(
+        self,
+        priority: int = RateLimiter.PRIORITY_CRITICAL
+    ) -> SuggestedParams:
+        """Fetch the parameters from algod and update the fee estimator.
+
+        Args:
+            priority (int, optional): Priority of the request towards the rate limiter. Defaults to PRIORITY_CRITICAL.
+
+        Returns:
+            SuggestedParams: Parameters as returned by algod.
+        """
+        async with self.lock:
+            fetched_params = await self.algod_client.suggested_params(priority)
+            previous_params = self.fetched_params
+            if previous_params is not None and (
+                previous_params.fee != fetched_params.fee or previous_params.min_fee != fetched_params.min_fee
+            ):
+                self.logger.info(
+                    f'Suggested fees changed (fee per byte {previous_params.fee} -> {fetched_params.fee}, ' +
+                    f'minimum fee {previous_params.min_fee} -> {fetched_params.min_fee}).'
+                )
+            self.fee_estimator.update_network_params(fetched_params)
+            self.fetched_params = fetched_params
+            self.current_round = max(self.current_round, fetched_params.first)
+            self.is_invalidated = False
+            self.num_of_fetches += 1
+            return fetched_params
+
+
+    def get(
+        self,
+        method: str | None = None
+    ) -> SuggestedParams:
+        """Get the parameters for a transaction, issued in the current round.
+
+        Args:
+            method (str | None, optional): Method name, whose fee is set. Defaults to None (default fee).
+
+        Raises:
+            RuntimeError: The parameters have not been fetched yet.
+
+        Returns:
+            SuggestedParams: Parameters with a flat fee, valid from the current round on.
+        """
+        if self.fetched_params is None:
+            raise RuntimeError('Suggested parameters have not been fetched yet.')
+        params = copy.copy(self.fetched_params)
+        params.first = self.current_round
+        params.last = self.current_round + self.VALIDITY_ROUNDS
+        return self.fee_estimator.get_params(params, method)
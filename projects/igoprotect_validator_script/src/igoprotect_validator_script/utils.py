@@ -1,11 +1,14 @@
+import base64
 import struct
 from typing import List
 
 from algosdk.v2client import algod
-from algosdk.abi import TupleType, UintType
+from algosdk.logic import get_application_address
 
+from .ClientRegistry import ClientRegistry
 from .GeneralValidatorAdClient import GeneralValidatorAdClient
-from .DelegatorContractClient import DelegatorContractClient, ValConfigMan
+from .DelegatorContractClient import DelegatorContractClient
+from .StateModels import DelegatorContractState, GeneralValidatorAdState, ValConfigMan
 
 
 
@@ -34,20 +37,25 @@ def decode_uint64_list(
 def get_del_id_list(
     algod_client: algod.AlgodClient,
     validator_ad_app_id: int,
+    client_registry: ClientRegistry | None = None,
 ) -> List[int]:
     """Get a list of Delegator app IDs, associated with the Validator app.
 
     Args:
         algod_client (algod.AlgodClient): Configured client.
         validator_ad_app_id (int): Validator app.
+        client_registry (ClientRegistry | None, optional): Registry of reused clients. Defaults to None (new client).
 
     Returns:
         List[int]: List of Delegator app IDs.
 
     """
-    val_client = GeneralValidatorAdClient(
-        algod_client=algod_client, app_id=validator_ad_app_id
-    )
+    if client_registry is not None:
+        val_client = client_registry.get_validator_ad_client(validator_ad_app_id)
+    else:
+        val_client = GeneralValidatorAdClient(
+            algod_client=algod_client, app_id=validator_ad_app_id
+        )
 
     del_list_all = decode_uint64_list(
         val_client.get_global_state().del_contracts.as_bytes
@@ -62,12 +70,14 @@ def get_del_id_list(
 def get_del_state_list(
     algod_client: algod.AlgodClient,
     del_app_id_list: List[int],
+    client_registry: ClientRegistry | None = None,
 ) -> List[object]:
     """Get a list of Delegator app states (parameter groups).
 
     Args:
         algod_client (algod.AlgodClient): Configured client.
         del_app_id_list (List[int]): Delegator app IDs.
+        client_registry (ClientRegistry | None, optional): Registry of reused clients. Defaults to None (new clients).
 
     Returns:
         List[object]: Delegator app states (parameter groups).
@@ -77,7 +87,8 @@ def get_del_state_list(
     for del_app_id in del_app_id_list:
         del_state_list.append(get_del_state(
             algod_client,
-            del_app_id
+            del_app_id,
+            client_registry
         ))
     return del_state_list
 
@@ -86,21 +97,26 @@ def get_del_state_list(
 def get_del_state(
     algod_client: algod.AlgodClient,
     del_app_id: int,
+    client_registry: ClientRegistry | None = None,
 ) -> object:
     """Get Delegator app state (parameter group).
 
     Args:
         algod_client (algod.AlgodClient): Configured client.
         del_app_id_list (int): Delegator app IDs.
+        client_registry (ClientRegistry | None, optional): Registry of reused clients. Defaults to None (new client).
 
     Returns:
         List[object]: Delegator app states (parameter groups).
 
     """
-    del_client = DelegatorContractClient(
-        algod_client=algod_client,
-        app_id=del_app_id
-    )
+    if client_registry is not None:
+        del_client = client_registry.get_delegator_contract_client(del_app_id)
+    else:
+        del_client = DelegatorContractClient(
+            algod_client=algod_client,
+            app_id=del_app_id
+        )
 
     return del_client.get_global_state()
 
@@ -109,79 +125,155 @@ def get_del_state(
 def get_del_app_list(
     algod_client: algod.AlgodClient,
     validator_ad_app_id: int,
+    client_registry: ClientRegistry | None = None,
 ) -> List[object]:
     """Get a list of Delegator app IDs, associated with the Validator app.
 
     Args:
         algod_client (algod.AlgodClient): Configured client.
         validator_ad_app_id (int): Validator app.
+        client_registry (ClientRegistry | None, optional): Registry of reused clients. Defaults to None (new clients).
 
     Returns:
         List[int]: List of Delegator app IDs.
 
     """
 
-    del_app_id_list = get_del_id_list( algod_client, validator_ad_app_id )
-    del_app_state_list = get_del_state_list( algod_client, del_app_id_list )
+    del_app_id_list = get_del_id_list( algod_client, validator_ad_app_id, client_registry )
+    del_app_state_list = get_del_state_list( algod_client, del_app_id_list, client_registry )
 
     return [ dict(id=id, state=state) for id, state in zip(del_app_id_list, del_app_state_list) ]
 
 
 
+def decode_global_state(
+    global_state: List[dict]
+) -> dict:
+    """Decode the raw global state, as returned by algod, into the format expected by the generated clients.
+
+    Args:
+        global_state (List[dict]): Key-value list from the `global-state` field of the app parameters.
+
+    Returns:
+        dict: Global state with raw byte keys and either raw byte or integer values.
+    """
+    decoded_state = dict()
+    for state_value in global_state:
+        key = base64.b64decode(state_value['key'])
+        value = state_value['value']
+        if value['type'] == 1:
+            decoded_state[key] = base64.b64decode(value['bytes'])
+        else:
+            decoded_state[key] = value['uint']
+    return decoded_state
+
+
+
+def get_del_app_list_bulk(
+    algod_client: algod.AlgodClient,
+    validator_ad_app_id: int,
+) -> List[dict]:
+    """Get a list of Delegator apps, associated with the Validator app, using a single algod request.
+
+    Notes:
+        All Delegator apps are created by the Validator app's address.
+        Their global state is thus already included in the `created-apps` field of the address' account information.
+
+    Args:
+        algod_client (algod.AlgodClient): Configured client.
+        validator_ad_app_id (int): Validator app.
+
+    Returns:
+        List[dict]: Delegator app IDs and states (same format as `get_del_app_list`).
+    """
+    account_info = algod_client.account_info(get_application_address(validator_ad_app_id))
+    return decode_del_app_list_from_account_info(account_info, validator_ad_app_id)
+
+
+
+def decode_del_app_list_from_account_info(
+    account_info: dict,
+    validator_ad_app_id: int,
+) -> List[dict]:
+    """Decode the Delegator apps from the Validator app address' account information.
+
+    Args:
+        account_info (dict): Account information of the Validator app's address.
+        validator_ad_app_id (int): Validator app.
+
+    Returns:
+        List[dict]: Delegator app IDs and states (same format as `get_del_app_list`).
+    """
+    del_app_list = []
+    for created_app in account_info.get('created-apps', []):
+        del_app = decode_del_app_from_app_info(created_app, validator_ad_app_id)
+        if del_app is None: # Safety check, should not happen
+            continue
+        del_app_list.append(del_app)
+
+    return sorted(del_app_list, key=lambda del_app: del_app['id'])
+
+
+
+def decode_del_app_from_app_info(
+    app_info: dict,
+    validator_ad_app_id: int,
+) -> dict | None:
+    """Decode a Delegator app from its application information.
+
+    Args:
+        app_info (dict): Application information, i.e. the app ID and its parameters.
+        validator_ad_app_id (int): Validator app.
+
+    Returns:
+        dict | None: Delegator app ID and state (same format as `get_del_app_list`), or None if the app is not
+            a Delegator app of the Validator app.
+    """
+    global_state = decode_global_state(app_info['params'].get('global-state', []))
+    if b'val_config_man' not in global_state:
+        return None
+    del_app_state = DelegatorContractState.from_global_state(global_state)
+    if del_app_state.val_app_id != validator_ad_app_id:
+        return None
+    return dict(id=app_info['id'], state=del_app_state)
+
+
+
 def get_val_app_state(
     algod_client: algod.AlgodClient,
     val_app_id: int,
-) -> object:
+    client_registry: ClientRegistry | None = None,
+) -> GeneralValidatorAdState:
     """Get Validatpr app state (parameter group).
 
     Args:
         algod_client (algod.AlgodClient): Configured client.
         del_app_id_list (int): Delegator app IDs.
+        client_registry (ClientRegistry | None, optional): Registry of reused clients. Defaults to None (new client).
 
     Returns:
-        List[object]: Delegator app states (parameter groups).
+        GeneralValidatorAdState: Validator app state.
 
     """
-    val_client = GeneralValidatorAdClient(
-        algod_client=algod_client,
-        app_id=val_app_id
-    )
+    if client_registry is not None:
+        val_client = client_registry.get_validator_ad_client(val_app_id)
+    else:
+        val_client = GeneralValidatorAdClient(
+            algod_client=algod_client,
+            app_id=val_app_id
+        )
 
-    return val_client.get_global_state()
-
-
-
-def decode_val_config_man(data: bytes):
-    val_config_man_type = TupleType(
-        [
-            UintType(64),  # hw_cat
-            UintType(64),  # min_amt
-            UintType(64),  # max_amt
-            UintType(64),  # fee_setup
-            UintType(64),  # fee_round
-            UintType(64),  # deposit
-            UintType(64),  # setup_rounds
-            UintType(64),  # confirmation_rounds
-            UintType(64),  # max_breach
-            UintType(64),  # breach_rounds
-            UintType(64),  # uptime_gar
-        ]
-    )
+    return GeneralValidatorAdState.from_global_state(val_client.app_client.get_global_state(raw=True))
 
-    decoded_tuple = val_config_man_type.decode(data)
-
-    val_config = ValConfigMan(
-        hw_cat=decoded_tuple[0],
-        min_amt=decoded_tuple[1],
-        max_amt=decoded_tuple[2],
-        fee_setup=decoded_tuple[3],
-        fee_round=decoded_tuple[4],
-        deposit=decoded_tuple[5],
-        setup_rounds=decoded_tuple[6],
-        confirmation_rounds=decoded_tuple[7],
-        max_breach=decoded_tuple[8],
-        breach_rounds=decoded_tuple[9],
-        uptime_gar=decoded_tuple[10],
-    )
 
-    return val_config
+
+def decode_val_config_man(data: bytes) -> ValConfigMan:
+    """Decode the validator's mandatory configuration (precompiled `struct` layout instead of an ABI type).
+
+    Args:
+        data (bytes): ABI-encoded `ValConfigMan`.
+
+    Returns:
+        ValConfigMan: Decoded configuration.
+    """
+    return ValConfigMan.decode(data)
@@ -3,87 +3,37 @@
     - issuing breach warnings, and
     - terminating contracts.
 """
-import time
+import asyncio
 import logging
 import configparser
 from pathlib import Path
-from typing import List
 
 from algokit_utils.beta.algorand_client import AlgorandClient
 from algokit_utils.beta.account_manager import AddressAndSigner
-from algokit_utils.network_clients import AlgoClientConfig, AlgoClientConfigs
+from algokit_utils.beta.client_manager import AlgoSdkClients
+from algokit_utils.network_clients import AlgoClientConfig
 from algosdk import mnemonic, account
-from algosdk.encoding import encode_address
+from algosdk.kmd import KMDClient
 from algosdk.atomic_transaction_composer import AccountTransactionSigner
-from algosdk.transaction import SuggestedParams
-from algosdk.v2client.algod import AlgodClient
 
-from .Locksmith import Locksmith, PartkeyFetcherGoal
+from .AlgodEndpoints import AlgodEndpointPool, FailoverAlgodClient
+from .AsyncAlgodClient import AsyncAlgodClient
+from .BlockFollower import BlockFollower
+from .CachingAlgodClient import CachingAlgodClient
+from .ClientRegistry import ClientRegistry
+from .Engine import Engine
+from .FeeEstimator import FeeEstimator
+from .HttpTransport import LatencyStats, PooledHttpTransport, PooledIndexerClient, RetryPolicy
+from .KeygenStats import KeygenStats
+from .Locksmith import Locksmith, PartkeyFetcherGoal, PartkeyFetcherAlgod
+from .ParticipationHealth import ParticipationHealth
 from .Bouncer import Bouncer
-from .utils import get_del_app_list, get_val_app_state
-from .NoticeboardClient import NoticeboardClient
-
-
-#Delegator smart contract wrappers, for abstracting the interface with the smart contract in case property names change.
-def are_part_keys_confirmed(del_app_state):
-    return bool(del_app_state.keys_confirmed)
-def are_part_keys_deposited(del_app_state):
-    return bool(del_app_state.part_keys_deposited)
-
-
-def get_suggested_parameters(
-    algod_client: AlgodClient,
-    min_fee_multiplier: int = 3
-) -> SuggestedParams:
-    suggested_params = algod_client.suggested_params()
-    suggested_params.fee = min_fee_multiplier * suggested_params.min_fee
-    return suggested_params
-
-
-def check_del_app_state_and_generate_cluster_stack(
-    del_app_list: List[dict]
-) -> tuple:
-    """Separates the delegator apps into active, deposited, and created.
-
-    Args:
-        del_app_list (List[dict]): Delegator apps.
-
-    Returns:
-        tuple: Active, deposited, and created delegator apps.
-    """
-    del_app_active_list = []
-    del_app_deposited_list = []
-    del_app_created_list = []
-    for del_app in del_app_list:
-        if are_part_keys_confirmed(del_app['state']):
-            del_app_active_list.append( del_app )
-        elif are_part_keys_deposited(del_app['state']):
-            del_app_deposited_list.append( del_app )
-        else:
-            del_app_created_list.append( del_app )
-    return del_app_active_list, del_app_deposited_list, del_app_created_list
-
-
-
-def try_to_go_to_sleep(
-    loop_period_s: int,
-    start_time: float
-) -> float:
-    """Sleep for given amount of time, if it hasn't elapsed yet.
-
-    Args:
-        loop_period_s (int): Amount of seconds to sleep.
-        start_time (float): System time in seconds.
-
-    Returns:
-        float: Amount of time slept.
-    """
-    elapsed_time_s = time.time() - start_time
-    if elapsed_time_s < loop_period_s:
-        time.sleep(loop_period_s - elapsed_time_s)
-        return loop_period_s - elapsed_time_s
-    else:
-        return 0.0
+from .BreachWatcher import BreachWatcher
+from .ProcessLimits import ProcessLimits
+from .RateLimiter import RateLimiter
+from .SimulationGuard import SimulationGuard
+from .SuggestedParamsProvider import SuggestedParamsProvider
+from .utils import get_val_app_state
 
 
 
@@ -116,15 +66,52 @@ def run_validator(
     manager_mnemonic_str = str(config.get('igoprotect_config', 'manager_mnemonic'))
     # noticeboard_id = str(config.get('igoprotect_config', 'noticeboard_id'))
     use_algokit = eval(config.get('igoprotect_config', 'use_algokit'))
+    partkey_backend = str(config.get('igoprotect_config', 'partkey_backend', fallback='goal')).lower()
+    simulate_before_submit = eval(config.get('igoprotect_config', 'simulate_before_submit', fallback='True'))
+    watch_stake_limits = eval(config.get('igoprotect_config', 'watch_stake_limits', fallback='True'))
+    follow_blocks = eval(config.get('igoprotect_config', 'follow_blocks', fallback='True'))
+    keep_deregistered_partkeys = eval(config.get('igoprotect_config', 'keep_deregistered_partkeys', fallback='False'))
+    track_participation = eval(config.get('igoprotect_config', 'track_participation', fallback='True'))
 
     algod_config_server =   str(config.get('algo_client_config', 'algod_config_server'))
     algod_config_token =    str(config.get('algo_client_config', 'algod_config_token'))
+    algod_admin_config_token = str(config.get('algo_client_config', 'algod_admin_config_token', fallback=algod_config_token))
+    algod_failover_servers = config.get('algo_client_config', 'algod_failover_servers', fallback='')
+    algod_failover_servers = [s.strip() for s in algod_failover_servers.split(',') if s.strip()]
+    algod_failover_tokens = config.get('algo_client_config', 'algod_failover_tokens', fallback='')
+    algod_failover_tokens = [t.strip() for t in algod_failover_tokens.split(',') if t.strip()] or [algod_config_token]
+    if len(algod_failover_tokens) == 1:
+        algod_failover_tokens = algod_failover_tokens * len(algod_failover_servers)
+    algod_probe_period_s = float(config.get('algo_client_config', 'algod_probe_period_s', fallback=5))
+    algod_max_lag_rounds = int(config.get('algo_client_config', 'algod_max_lag_rounds', fallback=2))
     indexer_config_server = str(config.get('algo_client_config', 'indexer_config_server'))
     indexer_config_token =  str(config.get('algo_client_config', 'indexer_config_token'))
     kmd_config_server =     str(config.get('algo_client_config', 'kmd_config_server'))
     kmd_config_token =      str(config.get('algo_client_config', 'kmd_config_token'))
-
+    http_timeout_s = float(config.get('algo_client_config', 'http_timeout_s', fallback=30))
+    http_connect_timeout_s = float(config.get('algo_client_config', 'http_connect_timeout_s', fallback=5))
+    http_max_retries = int(config.get('algo_client_config', 'http_max_retries', fallback=3))
+    http_pool_size = int(config.get('algo_client_config', 'http_pool_size', fallback=10))
+    http_rate_limit_per_s = float(config.get('algo_client_config', 'http_rate_limit_per_s', fallback=0))
+    http_rate_limit_burst = config.get('algo_client_config', 'http_rate_limit_burst', fallback='')
+
+    loop_mode = str(config.get('node_config', 'loop_mode', fallback='sleep')).lower()
     loop_period_s = int(config.get('node_config', 'sleep_time_s'))
+    round_period = int(config.get('node_config', 'round_period', fallback=1))
+    max_concurrency = int(config.get('node_config', 'max_concurrency', fallback=4))
+    keygen_workers = int(config.get('node_config', 'keygen_workers', fallback=2))
+    keygen_nice = config.get('node_config', 'keygen_nice', fallback='')
+    keygen_ionice_class = config.get('node_config', 'keygen_ionice_class', fallback='')
+    keygen_cgroup = config.get('node_config', 'keygen_cgroup', fallback='')
+    keygen_cpu_quota_percent = config.get('node_config', 'keygen_cpu_quota_percent', fallback='')
+    keygen_stats_path = config.get('node_config', 'keygen_stats_path', fallback='')
+    stake_limit_check_min_rounds = int(config.get('node_config', 'stake_limit_check_min_rounds', fallback=1))
+    stake_limit_check_max_rounds = int(config.get('node_config', 'stake_limit_check_max_rounds', fallback=100))
+    block_follower_state_path = config.get('node_config', 'block_follower_state_path', fallback='')
+    block_follower_max_blocks = int(config.get('node_config', 'block_follower_max_blocks', fallback=100))
+    full_scan_period_rounds = int(config.get('node_config', 'full_scan_period_rounds', fallback=1000))
+    participation_sample_rounds = int(config.get('node_config', 'participation_sample_rounds', fallback=100))
+    participation_window_rounds = int(config.get('node_config', 'participation_window_rounds', fallback=10000))
     logging_level = str(config.get('node_config', 'logging_level')).upper()
 
 
@@ -151,6 +138,17 @@ def run_validator(
     logger.info(f'Serving validator ad with ID {val_app_id}.')
     logger.info(f'Indexer server configured to {indexer_config_server}')
 
+    if partkey_backend not in ('goal', 'algod'):
+        raise ValueError(f'Unknown partkey backend `{partkey_backend}`, expected `goal` or `algod`.')
+    logger.info(f'Managing partkeys through `{partkey_backend}`.')
+
+    if loop_mode not in ('sleep', 'block'):
+        raise ValueError(f'Unknown loop mode `{loop_mode}`, expected `sleep` or `block`.')
+    if loop_mode == 'block':
+        logger.info(f'Following blocks, running a pass every {round_period} round(s).')
+    else:
+        logger.info(f'Polling, running a pass every {loop_period_s} second(s).')
+
 
 
     ### Configure client ###
@@ -167,12 +165,52 @@ def run_validator(
         server=kmd_config_server,
         token=kmd_config_token
     )
+    # Pooled keep-alive connections with retries of idempotent requests, shared by the synchronous and async clients
+    retry_policy = RetryPolicy(max_retries=http_max_retries)
+    latency_stats = LatencyStats()
+    # Request budget per server, e.g. for the per-second quotas of hosted providers
+    rate_limiter = None
+    if http_rate_limit_per_s > 0:
+        rate_limiter = RateLimiter(
+            logger,
+            http_rate_limit_per_s,
+            float(http_rate_limit_burst) if http_rate_limit_burst else None
+        )
+        logger.info(f'Limiting requests to {http_rate_limit_per_s} per second per server.')
+
+    def make_transport(server: str) -> PooledHttpTransport:
+        return PooledHttpTransport(
+            logger,
+            server,
+            timeout_s=http_timeout_s,
+            connect_timeout_s=http_connect_timeout_s,
+            max_connections=http_pool_size,
+            retry_policy=retry_policy,
+            latency_stats=latency_stats,
+            rate_limiter=rate_limiter
+        )
+
+    # The configured node first, followed by the failover nodes (with their own tokens or the same token)
+    algod_endpoint_pool = AlgodEndpointPool.from_config(
+        logger,
+        [algod_config.server] + algod_failover_servers,
+        [algod_config.token] + algod_failover_tokens,
+        make_transport,
+        probe_period_s=algod_probe_period_s,
+        max_lag_rounds=algod_max_lag_rounds,
+        rate_limiter=rate_limiter
+    )
+    if len(algod_endpoint_pool.endpoints) > 1:
+        logger.info(f'Failing over between {len(algod_endpoint_pool.endpoints)} algod endpoints.')
+
+    indexer_transport = make_transport(indexer_config.server)
+
     # algorand_client = AlgorandClient.default_local_net()
-    algorand_client = AlgorandClient(
-        AlgoClientConfigs(
-            algod_config=algod_config,
-            indexer_config=indexer_config,
-            kmd_config=kmd_config,
+    algorand_client = AlgorandClient.from_clients(
+        AlgoSdkClients(
+            algod=FailoverAlgodClient(algod_endpoint_pool),
+            indexer=PooledIndexerClient(indexer_config.token, indexer_config.server, indexer_transport),
+            kmd=KMDClient(kmd_config.token, kmd_config.server),
         )
     )
     algorand_client.set_suggested_params_timeout(0)
@@ -191,195 +229,137 @@ def run_validator(
 
     ### Initialize noticeboard client
 
+    client_registry = ClientRegistry(algorand_client.client.algod)
+
     val_app_state = get_val_app_state(
         algorand_client.client.algod,
-        val_app_id
+        val_app_id,
+        client_registry
     )
 
-    noticeboard_client = NoticeboardClient(
-        algod_client=algorand_client.client.algod,
-        app_id=val_app_state.noticeboard_app_id
-    )
+    noticeboard_client = client_registry.get_noticeboard_client(val_app_state.noticeboard_app_id)
 
 
     ### Initialize components
 
-    suggested_params = algorand_client.client.algod.suggested_params()
-    suggested_params.fee = 3 * suggested_params.min_fee
+    algod_client = CachingAlgodClient(
+        algod_config_server,
+        algod_config_token,
+        timeout_s=http_timeout_s,
+        connect_timeout_s=http_connect_timeout_s,
+        max_connections=http_pool_size,
+        retry_policy=retry_policy,
+        latency_stats=latency_stats,
+        endpoint_pool=algod_endpoint_pool,
+        rate_limiter=rate_limiter
+    )
+
+    fee_estimator = FeeEstimator(logger)
+    params_provider = SuggestedParamsProvider(logger, algod_client, fee_estimator)
+
+    simulation_guard = SimulationGuard(logger, simulate_before_submit, fee_estimator=fee_estimator)
+
+    if partkey_backend == 'algod':
+        partkey_fetcher = PartkeyFetcherAlgod(
+            logger,
+            AsyncAlgodClient(
+                algod_config_server,
+                algod_admin_config_token,
+                timeout_s=http_timeout_s,
+                connect_timeout_s=http_connect_timeout_s,
+                retry_policy=retry_policy,
+                latency_stats=latency_stats
+            )
+        )
+        if keygen_nice or keygen_ionice_class or keygen_cgroup:
+            logger.warning('Key generation limits only apply to the `goal` backend (algod generates keys in-process).')
+    else:
+        partkey_fetcher = PartkeyFetcherGoal(
+            logger,
+            use_algokit,
+            ProcessLimits(
+                logger,
+                nice=int(keygen_nice) if keygen_nice else None,
+                ionice_class=keygen_ionice_class.lower() if keygen_ionice_class else None,
+                cgroup_path=keygen_cgroup if keygen_cgroup else None,
+                cpu_quota_percent=float(keygen_cpu_quota_percent) if keygen_cpu_quota_percent else None
+            )
+        )
 
     locksmith = Locksmith(
         logger,
-        PartkeyFetcherGoal(logger, use_algokit),
-        suggested_params,
-        use_algokit
+        partkey_fetcher,
+        params_provider,
+        KeygenStats(logger, keygen_stats_path if keygen_stats_path else None),
+        simulation_guard
     )
 
-    bouncer = Bouncer( suggested_params )
-
-
-    while True:
-
-        start_time = time.time()
-
-        logger.debug(f"Started new validator loop.")
-
-
-        ### Refresh transaction parameters #############################################################################
-        # Update on each loop to avoid eventual expiry.
-        # Update from here to avoid passing the `algod` client to the corresponding classes.
-        suggested_parameters = get_suggested_parameters(algorand_client.client.algod)
-        locksmith.update_suggested_params(suggested_parameters)
-        bouncer.update_suggested_params(suggested_parameters)
-
-        ### Fetch delegator contracts ##################################################################################
-
-        ### Fetch delegator contracts, associated with this validator ###
-
-        del_app_list = get_del_app_list(
-            algorand_client.client.algod,
-            val_app_id
+    bouncer = Bouncer( logger, params_provider, simulation_guard=simulation_guard )
+
+    breach_watcher = None
+    if watch_stake_limits:
+        breach_watcher = BreachWatcher(
+            logger,
+            algod_client,
+            params_provider,
+            client_registry,
+            manager,
+            simulation_guard=simulation_guard,
+            min_check_period_rounds=stake_limit_check_min_rounds,
+            max_check_period_rounds=stake_limit_check_max_rounds
         )
-
-        ### Sort delegator contracts into cluster stacks ###
-
-        del_app_active_list, del_app_deposited_list, del_app_created_list = \
-            check_del_app_state_and_generate_cluster_stack( del_app_list )
-
-        logger.debug(f'The following number of delegator contracts was found ({len(del_app_list)} in total): ' +
-            f'{len(del_app_active_list)} active, ' +
-            f'{len(del_app_deposited_list)} deposited, and ' +
-            f'{len(del_app_created_list)} created.'
+        logger.info('Watching the stake limits of the delegators.')
+
+    block_follower = None
+    if follow_blocks:
+        block_follower = BlockFollower(
+            logger,
+            algod_client,
+            val_app_state.noticeboard_app_id,
+            val_app_id,
+            state_path=block_follower_state_path if block_follower_state_path else None,
+            max_blocks_per_pass=block_follower_max_blocks
         )
+        logger.info(f'Following the blocks, reading all delegator contracts every {full_scan_period_rounds} rounds.')
+
+    participation_health = None
+    if track_participation:
+        participation_health = ParticipationHealth(
+            logger,
+            partkey_fetcher,
+            sample_period_rounds=participation_sample_rounds,
+            window_rounds=participation_window_rounds
+        )
+        logger.info(f'Tracking the participation of the delegators every {participation_sample_rounds} rounds.')
 
-        del del_app_list # No longer needed
-
-
-        ### Process delegator contracts ################################################################################
-
-        ### Generate and submit participation keys ###
-
-        # Iterate over freshly-created delegator apps (awaiting key generation and submission)
-        for del_app in del_app_created_list:
-
-            logger.info(f"Generating partkey for delegator app with ID {del_app['id']}.")
-            try:
-
-                partkey = locksmith.generate_partkey(
-                    encode_address(del_app['state'].del_acc.as_bytes),
-                    del_app['state'].round_start,
-                    del_app['state'].round_end
-                )
-                logger.info(f"Generated partkey.")
-
-                logger.info(f"Depositing partkey for delegator app with ID {del_app['id']}.")
-                try:
-                    result = locksmith.deposit_partkey(
-                        partkey,
-                        noticeboard_client,
-                        encode_address(del_app['state'].del_acc.as_bytes),
-                        # abi.AddressType().decode(del_app['state'].del_acc.as_bytes),
-                        manager,
-                        del_app['id'],
-                        val_app_id
-                    )
-                    logger.info(f"Deposited partkey.")
-                    assert(result)
-
-                except Exception as e:
-                    logger.warning(f"Encountered exception {e}")
-
-            except Exception as e:
-                logger.warning(f"Encountered exception {e}")
-
-
-
-        ### Check delegator app validity (two steps / loops) and delete if needed ###
-
-        # Iterate over delegator apps with validator-deposited keys (awaiting delegator confirmation)
-        for del_app in del_app_deposited_list:
+    engine = Engine(
+        logger,
+        algod_client,
+        params_provider,
+        locksmith,
+        bouncer,
+        noticeboard_client,
+        manager,
+        val_app_id,
+        max_concurrency=max_concurrency,
+        keygen_workers=keygen_workers,
+        loop_mode=loop_mode,
+        round_period=round_period,
+        loop_period_s=loop_period_s,
+        breach_watcher=breach_watcher,
+        block_follower=block_follower,
+        full_scan_period_rounds=full_scan_period_rounds,
+        participation_health=participation_health,
+        keep_deregistered_partkeys=keep_deregistered_partkeys
+    )
 
-            confirmation_time_elapsed = Bouncer.has_del_app_partkey_confirmation_time_elapsed(
-                algorand_client.client.algod.status()['last-round'],
-                del_app['state']
-            )
+    async def run():
+        algod_endpoint_pool.start()
+        try:
+            await engine.run()
+        finally:
+            await engine.close()
+            await algod_endpoint_pool.close()
+            indexer_transport.close()
 
-            if confirmation_time_elapsed:
-
-                logger.info(f"Partkeys not confirmed on time for delegator app with ID {del_app['id']}.")
-                logger.info(f"Deleting keys for delegator app with ID {del_app['id']}.")
-                try:
-                    locksmith.delete_del_app_partkey(
-                        encode_address(del_app['state'].del_acc.as_bytes)
-                    )
-                    logger.info(f"Partkeys deleted.")
-                except Exception as e:
-                    logger.warning(f"Encountered exception {e}")
-
-                logger.info(f"Terminating unconfirmed delegator app with ID {del_app['id']}.")
-                try:
-                    bouncer.end_del_app_due_to_unconfirmed_keys(
-                        encode_address(del_app['state'].del_acc.as_bytes),
-                        del_app['id'],
-                        val_app_id,
-                        manager,
-                        noticeboard_client
-                    )
-                    logger.info(f"Contract terminated.")
-                except Exception as e:
-                    logger.warning(f"Encountered exception {e}")
-
-
-        # Iterate over delegator apps with delegator-confrimed keys (may expire or breach terms)
-        for del_app in del_app_active_list:
-
-            ### Check for expiry
-            has_del_app_expired = Bouncer.has_del_app_expired(
-                algorand_client.client.algod.status()['last-round'],
-                del_app['state']
-            )
-            if has_del_app_expired:
-                # logger.info(f"Detected contract expiry for delegator app with ID {del_app['id']}")
-                logger.info(f"Terminating expired delegator app with ID {del_app['id']}.")
-                try:
-                    bouncer.end_del_app_due_to_expiry(
-                        encode_address(del_app['state'].del_acc.as_bytes),
-                        del_app['id'],
-                        val_app_id,
-                        manager,
-                        noticeboard_client
-                    )
-                    logger.info(f"Contract terminated.")
-                except Exception as e:
-                    logger.warning(f"Encountered exception {e}")
-                try:
-                    locksmith.delete_del_app_partkey( del_app['state'].del_acc )
-                except:
-                    logger.info('Tried deleting non-existent partkeys (expected behavior for expired delegator app).')
-
-            ### Check for term breach
-            has_del_indefinitely_breached_terms = Bouncer.has_del_indefinitely_breached_terms(
-                algorand_client.client.algod.status()['last-round'],
-                del_app['state']
-            )
-            if has_del_indefinitely_breached_terms:
-
-                logger.info(f"Deleting partkey for breached-terms delegator app with ID {del_app['id']}")
-                try:
-                    locksmith.delete_del_app_partkey(del_app['state'].del_acc)
-                    logging.info('Deleted partkeys.')
-                except Exception as e:
-                    logger.warning(f"Encountered exception {e}")
-
-                logger.info(f"Terminating breached-terms delegator app with ID {del_app['id']}")
-                try:
-                    Bouncer.terminate_del_app(
-                        encode_address(del_app['state'].del_acc.as_bytes),
-                        noticeboard_client
-                    )
-                    logging.info('Terminated contract.')
-                except Exception as e:
-                    logger.warning(f"Encountered exception {e}")
-
-        slept = try_to_go_to_sleep(loop_period_s, start_time)
-
-        logger.debug(f'Waking up after sleeping {round(slept, 1)} seconds')
+    asyncio.run(run())
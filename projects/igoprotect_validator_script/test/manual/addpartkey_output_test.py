@@ -0,0 +1,47 @@
+"""
+Check of getting the participation ID from the `goal account addpartkey` output.
+
+The outputs below are recorded from `goal account addpartkey` (standalone and through `algokit goal`, including the
+Algokit update notification), so that a change of the parsing can be checked without generating keys on a node.
+
+"""
+# todo: Clean way of including or callingfrom base path
+from pathlib import Path
+import sys
+sys.path.append(str(Path(Path(__file__).parents[2], 'src')))
+
+from igoprotect_validator_script.Locksmith import PartkeyFetcherGoal
+
+
+PARTKEY_ID = 'Y3LT6GSOIFDK7MGRBH55KQ5XBJNJJCVZAOBAIELKMF6ZTIYYWF7A'
+
+ADDPARTKEY_OUTPUT_GOAL = (
+    'Please stand by while generating keys. This might take a few minutes...\n'
+    f'Participation key generation successful. Participation ID: {PARTKEY_ID}\n'
+)
+
+ADDPARTKEY_OUTPUT_ALGOKIT = (
+    'You are using AlgoKit version 1.0.0, however version 2.0.0 is available. Please update to the latest version.\n'
+    'Please stand by while generating keys. This might take a few minutes...\n'
+    f'Participation key generation successful. Participation ID: {PARTKEY_ID}\n'
+    '\n'
+)
+
+ADDPARTKEY_OUTPUT_FAILED = (
+    'Please stand by while generating keys. This might take a few minutes...\n'
+    'Cannot generate participation key: the partkey for this account already exists\n'
+)
+
+
+if __name__ == '__main__':
+
+    for output in (ADDPARTKEY_OUTPUT_GOAL, ADDPARTKEY_OUTPUT_ALGOKIT):
+        partkey_id = PartkeyFetcherGoal._get_partkey_id(output)
+        assert partkey_id == PARTKEY_ID, partkey_id
+        print(f'Parsed participation ID {partkey_id}.')
+
+    try:
+        PartkeyFetcherGoal._get_partkey_id(ADDPARTKEY_OUTPUT_FAILED)
+        raise AssertionError('No error for an output without a participation ID.')
+    except RuntimeError as e:
+        print(f'Raised for an output without a participation ID ({e}).')
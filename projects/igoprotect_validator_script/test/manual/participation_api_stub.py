@@ -0,0 +1,120 @@
+"""
+Local stub of algod's `/v2/participation` endpoints for exercising the REST partkey backend without a node.
+
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# todo: Clean way of including or callingfrom base path
+from pathlib import Path
+import sys
+sys.path.append(str(Path(Path(__file__).parents[2], 'src')))
+
+from igoprotect_validator_script.AsyncAlgodClient import AsyncAlgodClient
+from igoprotect_validator_script.Locksmith import PartkeyFetcherAlgod
+
+
+class ParticipationStubHandler(BaseHTTPRequestHandler):
+
+    partkeys = dict()   # Participation ID -> participation key (algod format)
+
+
+    def _respond(self, code, body=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/v2/participation':
+            self._respond(200, list(self.partkeys.values()))
+        elif path.startswith('/v2/participation/'):
+            partkey_id = path.split('/')[-1]
+            if partkey_id in self.partkeys:
+                self._respond(200, self.partkeys[partkey_id])
+            else:
+                self._respond(404, dict(message='participation id not found'))
+        else:
+            self._respond(404, dict(message='not found'))
+
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.startswith('/v2/participation/generate/'):
+            address = url.path.split('/')[-1]
+            query = parse_qs(url.query)
+            first, last = int(query['first'][0]), int(query['last'][0])
+            partkey_id = base64.b32encode(uuid.uuid4().bytes).decode().rstrip('=')
+            self.partkeys[partkey_id] = {
+                'id': partkey_id,
+                'address': address,
+                'key': {
+                    'selection-participation-key': base64.b64encode(os.urandom(32)).decode(),
+                    'vote-participation-key': base64.b64encode(os.urandom(32)).decode(),
+                    'state-proof-key': base64.b64encode(os.urandom(64)).decode(),
+                    'vote-first-valid': first,
+                    'vote-last-valid': last,
+                    'vote-key-dilution': int(query.get('dilution', [round((last - first) ** 0.5)])[0]),
+                },
+            }
+            self._respond(200, 'generating')
+        else:
+            self._respond(404, dict(message='not found'))
+
+
+    def do_DELETE(self):
+        partkey_id = urlparse(self.path).path.split('/')[-1]
+        if self.partkeys.pop(partkey_id, None) is None:
+            self._respond(404, dict(message='participation id not found'))
+        else:
+            self._respond(200)
+
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def exercise_fetcher(address):
+
+    logger = logging.getLogger('main_logger')
+    fetcher = PartkeyFetcherAlgod(logger, AsyncAlgodClient(address, 'a' * 64), poll_period_s=0.1)
+
+    acc = 'JQLISQ4SUTQIJTL6YI5WVT32YIJJJCTAM7TNQQGYJDEBPX6XZWWX74RQHQ'
+
+    partkey_id = await fetcher.generate_partkey(acc, 1000, 2000)
+    print(f'Generated partkey {partkey_id}')
+
+    partkey = await fetcher.get_partkey_details(partkey_id)
+    print(partkey)
+    assert partkey.round_start == 1000 and partkey.round_end == 2000
+
+    await fetcher.refresh_partkey_table()
+    assert fetcher.get_partkey_id_from_acc(acc) == partkey_id
+
+    assert await fetcher.delete_partkey(partkey_id)
+    await fetcher.refresh_partkey_table()
+    assert len(fetcher.get_partkey_table()) == 0
+    print('Deleted partkey')
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig( level=logging.DEBUG )
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ParticipationStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    asyncio.run(exercise_fetcher(f'http://127.0.0.1:{server.server_port}'))
+
+    server.shutdown()
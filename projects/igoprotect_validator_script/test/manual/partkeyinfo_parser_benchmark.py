@@ -0,0 +1,100 @@
+"""
+Benchmark of parsing `goal account partkeyinfo` output, using synthetic outputs with many participation keys.
+
+Covers parsing an in-memory output, a file read line by line, and the complete refresh of the `goal` partkey backend,
+where `cat` stands in for `goal` so that the output is streamed through a real subprocess pipe.
+
+"""
+import asyncio
+import base64
+import logging
+import os
+import tempfile
+import time
+
+# todo: Clean way of including or callingfrom base path
+from pathlib import Path
+import sys
+sys.path.append(str(Path(Path(__file__).parents[2], 'src')))
+
+from igoprotect_validator_script.Locksmith import PartkeyFetcherGoal
+from igoprotect_validator_script.PartkeyinfoParser import PartkeyinfoParser
+
+
+NUM_OF_KEYS = [10_000, 50_000, 100_000]
+
+
+def make_synthetic_outputs(num_of_keys, leading_space=True, banner=True):
+    """Make `listpartkeys` and `partkeyinfo` outputs with `num_of_keys` keys."""
+    lead = ' ' if leading_space else ''
+    list_lines = ['Registered\tAccount\tParticipationID\tLast Used\tFirst round\tLast round']
+    info_lines = []
+    if banner:
+        info_lines.append('You are using AlgoKit version 1.0.0, however version 2.0.0 is available.')
+    info_lines.append(f'{lead}Dumping participation key info from /algod/data/...')
+    for i in range(num_of_keys):
+        address = base64.b32encode(os.urandom(36)).decode()[:58]
+        partkey_id = base64.b32encode(os.urandom(32)).decode()[:52]
+        rows = [
+            ('Participation ID', partkey_id),
+            ('Parent address', address),
+            ('Last vote round', 'N/A' if i % 2 else str(500 + i)),
+            ('Last block proposal round', 'N/A'),
+            ('Effective first round', 'N/A' if i % 3 else str(1000 + i)),
+            ('Effective last round', 'N/A' if i % 3 else str(2000 + i)),
+            ('First round', str(1000 + i)),
+            ('Last round', str(2000 + i)),
+            ('Key dilution', '10000'),
+            ('Selection key', base64.b64encode(os.urandom(32)).decode()),
+            ('Voting key', base64.b64encode(os.urandom(32)).decode()),
+            ('State proof key', base64.b64encode(os.urandom(64)).decode()),
+        ]
+        info_lines.append(lead)
+        info_lines.extend(f'{lead}{name + ":":<27}{value}' for name, value in rows)
+        list_lines.append(f'yes\t{address}\t{partkey_id[:8]}...\tN/A\t{1000 + i}\t{2000 + i}')
+    return '\n'.join(list_lines) + '\n', '\n'.join(info_lines) + '\n'
+
+
+def time_it(label, num_of_keys, func):
+    start = time.perf_counter()
+    num_of_parsed = func()
+    duration = time.perf_counter() - start
+    assert num_of_parsed == num_of_keys, f'{label}: parsed {num_of_parsed} of {num_of_keys} keys'
+    print(f'{label:<36} {num_of_keys:>8} keys {duration:8.3f} s {num_of_keys / duration:>12,.0f} keys/s')
+
+
+if __name__ == '__main__':
+
+    logger = logging.getLogger('main_logger')
+    logging.basicConfig( level=logging.WARNING )
+
+    for num_of_keys in NUM_OF_KEYS:
+        for leading_space, banner in [(True, True), (False, False)]:
+            list_stdout, info_stdout = make_synthetic_outputs(num_of_keys, leading_space, banner)
+            variant = f"{'lead' if leading_space else 'flush'}{'+banner' if banner else ''}"
+
+            time_it(
+                f'in-memory ({variant})',
+                num_of_keys,
+                lambda: sum(1 for _ in PartkeyinfoParser(logger).parse(info_stdout.splitlines()))
+            )
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                list_path = Path(tmp_dir, 'listpartkeys.txt')
+                info_path = Path(tmp_dir, 'partkeyinfo.txt')
+                list_path.write_text(list_stdout)
+                info_path.write_text(info_stdout)
+
+                def parse_file():
+                    with open(info_path, 'r') as f:
+                        return sum(1 for _ in PartkeyinfoParser(logger).parse(f))
+                time_it(f'file ({variant})', num_of_keys, parse_file)
+
+                fetcher = PartkeyFetcherGoal(logger, use_algokit=False)
+                fetcher.COMMAND_LIST = ['cat', str(list_path)]
+                fetcher.COMMAND_INFO = ['cat', str(info_path)]
+                time_it(
+                    f'goal backend refresh ({variant})',
+                    num_of_keys,
+                    lambda: len(asyncio.run(fetcher.refresh_partkey_table()))
+                )